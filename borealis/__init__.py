@@ -12,6 +12,7 @@ gi.require_version("Gtk4LayerShell", "1.0")
 
 from .ext import *
 from .service import *
+from .store import *
 from .widget import *
 
 # Root borealis instance.
@@ -1,13 +1,13 @@
 from typing import Optional
 import gi
-from borealis.service import BaseService, ServiceAnnotation
+from borealis.service import BaseService, ServiceAnnotation, ServiceRuntime
+from borealis.store import Store
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Gtk4LayerShell", "1.0")
 from gi.repository import Gtk, Gdk
 from borealis.widget.window import Window
 
-import threading
 import logging
 
 # Setup library level logging for the end-user
@@ -47,6 +47,23 @@ class Borealis:
     A list of services to be enabled in this borealis instance
     """
 
+    max_service_workers: int = 8
+    """
+    The maximum amount of services running at once, services share
+    this many worker threads.
+    """
+
+    runtime: ServiceRuntime
+    """
+    The runtime the services of this borealis instance run on
+    """
+
+    store: Store
+    """
+    The store shared by the widgets of this borealis instance,
+    which Widget.b_bind_store binds to by default.
+    """
+
     _app: Gtk.Application
     """
     The internal Gtk Application this Borealis application is using for Gtk4
@@ -73,6 +90,8 @@ class Borealis:
         """
         self._service_map = {}
         self._service_prefixes_map = {}
+        self.runtime = ServiceRuntime(self.max_service_workers)
+        self.store = Store()
 
         # Create underlying Gtk Application with the passed in application id.
         try:
@@ -113,9 +132,16 @@ class Borealis:
             self._service_map[annotation.__class__] = service
             self._service_prefixes_map[annotation.get_prefix()] = service
 
-        # Start each service
+        # Start each service, lazy services start once a widget attaches
         for service in self.services:
-            threading.Thread(target=service.start_service).start()
+            service.set_runtime(self.runtime)
+
+    def _stop_services(self):
+        """
+        Stop's all of the services associated with this borealis instance.
+        """
+
+        self.runtime.shutdown()
 
     def get_services_prefix_list(self) -> list[str]:
         """
@@ -186,4 +212,5 @@ class Borealis:
         # Create and run our class
         self: Borealis = cls()
         self._app.connect("activate", self._activate())
+        self._app.connect("shutdown", lambda _: self._stop_services())
         self._app.run(None)
@@ -6,3 +6,6 @@ assist in developing applications using borealis.
 """
 
 from .hyprland import *
+from .sysstats import *
+from .sysfs import *
+from .network import *
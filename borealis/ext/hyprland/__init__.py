@@ -0,0 +1,13 @@
+"""
+borealis.ext.hyprland
+
+Services and helpers for integrating borealis
+applications with the Hyprland compositor.
+"""
+
+from .event_schema import *
+from .socket2_reader import *
+from .hyprctl import *
+from .hyprland_signal import *
+from .hyprland_state import *
+from .hyprland_service import *
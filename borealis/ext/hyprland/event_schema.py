@@ -0,0 +1,434 @@
+import sys
+from collections.abc import Callable
+
+
+def parse_address(value: str) -> str:
+    """
+    Parses a window address, socket2 sends these without a 0x prefix
+    while hyprctl includes it, so they are normalised to always have one.
+
+    Args:
+        value (str): The address as sent by Hyprland
+
+    Returns:
+        str: The interned, 0x prefixed address or an empty string for no window
+    """
+    if not value:
+        return ""
+
+    if not value.startswith("0x"):
+        value = "0x" + value
+
+    return sys.intern(value)
+
+
+def parse_workspace_id(value: str) -> int:
+    """
+    Parses a workspace id, Hyprland leaves this empty when
+    there is no workspace (e.g closing a special workspace)
+
+    Args:
+        value (str): The id as sent by Hyprland
+
+    Returns:
+        int: The workspace id, -1 if there is no workspace
+    """
+    if not value:
+        return -1
+
+    return int(value)
+
+
+def parse_flag(value: str) -> bool:
+    """
+    Parses a 0/1 flag
+
+    Args:
+        value (str): The flag as sent by Hyprland
+
+    Returns:
+        bool: True if the flag is set
+    """
+    return value == "1"
+
+
+# Field kinds, a pair of the type used for the signal's
+# arguments and the parser used to produce it.
+ADDRESS = (str, parse_address)
+WORKSPACE_ID = (int, parse_workspace_id)
+INT = (int, int)
+FLAG = (bool, parse_flag)
+NAME = (str, sys.intern)
+"""
+Short strings which repeat across events (monitors, workspaces, classes)
+"""
+TEXT = (str, str)
+"""
+Free form text which may contain commas (titles, descriptions)
+"""
+
+
+class HyprlandEventSchema:
+    """
+    Precompiled description of a single socket2 event, its
+    arguments and how to parse them from the event data.
+    """
+
+    name: str
+    """
+    The name of the event, e.g workspacev2
+    """
+
+    arg_types: tuple[type, ...]
+    """
+    The types of the arguments passed to this event's handlers
+    """
+
+    arity: int
+    """
+    The amount of fields in this event's data
+    """
+
+    monitor_field: int | None
+    """
+    Index of the field naming the monitor the event happened on, events
+    with one are only sent to widgets on that monitor (or without one).
+    Only events concerning a single monitor set this, events which also
+    change other monitors (e.g focusedmon) are broadcast.
+    """
+
+    _parsers: tuple[Callable[[str], any], ...]
+    """
+    The parser for each field of this event's data
+    """
+
+    _text_field: int
+    """
+    Index of the field which may contain commas
+    """
+
+    _maxsplit: int
+    """
+    The maxsplit used when splitting this event's data by commas
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fields: tuple[tuple[type, Callable[[str], any]], ...],
+        text_field: int = -1,
+        monitor_field: int | None = None,
+    ):
+        """
+        Creates a new event schema
+
+        Args:
+            name (str): The name of the event
+            fields (tuple[tuple[type, Callable[[str], any]], ...]): The kinds of the event's fields in order
+            text_field (int, optional): Index of the field which may contain commas, defaults to the last.
+            monitor_field (int | None, optional): Index of the field naming the monitor the event happened on.
+        """
+        self.name = name
+        self.monitor_field = monitor_field
+        self.arity = len(fields)
+        self.arg_types = tuple(field_type for field_type, _ in fields)
+        self._parsers = tuple(parser for _, parser in fields)
+        self._text_field = text_field % self.arity if self.arity else 0
+
+        # Commas in the last field are kept by only splitting up to it.
+        if self._text_field == self.arity - 1:
+            self._maxsplit = self.arity - 1
+        else:
+            self._maxsplit = -1
+
+    def split(self, data: str) -> list[str]:
+        """
+        Splits the data of this event into its fields, without parsing them
+
+        Args:
+            data (str): The data of the event, everything after the >>
+
+        Raises:
+            ValueError: If the data does not have the amount of fields this event has
+
+        Returns:
+            list[str]: The raw fields of the event
+        """
+        if self.arity == 1:
+            return [data]
+
+        if self.arity == 0:
+            return []
+
+        fields = data.split(",", self._maxsplit)
+
+        # Rejoin a text field that isn't last if it contained commas
+        extra = len(fields) - self.arity
+        if extra > 0 and self._maxsplit == -1:
+            end = self._text_field + extra + 1
+            fields[self._text_field : end] = [",".join(fields[self._text_field : end])]
+
+        if len(fields) != self.arity:
+            raise ValueError(
+                f"Expected {self.arity} fields for event {self.name} but got {len(fields)}"
+            )
+
+        return fields
+
+    def split_field(self, data: str, index: int) -> str:
+        """
+        Returns a single raw field of this event's data, fields before the
+        text field are split out without splitting the rest of the data.
+
+        Args:
+            data (str): The data of the event, everything after the >>
+            index (int): The index of the field
+
+        Raises:
+            ValueError: If the data does not have the field
+
+        Returns:
+            str: The raw field
+        """
+        if self.arity == 1 and index == 0:
+            return data
+
+        if index < self._text_field:
+            fields = data.split(",", index + 1)
+
+            if len(fields) > index + 1:
+                return fields[index]
+
+        try:
+            return self.split(data)[index]
+        except IndexError:
+            raise ValueError(f"Event {self.name} has no field {index}") from None
+
+    def decode(self, data: str) -> tuple:
+        """
+        Splits and parses the data of this event into its arguments
+
+        Args:
+            data (str): The data of the event, everything after the >>
+
+        Raises:
+            ValueError: If the data is malformed for this event
+
+        Returns:
+            tuple: The parsed arguments of the event
+        """
+        return tuple(
+            [parser(field) for parser, field in zip(self._parsers, self.split(data))]
+        )
+
+
+HYPRLAND_EVENTS: dict[str, HyprlandEventSchema] = {
+    schema.name: schema
+    for schema in (
+        # WORKSPACENAME
+        HyprlandEventSchema("workspace", (NAME,)),
+        # WORKSPACEID,WORKSPACENAME
+        HyprlandEventSchema("workspacev2", (WORKSPACE_ID, NAME)),
+        # MONNAME,WORKSPACENAME (broadcast, the other monitors lost focus)
+        HyprlandEventSchema("focusedmon", (NAME, NAME)),
+        # MONNAME,WORKSPACEID
+        HyprlandEventSchema("focusedmonv2", (NAME, WORKSPACE_ID)),
+        # WINDOWCLASS,WINDOWTITLE
+        HyprlandEventSchema("activewindow", (NAME, TEXT)),
+        # WINDOWADDRESS
+        HyprlandEventSchema("activewindowv2", (ADDRESS,)),
+        # 0/1 ( EXIT / ENTER )
+        HyprlandEventSchema("fullscreen", (FLAG,)),
+        # MONITORNAME
+        HyprlandEventSchema("monitorremoved", (NAME,), monitor_field=0),
+        # MONITORID,MONITORNAME,MONITORDESCRIPTION
+        HyprlandEventSchema("monitorremovedv2", (INT, NAME, TEXT), monitor_field=1),
+        # MONITORNAME
+        HyprlandEventSchema("monitoradded", (NAME,), monitor_field=0),
+        # MONITORID,MONITORNAME,MONITORDESCRIPTION
+        HyprlandEventSchema("monitoraddedv2", (INT, NAME, TEXT), monitor_field=1),
+        # WORKSPACENAME
+        HyprlandEventSchema("createworkspace", (NAME,)),
+        # WORKSPACEID,WORKSPACENAME
+        HyprlandEventSchema("createworkspacev2", (WORKSPACE_ID, NAME)),
+        # WORKSPACENAME
+        HyprlandEventSchema("destroyworkspace", (NAME,)),
+        # WORKSPACEID,WORKSPACENAME
+        HyprlandEventSchema("destroyworkspacev2", (WORKSPACE_ID, NAME)),
+        # WORKSPACENAME,MONNAME (broadcast, the workspace left another monitor)
+        HyprlandEventSchema("moveworkspace", (NAME, NAME), text_field=0),
+        # WORKSPACEID,WORKSPACENAME,MONNAME
+        HyprlandEventSchema(
+            "moveworkspacev2", (WORKSPACE_ID, NAME, NAME), text_field=1
+        ),
+        # WORKSPACEID,NEWNAME
+        HyprlandEventSchema("renameworkspace", (WORKSPACE_ID, NAME)),
+        # WORKSPACENAME,MONNAME
+        HyprlandEventSchema(
+            "activespecial", (NAME, NAME), text_field=0, monitor_field=1
+        ),
+        # WORKSPACEID,WORKSPACENAME,MONNAME
+        HyprlandEventSchema(
+            "activespecialv2",
+            (WORKSPACE_ID, NAME, NAME),
+            text_field=1,
+            monitor_field=2,
+        ),
+        # KEYBOARDNAME,LAYOUTNAME
+        HyprlandEventSchema("activelayout", (NAME, NAME)),
+        # WINDOWADDRESS,WORKSPACENAME,WINDOWCLASS,WINDOWTITLE
+        HyprlandEventSchema("openwindow", (ADDRESS, NAME, NAME, TEXT)),
+        # WINDOWADDRESS
+        HyprlandEventSchema("closewindow", (ADDRESS,)),
+        # WINDOWADDRESS,WORKSPACENAME
+        HyprlandEventSchema("movewindow", (ADDRESS, NAME)),
+        # WINDOWADDRESS,WORKSPACEID,WORKSPACENAME
+        HyprlandEventSchema("movewindowv2", (ADDRESS, WORKSPACE_ID, NAME)),
+        # NAMESPACE
+        HyprlandEventSchema("openlayer", (NAME,)),
+        # NAMESPACE
+        HyprlandEventSchema("closelayer", (NAME,)),
+        # SUBMAPNAME
+        HyprlandEventSchema("submap", (NAME,)),
+        # WINDOWADDRESS,FLOATING (0 or 1)
+        HyprlandEventSchema("changefloatingmode", (ADDRESS, FLAG)),
+        # WINDOWADDRESS
+        HyprlandEventSchema("urgent", (ADDRESS,)),
+        # STATE,OWNER
+        HyprlandEventSchema("screencast", (FLAG, INT)),
+        # WINDOWADDRESS
+        HyprlandEventSchema("windowtitle", (ADDRESS,)),
+        # WINDOWADDRESS,WINDOWTITLE
+        HyprlandEventSchema("windowtitlev2", (ADDRESS, TEXT)),
+        # 0/1, WINDOWADDRESSES
+        HyprlandEventSchema("togglegroup", (FLAG, TEXT)),
+        # WINDOWADDRESS
+        HyprlandEventSchema("moveintogroup", (ADDRESS,)),
+        # WINDOWADDRESS
+        HyprlandEventSchema("moveoutofgroup", (ADDRESS,)),
+        # 0/1
+        HyprlandEventSchema("ignoregrouplock", (FLAG,)),
+        # 0/1
+        HyprlandEventSchema("lockgroups", (FLAG,)),
+        # empty
+        HyprlandEventSchema("configreloaded", ()),
+        # WINDOWADDRESS,PINSTATE
+        HyprlandEventSchema("pin", (ADDRESS, FLAG)),
+        # WINDOWADDRESS,0/1
+        HyprlandEventSchema("minimized", (ADDRESS, FLAG)),
+    )
+}
+"""
+Every known socket2 event by name, along with its arguments.
+
+(Also all events and their types if you are reading this!)
+"""
+
+
+class HyprlandFusedEvent:
+    """
+    Describes how a v1 event and the v2 event Hyprland sends directly
+    after it are fused into a single richer event, carrying the v1
+    event's arguments followed by the arguments only the v2 event has.
+    """
+
+    name: str
+    """
+    The name of the v1 event, which the fused event keeps
+    """
+
+    partner: str
+    """
+    The name of the v2 event sent directly after the v1 event
+    """
+
+    arg_types: tuple[type, ...]
+    """
+    The types of the fused event's arguments
+    """
+
+    _extra: tuple[int, ...]
+    """
+    Indices of the v2 event's arguments which are added to the v1 event's
+    """
+
+    _defaults: tuple
+    """
+    Values used for the v2 arguments when the v2 event did not follow
+    """
+
+    def __init__(self, name: str, partner: str, extra: tuple[int, ...]):
+        """
+        Creates a new fused event
+
+        Args:
+            name (str): The name of the v1 event
+            partner (str): The name of the v2 event
+            extra (tuple[int, ...]): Indices of the v2 event's arguments the v1 event lacks
+        """
+        self.name = name
+        self.partner = partner
+        self._extra = extra
+
+        partner_types = HYPRLAND_EVENTS[partner].arg_types
+        extra_types = tuple(partner_types[index] for index in extra)
+
+        self.arg_types = HYPRLAND_EVENTS[name].arg_types + extra_types
+        self._defaults = tuple(
+            {int: -1, bool: False}.get(arg_type, "") for arg_type in extra_types
+        )
+
+    def fuse(self, args: tuple, partner_args: tuple | None) -> tuple:
+        """
+        Fuses the arguments of both events
+
+        Args:
+            args (tuple): The arguments of the v1 event
+            partner_args (tuple | None): The arguments of the v2 event, None if it did not follow
+
+        Returns:
+            tuple: The arguments of the fused event
+        """
+        if partner_args is None:
+            return args + self._defaults
+
+        return args + tuple(partner_args[index] for index in self._extra)
+
+
+HYPRLAND_FUSED_EVENTS: dict[str, HyprlandFusedEvent] = {
+    fused.name: fused
+    for fused in (
+        # WINDOWCLASS,WINDOWTITLE,WINDOWADDRESS
+        HyprlandFusedEvent("activewindow", "activewindowv2", (0,)),
+        # WORKSPACENAME,WORKSPACEID
+        HyprlandFusedEvent("workspace", "workspacev2", (0,)),
+        # MONNAME,WORKSPACENAME,WORKSPACEID
+        HyprlandFusedEvent("focusedmon", "focusedmonv2", (1,)),
+        # WINDOWADDRESS,WORKSPACENAME,WORKSPACEID
+        HyprlandFusedEvent("movewindow", "movewindowv2", (1,)),
+        # WORKSPACENAME,WORKSPACEID
+        HyprlandFusedEvent("createworkspace", "createworkspacev2", (0,)),
+        # WORKSPACENAME,WORKSPACEID
+        HyprlandFusedEvent("destroyworkspace", "destroyworkspacev2", (0,)),
+        # WORKSPACENAME,MONNAME,WORKSPACEID
+        HyprlandFusedEvent("moveworkspace", "moveworkspacev2", (0,)),
+        # WORKSPACENAME,MONNAME,WORKSPACEID
+        HyprlandFusedEvent("activespecial", "activespecialv2", (0,)),
+        # MONITORNAME,MONITORID,MONITORDESCRIPTION
+        HyprlandFusedEvent("monitoradded", "monitoraddedv2", (0, 2)),
+        # MONITORNAME,MONITORID,MONITORDESCRIPTION
+        HyprlandFusedEvent("monitorremoved", "monitorremovedv2", (0, 2)),
+        # WINDOWADDRESS,WINDOWTITLE
+        HyprlandFusedEvent("windowtitle", "windowtitlev2", (1,)),
+    )
+}
+"""
+v1/v2 event pairs which are fused in HyprlandService's fused mode, by the v1 event.
+"""
+
+HYPRLAND_FUSED_PARTNERS: dict[str, str] = {
+    fused.partner: fused.name for fused in HYPRLAND_FUSED_EVENTS.values()
+}
+"""
+The v1 event of each v2 event which is fused
+"""
@@ -0,0 +1,446 @@
+import json
+import logging
+import socket
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+from gi.repository import GLib
+
+logger = logging.getLogger(__name__)
+
+
+def hyprctl_request(socket_path: str, command: str) -> str:
+    """
+    Sends a single request to Hyprland's socket1 and returns the reply,
+    Hyprland closes the connection once it has replied.
+
+    This blocks, so should not be called from the main thread.
+
+    Args:
+        socket_path (str): Path to Hyprland's .socket.sock
+        command (str): The request, e.g j/clients or dispatch workspace 1
+
+    Returns:
+        str: The reply from Hyprland
+    """
+    chunks = []
+
+    hyprctl_client: socket.socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as hyprctl_client:
+        hyprctl_client.connect(socket_path)
+        hyprctl_client.sendall(command.encode())
+
+        while chunk := hyprctl_client.recv(65536):
+            chunks.append(chunk)
+
+    return b"".join(chunks).decode(errors="replace")
+
+
+def parse_json_replies(reply: str) -> list[any]:
+    """
+    Parses every json document in a reply, this is used for [[BATCH]]
+    requests where the replies of each query are concatenated together.
+
+    Args:
+        reply (str): The reply from Hyprland
+
+    Raises:
+        ValueError: If the reply contains something other than json
+
+    Returns:
+        list[any]: The parsed json documents in order
+    """
+    decoder = json.JSONDecoder()
+    documents = []
+
+    index = 0
+    while True:
+        # Skip whitespace/separators between documents
+        while index < len(reply) and reply[index].isspace():
+            index += 1
+
+        if index >= len(reply):
+            return documents
+
+        document, index = decoder.raw_decode(reply, index)
+        documents.append(document)
+
+
+def _invalidated_by(cacheable: dict[str, tuple[str, ...]]) -> dict[str, set[str]]:
+    """
+    Inverts the map of cacheable queries to the events that invalidate them.
+    """
+    invalidated_by = {}
+
+    for query, events in cacheable.items():
+        for event in events:
+            invalidated_by.setdefault(event, set()).add(query)
+
+    return invalidated_by
+
+
+_WINDOW_EVENTS = (
+    "openwindow",
+    "closewindow",
+    "movewindow",
+    "movewindowv2",
+    "windowtitle",
+    "windowtitlev2",
+    "changefloatingmode",
+    "fullscreen",
+    "pin",
+    "minimized",
+    "urgent",
+    "togglegroup",
+    "moveintogroup",
+    "moveoutofgroup",
+)
+
+_WORKSPACE_EVENTS = (
+    "createworkspace",
+    "createworkspacev2",
+    "destroyworkspace",
+    "destroyworkspacev2",
+    "moveworkspace",
+    "moveworkspacev2",
+    "renameworkspace",
+)
+
+_MONITOR_EVENTS = (
+    "monitoradded",
+    "monitoraddedv2",
+    "monitorremoved",
+    "monitorremovedv2",
+    "workspace",
+    "workspacev2",
+    "focusedmon",
+    "focusedmonv2",
+    "moveworkspace",
+    "moveworkspacev2",
+    "activespecial",
+    "activespecialv2",
+)
+
+CACHEABLE_QUERIES: dict[str, tuple[str, ...]] = {
+    # Clients include their focusHistoryID
+    "j/clients": _WINDOW_EVENTS + ("activewindow", "activewindowv2"),
+    "j/activewindow": _WINDOW_EVENTS + ("activewindow", "activewindowv2"),
+    "j/workspaces": _WORKSPACE_EVENTS + _WINDOW_EVENTS,
+    "j/activeworkspace": _WORKSPACE_EVENTS
+    + _WINDOW_EVENTS
+    + ("workspace", "workspacev2", "focusedmon", "focusedmonv2"),
+    "j/monitors": _MONITOR_EVENTS,
+    "j/layers": ("openlayer", "closelayer", "monitoradded", "monitorremoved"),
+    "j/version": (),
+}
+"""
+Queries whose replies are cached, along with the socket2 events
+which invalidate them. configreloaded invalidates every query.
+
+j/devices isn't cached, devices are plugged in without any event.
+"""
+
+_INVALIDATED_BY: dict[str, set[str]] = _invalidated_by(CACHEABLE_QUERIES)
+
+
+class HyprctlClient:
+    """
+    Client for Hyprland's socket1, the socket hyprctl uses.
+
+    Requests are made on a small shared pool of worker threads so the
+    main loop is never blocked, dispatches made during one main loop
+    iteration are sent together as a single [[BATCH]] request and the
+    replies of json queries are cached until a socket2 event changes them.
+    """
+
+    socket_path: str
+    """
+    Path to Hyprland's .socket.sock
+    """
+
+    max_workers: int
+    """
+    The amount of requests which may be in flight at once
+    """
+
+    caching: bool
+    """
+    Whether replies of cacheable queries are cached, this must only be
+    enabled while every socket2 event is passed to invalidate.
+    """
+
+    _executor: ThreadPoolExecutor | None
+    """
+    The pool of workers making requests, None until a request is made
+    and once the client is closed
+    """
+
+    _cache: dict[str, str]
+    """
+    Unparsed replies of cacheable queries by their query, every caller
+    parses its own copy so cached replies can't be modified.
+    """
+
+    _generations: dict[str, int]
+    """
+    Incremented whenever a query is invalidated, so that replies which
+    were in flight during an invalidation are not cached.
+    """
+
+    _lock: threading.Lock
+    """
+    Guards the cache, pending dispatches and the worker pool
+    """
+
+    _pending_dispatches: list[str]
+    """
+    Dispatches waiting to be sent in the next batch
+    """
+
+    def __init__(self, socket_path: str, max_workers: int = 2):
+        """
+        Creates a new socket1 client
+
+        Args:
+            socket_path (str): Path to Hyprland's .socket.sock
+            max_workers (int, optional): The amount of requests which may be in flight at once.
+        """
+        self.socket_path = socket_path
+        self.max_workers = max_workers
+        self.caching = False
+        self._executor = None
+        self._cache = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+        self._pending_dispatches = []
+
+    def request(self, command: str) -> str:
+        """
+        Makes a single request, blocking until Hyprland replies.
+
+        Args:
+            command (str): The request, e.g dispatch workspace 1
+
+        Returns:
+            str: The reply from Hyprland
+        """
+        return hyprctl_request(self.socket_path, command)
+
+    def request_async(
+        self, command: str, callback: Optional[Callable[[str], any]] = None
+    ) -> Future:
+        """
+        Makes a single request without blocking
+
+        Args:
+            command (str): The request, e.g dispatch workspace 1
+            callback (Optional[Callable[[str], any]], optional): Called on the main loop with the reply.
+
+        Returns:
+            Future: The future of the reply
+        """
+        future = self._submit(self.request, command)
+
+        if callback is not None:
+            self._deliver(future, callback)
+
+        return future
+
+    def batch(self, commands: list[str]) -> str:
+        """
+        Sends several commands in one round trip, blocking until Hyprland replies.
+
+        Args:
+            commands (list[str]): The commands, e.g ["dispatch workspace 1", "j/clients"]
+
+        Returns:
+            str: The concatenated replies of each command
+        """
+        return self.request("[[BATCH]]" + ";".join(commands))
+
+    def batch_async(
+        self, commands: list[str], callback: Optional[Callable[[str], any]] = None
+    ) -> Future:
+        """
+        Sends several commands in one round trip without blocking, see batch
+
+        Args:
+            commands (list[str]): The commands, e.g ["dispatch workspace 1", "j/clients"]
+            callback (Optional[Callable[[str], any]], optional): Called on the main loop with the concatenated replies.
+
+        Returns:
+            Future: The future of the replies
+        """
+        return self.request_async("[[BATCH]]" + ";".join(commands), callback)
+
+    def dispatch(self, dispatcher: str, *args: str):
+        """
+        Queues a dispatch, every dispatch queued during the same main loop
+        iteration is sent together in a single batch.
+
+        Args:
+            dispatcher (str): The dispatcher, e.g workspace
+            *args (str): The arguments to the dispatcher
+
+        Raises:
+            ValueError: If the dispatch contains a ;, which would split the batch
+        """
+        command = " ".join(("dispatch", dispatcher) + args)
+
+        if ";" in command:
+            raise ValueError(f"Dispatches can't contain ';': {command!r}")
+
+        with self._lock:
+            self._pending_dispatches.append(command)
+
+            # Only the first dispatch of an iteration schedules a flush
+            if len(self._pending_dispatches) > 1:
+                return
+
+        GLib.idle_add(self._flush_dispatches)
+
+    def _flush_dispatches(self):
+        """
+        Sends every queued dispatch as one batch
+        """
+        with self._lock:
+            commands = self._pending_dispatches
+            self._pending_dispatches = []
+
+        if commands:
+            future = self._submit(self.batch, commands)
+            future.add_done_callback(self._log_failure)
+
+        return False
+
+    def query(self, query: str) -> any:
+        """
+        Makes a json query, blocking until Hyprland replies unless the
+        reply is already cached.
+
+        Args:
+            query (str): The query, e.g j/clients
+
+        Returns:
+            any: The parsed json reply, a copy of its own for every call
+        """
+        with self._lock:
+            reply = self._cache.get(query)
+            generation = self._generations.get(query, 0)
+
+        if reply is not None:
+            return json.loads(reply)
+
+        reply = self.request(query)
+        parsed = json.loads(reply)
+
+        # Only cache if nothing invalidated this query while it was in flight
+        if query in CACHEABLE_QUERIES:
+            with self._lock:
+                if self.caching and self._generations.get(query, 0) == generation:
+                    self._cache[query] = reply
+
+        return parsed
+
+    def query_async(
+        self, query: str, callback: Callable[[any], any]
+    ) -> Optional[Future]:
+        """
+        Makes a json query without blocking, if the reply is cached
+        the callback is called immediately.
+
+        Args:
+            query (str): The query, e.g j/clients
+            callback (Callable[[any], any]): Called on the main loop with the parsed reply.
+
+        Returns:
+            Optional[Future]: The future of the reply, None if it was cached
+        """
+        with self._lock:
+            cached = self._cache.get(query)
+
+        if cached is not None:
+            callback(json.loads(cached))
+            return None
+
+        future = self._submit(self.query, query)
+        self._deliver(future, callback)
+
+        return future
+
+    def invalidate(self, event: str):
+        """
+        Invalidates the cached queries changed by a socket2 event
+
+        Args:
+            event (str): The name of the socket2 event
+        """
+        if event == "configreloaded":
+            queries = CACHEABLE_QUERIES.keys()
+        else:
+            queries = _INVALIDATED_BY.get(event)
+            if queries is None:
+                return
+
+        with self._lock:
+            for query in queries:
+                self._generations[query] = self._generations.get(query, 0) + 1
+                self._cache.pop(query, None)
+
+    def close(self):
+        """
+        Stops the worker pool and caching, requests in flight are left to
+        finish. The client may still be used, starting a new pool.
+        """
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+            self.caching = False
+
+            for query in CACHEABLE_QUERIES:
+                self._generations[query] = self._generations.get(query, 0) + 1
+
+            self._cache.clear()
+
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, function: Callable, *args) -> Future:
+        """
+        Submits a request to the worker pool, starting it if needed
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="hyprctl"
+                )
+
+            return self._executor.submit(function, *args)
+
+    def _deliver(self, future: Future, callback: Callable):
+        """
+        Calls a callback on the main loop with the result of a future
+        """
+
+        def done(future: Future):
+            if future.exception() is not None:
+                self._log_failure(future)
+                return
+
+            def run_callback():
+                callback(future.result())
+                return False
+
+            GLib.idle_add(run_callback)
+
+        future.add_done_callback(done)
+
+    def _log_failure(self, future: Future):
+        """
+        Logs the exception of a failed request
+        """
+        if future.cancelled() or future.exception() is None:
+            return
+
+        logger.warning(f"Hyprland request failed: {future.exception()}")
@@ -0,0 +1,763 @@
+import json
+import logging
+import socket
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Optional
+from gi.repository import GLib
+from borealis.service import (
+    BaseService,
+    Coalesce,
+    CoalescePolicy,
+    MainLoopService,
+    OverflowPolicy,
+    ServiceSignal,
+    ServiceAnnotation,
+)
+from borealis.ext.hyprland.event_schema import (
+    HYPRLAND_EVENTS,
+    HYPRLAND_FUSED_EVENTS,
+    HYPRLAND_FUSED_PARTNERS,
+)
+from borealis.ext.hyprland.hyprctl import HyprctlClient, parse_json_replies
+from borealis.ext.hyprland.hyprland_signal import FusedHyprlandSignal, HyprlandSignal
+from borealis.ext.hyprland.hyprland_state import HyprlandState
+from borealis.ext.hyprland.mux import MUX_SOCKET_NAME, read_event_name
+from borealis.ext.hyprland.socket2_reader import Socket2Reader
+import os
+
+if TYPE_CHECKING:
+    from borealis.widget import Widget
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_QUERIES = ["j/monitors", "j/workspaces", "j/clients", "j/activewindow"]
+"""
+The queries the state is seeded from, sent in one batch
+"""
+
+
+class HyprlandCallback(ServiceAnnotation):
+    prefix = "hyprland-on"
+
+
+class HyprlandService(BaseService):
+    """
+    A service for Hyprland events.
+    """
+
+    annotation = HyprlandCallback()
+    """
+    Use this annotation when registering handlers for the Hyprland service.
+    """
+
+    xdg_runtime_dir: str = os.environ.get("XDG_RUNTIME_DIR", "")
+    """
+    Hyprland sockets exists in $XDG_RUNTIME_DIR/hypr
+    """
+
+    hyprland_instance_signature: str = os.environ.get("HYPRLAND_INSTANCE_SIGNATURE", "")
+    """
+    Required for finding location of socket2, exists as a directory under
+    $XDG_RUNTIME_DIR/hypr
+
+    Missing outside of a Hyprland session, which lets borealis be imported
+    on headless machines (e.g pointing these at a FakeHyprland from replay).
+    """
+
+    socket2_recv_bytes: int = 65536
+    """
+    The initial size of the buffer socket2 is read into, events which are
+    split across reads are held in this buffer and it will grow if a single
+    event does not fit.
+    """
+
+    socket2_path: str = os.path.abspath(
+        f"{xdg_runtime_dir}/hypr/{hyprland_instance_signature}/.socket2.sock"
+    )
+    """
+    Path to the hyprland socket2 (used for recieving events)
+    """
+
+    socket1_path: str = os.path.abspath(
+        f"{xdg_runtime_dir}/hypr/{hyprland_instance_signature}/.socket.sock"
+    )
+    """
+    Path to the hyprland socket1 (used for requests, like hyprctl)
+    """
+
+    mux_path: str = os.path.abspath(
+        f"{xdg_runtime_dir}/hypr/{hyprland_instance_signature}/{MUX_SOCKET_NAME}"
+    )
+    """
+    Path to the borealis-hyprmux socket, see borealis.ext.hyprland.mux
+    """
+
+    prefer_mux: bool = True
+    """
+    Whether to recieve events from borealis-hyprmux when it is running,
+    instead of opening another connection to socket2.
+    """
+
+    fuse_events: bool = False
+    """
+    Opt-in fused mode, where each v1 event that is directly followed by its
+    v2 event in the same read (e.g activewindow and activewindowv2) is
+    emitted once under the v1 name with the arguments of both, halving
+    main loop dispatches. See HYPRLAND_FUSED_EVENTS for the arguments.
+    """
+
+    lazy: bool = False
+    """
+    Runs along with borealis even without widgets attached, since state
+    and hyprctl's cache are used directly (e.g state.subscribe) and are
+    only kept up to date while the service is running.
+    """
+
+    queue_overflow: OverflowPolicy = OverflowPolicy.BLOCK
+    """
+    Events are never dropped, since state is only kept up to date by them
+    (a dropped openwindow or closewindow would be wrong until restarted).
+    The reader waits for the main loop instead, which holds events back in
+    the socket. Titles still collapse through signal_coalescing.
+    """
+
+    signal_coalescing: dict[str, Coalesce] = {
+        "windowtitle": Coalesce(CoalescePolicy.LATEST, key=0),
+        "windowtitlev2": Coalesce(CoalescePolicy.LATEST, key=0),
+    }
+    """
+    Only the latest pending title of each window is emitted,
+    since titles may change many times a second (e.g terminals).
+    """
+
+    sticky_signals: dict[str, int | None] = {
+        "workspace": None,
+        "workspacev2": None,
+        "focusedmon": None,
+        "focusedmonv2": None,
+        "activewindow": None,
+        "activewindowv2": None,
+        "fullscreen": None,
+        "activespecial": None,
+        "activespecialv2": None,
+        "activelayout": 0,
+        "submap": None,
+    }
+    """
+    Events describing what is currently active are replayed to widgets
+    when they attach, per monitor for the events which name one and per
+    keyboard for activelayout.
+    """
+
+    state: HyprlandState
+    """
+    Model of Hyprland's monitors, workspaces and windows kept up to date
+    by this service. Only modified on the main thread so it can be read
+    synchronously from handlers.
+    """
+
+    hyprctl: HyprctlClient
+    """
+    Client for making requests to Hyprland (dispatches and queries)
+    without spawning hyprctl, cached queries are invalidated by
+    this service's events.
+    """
+
+    _state_events: set[str]
+    """
+    The events the state is updated by, these are always decoded
+    """
+
+    _client: Optional[socket.socket]
+    """
+    The socket events are being read from while the service is running
+    """
+
+    def __init__(self, annotation: Optional[ServiceAnnotation] = None):
+        """
+        Creates a new Hyprland service
+
+        Args:
+            annotation (Optional[ServiceAnnotation], optional): The annotation information to use for widgets for this service.
+        """
+        super().__init__(annotation)
+        self.state = HyprlandState()
+        self._state_events = self.state.get_events()
+        self.hyprctl = HyprctlClient(self.socket1_path)
+        self._client = None
+
+    def _is_wanted(self, event_name: str) -> bool:
+        """
+        Returns whether an event is needed, by an attached widget or the state
+
+        Args:
+            event_name (str): The name of the event
+        """
+
+        if event_name in self._state_events or self.is_subscribed(event_name):
+            return True
+
+        # Subscribers of a fused event need its v2 event too
+        if self.fuse_events:
+            fused_name = HYPRLAND_FUSED_PARTNERS.get(event_name)
+            return fused_name is not None and self.is_subscribed(fused_name)
+
+        return False
+
+    def read_hyprland_event(self, event: str) -> Optional[ServiceSignal]:
+        """
+        Reads a signal from the string of a hyprland event
+
+        Events nobody needs (no attached widget and not used by the state)
+        are dropped after reading only their name. The data of the others
+        is parsed on the main thread once it is needed, according to the
+        event's schema in HYPRLAND_EVENTS. Unknown events are dropped.
+
+        Args:
+            event (str): The stringified version of the event, Currently this format is EVENT>>DATA
+
+        Returns:
+            Optional[ServiceSignal]: The signal, None if the event was dropped
+        """
+
+        # Only split off the name until we know the event is wanted
+        event_name, separator, data = event.partition(">>")
+
+        if not separator:
+            logger.debug(f"Ignoring malformed hyprland event {event!r}")
+            return None
+
+        self.hyprctl.invalidate(event_name)
+
+        if not self._is_wanted(event_name):
+            return None
+
+        schema = HYPRLAND_EVENTS.get(event_name)
+        if schema is None:
+            logger.debug(f"Ignoring unknown hyprland event {event_name}")
+            return None
+
+        return HyprlandSignal(schema, data)
+
+    def send_hyprland_event(self, event: str):
+        """
+        Parses and sends events to borealis from hyprland by the string
+        of the event, see read_hyprland_event
+
+        Args:
+            event (str): The stringified version of the event, Currently this format is EVENT>>DATA
+        """
+
+        signal = self.read_hyprland_event(event)
+        if signal is not None:
+            self.emit_signal(signal)
+
+    def _fuse_signals(self, signals: list[ServiceSignal]) -> list[ServiceSignal]:
+        """
+        Fuses each v1 signal with the v2 signal directly following it,
+        see HYPRLAND_FUSED_EVENTS.
+
+        The v2 signal is still emitted on its own if a widget is attached to it.
+
+        Args:
+            signals (list[ServiceSignal]): The signals of a single read
+
+        Returns:
+            list[ServiceSignal]: The signals with the pairs fused
+        """
+
+        fused_signals = []
+
+        index = 0
+        while index < len(signals):
+            signal = signals[index]
+            index += 1
+
+            fused = HYPRLAND_FUSED_EVENTS.get(signal.signal)
+            if fused is None:
+                fused_signals.append(signal)
+                continue
+
+            partner = None
+            if index < len(signals) and signals[index].signal == fused.partner:
+                partner = signals[index]
+                index += 1
+
+            partner_emitted = partner is not None and self.is_subscribed(partner.signal)
+
+            fused_signals.append(
+                FusedHyprlandSignal(fused, signal, partner, partner_emitted)
+            )
+
+            if partner_emitted:
+                fused_signals.append(partner)
+
+        return fused_signals
+
+    def send_signals(self, signals: list[ServiceSignal]):
+        """
+        Sends the signals read from a single read of socket2 (or the mux),
+        fusing v1/v2 pairs when fuse_events is set.
+
+        Args:
+            signals (list[ServiceSignal]): The signals in the order they were read
+        """
+
+        if self.fuse_events:
+            signals = self._fuse_signals(signals)
+
+        self.emit_signals(signals)
+
+    def _seed_state(self):
+        """
+        Queries a snapshot of Hyprland in one request and seeds the
+        state with it on the main thread.
+        """
+
+        try:
+            reply = self.hyprctl.batch(SNAPSHOT_QUERIES)
+        except OSError as e:
+            logger.warning(f"Failed to snapshot hyprland state: {e}")
+            return
+
+        self._seed_state_from(reply)
+
+    def _seed_state_from(self, reply: str):
+        """
+        Seeds the state on the main thread with the reply to SNAPSHOT_QUERIES
+
+        Args:
+            reply (str): The concatenated replies of the snapshot's queries
+        """
+
+        try:
+            monitors, workspaces, clients, active_window = parse_json_replies(reply)
+        except ValueError as e:
+            logger.warning(f"Failed to snapshot hyprland state: {e}")
+            return
+
+        self.run_in_order(self.state.seed, monitors, workspaces, clients, active_window)
+
+    def _run_signal(self, signal: ServiceSignal):
+        """
+        Applies the event to the state before running it on widgets, so
+        handlers see the state with this event applied.
+
+        Args:
+            signal (ServiceSignal): The signal being ran
+        """
+
+        # Signals only exist for wanted events, so parse them now.
+        try:
+            signal_args = signal.args
+        except ValueError as e:
+            logger.warning(f"Dropping malformed hyprland event {signal.signal}: {e}")
+            return
+
+        if isinstance(signal, FusedHyprlandSignal):
+            for part in signal.parts:
+                if part.signal in self._state_events:
+                    self.state.apply(part.signal, part.args)
+
+        elif signal.signal in self._state_events:
+            self.state.apply(signal.signal, signal_args)
+
+        super()._run_signal(signal)
+
+    def read_mux_event(self, line: str) -> Optional[ServiceSignal]:
+        """
+        Reads a signal from an event recieved from borealis-hyprmux, whose
+        events are already parsed. The first line from the mux is a snapshot
+        of the state, which seeds the state.
+
+        Args:
+            line (str): The line from the mux, either {"snapshot": ...} or ["EVENT", ARG, ...]
+
+        Returns:
+            Optional[ServiceSignal]: The signal, None if the event was dropped
+        """
+
+        if line.startswith("{"):
+            snapshot = json.loads(line)["snapshot"]
+            self.run_in_order(
+                self.state.seed,
+                snapshot["monitors"],
+                snapshot["workspaces"],
+                snapshot["clients"],
+                snapshot["activewindow"],
+            )
+            return None
+
+        # Only read the name until we know the event is wanted
+        event_name = read_event_name(line)
+
+        self.hyprctl.invalidate(event_name)
+
+        if not self._is_wanted(event_name):
+            return None
+
+        signal = ServiceSignal(*json.loads(line))
+
+        schema = HYPRLAND_EVENTS.get(event_name)
+        if schema is not None and schema.monitor_field is not None:
+            signal.scope = signal.args[schema.monitor_field]
+
+        return signal
+
+    def _connect(
+        self, seed_state: bool = True, use_mux: bool = True
+    ) -> tuple[socket.socket, Callable[[str], Optional[ServiceSignal]]]:
+        """
+        Connects to borealis-hyprmux if it is running and preferred,
+        otherwise directly to Hyprland's socket2.
+
+        Args:
+            seed_state (bool, optional): Whether to seed the state from socket1 when connected to socket2, the mux always sends its own snapshot. Defaults to True.
+            use_mux (bool, optional): Whether the mux may be connected to, e.g not once it went away. Defaults to True.
+
+        Returns:
+            tuple[socket.socket, Callable[[str], Optional[ServiceSignal]]]: The
+                connected socket and the method reading each of its events
+        """
+
+        if use_mux and self.prefer_mux and os.path.exists(self.mux_path):
+            mux_client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+            try:
+                mux_client.connect(self.mux_path)
+                logger.info("Recieving hyprland events from borealis-hyprmux")
+                self.hyprctl.caching = True
+                return mux_client, self.read_mux_event
+            except OSError as e:
+                mux_client.close()
+                logger.warning(f"Failed to connect to borealis-hyprmux: {e}")
+
+        hyprland_client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        try:
+            hyprland_client.connect(self.socket2_path)
+        except OSError:
+            hyprland_client.close()
+            raise
+
+        # Every event invalidates hyprctl's cache from now on
+        self.hyprctl.caching = True
+
+        # Snapshot after connecting so no events are missed in between,
+        # events already in the snapshot are idempotent on the state.
+        if seed_state:
+            self._seed_state()
+
+        return hyprland_client, self.read_hyprland_event
+
+    def _read_signals(
+        self,
+        reader: Socket2Reader,
+        read_event: Callable[[str], Optional[ServiceSignal]],
+    ) -> Optional[list[ServiceSignal]]:
+        """
+        Reads once from the socket, returning the signals of the events read
+
+        Args:
+            reader (Socket2Reader): The reader of the socket
+            read_event (Callable[[str], Optional[ServiceSignal]]): Reads the signal of each event
+
+        Returns:
+            Optional[list[ServiceSignal]]: The signals, None once the socket was closed
+        """
+
+        # Hyprland sends multiple events at once, each event ends with a new line.
+        events_list = reader.read_events()
+
+        if events_list is None:
+            return None
+
+        signals = []
+        for event in events_list:
+            signal = read_event(event)
+            if signal is not None:
+                signals.append(signal)
+
+        return signals
+
+    def start_service(self):
+        """
+        Start's the hyprland service, should borealis-hyprmux go away
+        events are recieved from socket2 directly instead.
+        """
+
+        use_mux = True
+
+        while True:
+            hyprland_client, read_event = self._connect(use_mux=use_mux)
+            self._client = hyprland_client
+
+            # Stopped while connecting
+            if self.is_stopping():
+                hyprland_client.close()
+                return
+
+            # Use socket context manager since it's simpler and more clean.
+            with hyprland_client:
+                reader = Socket2Reader(hyprland_client, self.socket2_recv_bytes)
+
+                while (signals := self._read_signals(reader, read_event)) is not None:
+                    self.send_signals(signals)
+
+            if self.is_stopping():
+                return
+
+            if read_event != self.read_mux_event:
+                logger.warning("Hyprland closed socket2, stopping service")
+                return
+
+            # Reconnecting seeds the state again, covering the events missed
+            logger.warning("borealis-hyprmux went away, connecting to socket2")
+            use_mux = False
+
+    def stop_service(self):
+        """
+        Stop's the hyprland service, waking it up by shutting down its socket.
+        hyprctl stops caching (nothing invalidates it anymore) and its workers
+        are stopped, it starts them again if used while stopped.
+        """
+
+        super().stop_service()
+        self.hyprctl.close()
+
+        hyprland_client = self._client
+        if hyprland_client is None:
+            return
+
+        try:
+            hyprland_client.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            # Already closed
+            pass
+
+    def get_widget_scope(self, widget: "Widget") -> str | None:
+        """
+        Widgets are scoped to the monitor of their window, such that events
+        concerning only another monitor (e.g activespecial) are not sent to them.
+
+        Args:
+            widget (Widget): The widget being attached
+
+        Returns:
+            str | None: The monitor of the widget's window, if it was set
+        """
+        return widget.b_get_monitor()
+
+    def get_signal_arg_types(self, signal: str) -> tuple[any] | None:
+        """
+        Validation method for hyprland signals, also used for retrieving
+        the arguments to a hyprland singal's callback.
+
+        (See HYPRLAND_EVENTS for all events and their types, and
+        HYPRLAND_FUSED_EVENTS for the fused events when fuse_events is set)
+        """
+
+        if self.fuse_events and signal in HYPRLAND_FUSED_EVENTS:
+            return HYPRLAND_FUSED_EVENTS[signal].arg_types
+
+        schema = HYPRLAND_EVENTS.get(signal)
+        if schema is None:
+            return None
+
+        return schema.arg_types
+
+
+class HyprlandMainLoopService(MainLoopService, HyprlandService):
+    """
+    A service for Hyprland events which reads socket2 (or the mux) on the
+    main loop without a thread, running handlers as soon as events are read.
+
+    The snapshot seeding the state is queried on hyprctl's workers, the
+    socket is only watched once it's applied so events read afterwards
+    are never overwritten by it. Should Hyprland close the socket, the
+    service reconnects with a growing delay (straight away if it was
+    borealis-hyprmux, falling back to socket2 unless the mux is back).
+    """
+
+    reconnect_delay: int = 1000
+    """
+    Milliseconds to wait before reconnecting once the socket was closed,
+    doubled after each failed attempt
+    """
+
+    reconnect_max_delay: int = 30000
+    """
+    The longest wait in milliseconds between attempts to reconnect
+    """
+
+    _reader: Optional[Socket2Reader]
+    """
+    The reader of the socket while the service is running
+    """
+
+    _read_event: Optional[Callable[[str], Optional[ServiceSignal]]]
+    """
+    Reads the signal of each event from the socket
+    """
+
+    _reconnect_source: Optional[int]
+    """
+    The timeout reconnecting to Hyprland, if one is scheduled
+    """
+
+    _next_reconnect_delay: int
+    """
+    Milliseconds to wait before the next attempt to reconnect
+    """
+
+    def __init__(self, annotation: Optional[ServiceAnnotation] = None):
+        """
+        Creates a new Hyprland service ran on the main loop
+
+        Args:
+            annotation (Optional[ServiceAnnotation], optional): The annotation information to use for widgets for this service.
+        """
+        super().__init__(annotation)
+        self._reader = None
+        self._read_event = None
+        self._reconnect_source = None
+        self._next_reconnect_delay = self.reconnect_delay
+
+    def start_service(self):
+        """
+        Connects to Hyprland and watches the socket on the main loop
+        """
+
+        self._next_reconnect_delay = self.reconnect_delay
+        self._open()
+
+    def _open(self):
+        """
+        Connects to Hyprland, watching the socket once the state is seeded
+        """
+
+        # Connecting is quick, the snapshot is queried without blocking
+        hyprland_client, self._read_event = self._connect(seed_state=False)
+        hyprland_client.setblocking(False)
+
+        self._client = hyprland_client
+        self._reader = Socket2Reader(hyprland_client, self.socket2_recv_bytes)
+
+        # The mux sends its snapshot as the first line
+        if self._read_event != self.read_hyprland_event:
+            self._watch(hyprland_client)
+            return
+
+        future = self.hyprctl.batch_async(SNAPSHOT_QUERIES)
+        future.add_done_callback(
+            lambda future: GLib.idle_add(self._on_snapshot, hyprland_client, future)
+        )
+
+    def _on_snapshot(self, hyprland_client: socket.socket, future: Future) -> bool:
+        """
+        Seeds the state with the snapshot, then watches the socket
+        """
+
+        # Stopped (or reconnected) while querying
+        if hyprland_client is not self._client:
+            return GLib.SOURCE_REMOVE
+
+        try:
+            self._seed_state_from(future.result())
+        except OSError as e:
+            logger.warning(f"Failed to snapshot hyprland state: {e}")
+
+        self._watch(hyprland_client)
+        return GLib.SOURCE_REMOVE
+
+    def _watch(self, hyprland_client: socket.socket):
+        """
+        Watches the socket on the main loop
+        """
+
+        self._next_reconnect_delay = self.reconnect_delay
+        self.watch_fd(hyprland_client.fileno(), self._on_socket_ready)
+
+    def _on_socket_ready(self, fd: int, condition: GLib.IOCondition) -> bool:
+        """
+        Reads the events which are ready and runs them on widgets
+
+        Returns:
+            bool: Whether to keep watching the socket
+        """
+
+        signals = self._read_signals(self._reader, self._read_event)
+
+        if signals is None:
+            if self._read_event == self.read_mux_event:
+                # Reconnected straight away, to socket2 unless the mux is back
+                logger.warning("borealis-hyprmux went away, reconnecting")
+                self._next_reconnect_delay = 0
+            else:
+                logger.warning("Hyprland closed socket2, reconnecting")
+
+            self._close()
+            self._schedule_reconnect()
+            return False
+
+        self.send_signals(signals)
+        return True
+
+    def _schedule_reconnect(self):
+        """
+        Reconnects after the current delay, doubling it for the next attempt
+        """
+
+        if self.is_stopping():
+            return
+
+        self._reconnect_source = GLib.timeout_add(
+            self._next_reconnect_delay, self._reconnect
+        )
+        self._next_reconnect_delay = min(
+            max(self._next_reconnect_delay * 2, self.reconnect_delay),
+            self.reconnect_max_delay,
+        )
+
+    def _reconnect(self) -> bool:
+        """
+        Attempts to reconnect to Hyprland, scheduling another attempt if it fails
+        """
+
+        self._reconnect_source = None
+
+        # Events were missed while disconnected
+        self.hyprctl.invalidate("configreloaded")
+
+        try:
+            self._open()
+        except OSError as e:
+            logger.warning(f"Failed to reconnect to hyprland: {e}")
+            self._schedule_reconnect()
+
+        return GLib.SOURCE_REMOVE
+
+    def stop_service(self):
+        """
+        Stop's the hyprland service, closing its socket
+        """
+
+        super().stop_service()
+        self._close()
+
+        if self._reconnect_source is not None:
+            GLib.source_remove(self._reconnect_source)
+            self._reconnect_source = None
+
+    def _close(self):
+        """
+        Closes the socket, if it's open
+        """
+
+        if self._client is not None:
+            self._client.close()
+
+        self._client = None
+        self._reader = None
@@ -0,0 +1,172 @@
+from borealis.service import ServiceSignal
+from borealis.ext.hyprland.event_schema import HyprlandEventSchema, HyprlandFusedEvent
+
+
+class HyprlandSignal(ServiceSignal):
+    """
+    A signal for a Hyprland event whose arguments are only parsed
+    from the event's data once something needs them.
+    """
+
+    schema: HyprlandEventSchema
+    """
+    The schema of the event this signal is for
+    """
+
+    data: str
+    """
+    The unparsed data of the event, everything after the >>
+    """
+
+    _args: tuple | None
+    """
+    The parsed arguments, None until they are first needed
+    """
+
+    def __init__(self, schema: HyprlandEventSchema, data: str):
+        """
+        Creates a new signal for a Hyprland event without parsing it
+
+        Args:
+            schema (HyprlandEventSchema): The schema of the event
+            data (str): The data of the event
+        """
+        self.signal = schema.name
+        self.schema = schema
+        self.data = data
+        self._args = None
+
+    @property
+    def args(self) -> tuple:
+        """
+        The arguments of this signal, parsed on first access
+
+        Raises:
+            ValueError: If the event's data is malformed
+        """
+        if self._args is None:
+            self._args = self.schema.decode(self.data)
+
+        return self._args
+
+    @property
+    def scope(self) -> str | None:
+        """
+        The monitor this event happened on, if the event names one
+        """
+        if self.schema.monitor_field is None:
+            return None
+
+        return self.args[self.schema.monitor_field]
+
+    def get_coalesce_key(self, index: int | None) -> tuple:
+        """
+        Returns what identifies this signal when coalescing, taken from the
+        raw fields of the event so that coalescing doesn't parse it.
+
+        Args:
+            index (int | None): The index of the field to key by, None to only key by scope
+
+        Raises:
+            ValueError: If the event's data is malformed
+
+        Returns:
+            tuple: The raw monitor field of this signal and the field it's keyed by
+        """
+        schema = self.schema
+        scope = None
+
+        if schema.monitor_field is not None:
+            scope = schema.split_field(self.data, schema.monitor_field)
+
+        if index is None:
+            return (scope,)
+
+        return (scope, schema.split_field(self.data, index))
+
+    def get_coalesce_args(self) -> tuple:
+        """
+        Returns the raw data of this signal, equal data parses into equal arguments
+        """
+        return (self.data,)
+
+
+class FusedHyprlandSignal(ServiceSignal):
+    """
+    A signal fusing a v1 Hyprland event with the v2 event sent directly
+    after it, emitted once under the v1 event's name.
+    """
+
+    fused: HyprlandFusedEvent
+    """
+    How the events are fused
+    """
+
+    parts: tuple[ServiceSignal, ...]
+    """
+    The signals of the events this signal stands in for, this excludes
+    the v2 signal if it did not follow or is also emitted on its own.
+    """
+
+    _signal: ServiceSignal
+    """
+    The signal of the v1 event
+    """
+
+    _partner: ServiceSignal | None
+    """
+    The signal of the v2 event, None if it did not directly follow
+    """
+
+    _args: tuple | None
+    """
+    The fused arguments, None until they are first needed
+    """
+
+    def __init__(
+        self,
+        fused: HyprlandFusedEvent,
+        signal: ServiceSignal,
+        partner: ServiceSignal | None = None,
+        partner_emitted: bool = False,
+    ):
+        """
+        Creates a new fused signal
+
+        Args:
+            fused (HyprlandFusedEvent): How the events are fused
+            signal (ServiceSignal): The signal of the v1 event
+            partner (ServiceSignal | None, optional): The signal of the v2 event
+            partner_emitted (bool, optional): Whether the v2 signal is also emitted on its own
+        """
+        self.signal = fused.name
+        self.fused = fused
+        self._signal = signal
+        self._partner = partner
+        self._args = None
+
+        if partner is None or partner_emitted:
+            self.parts = (signal,)
+        else:
+            self.parts = (signal, partner)
+
+    @property
+    def args(self) -> tuple:
+        """
+        The fused arguments of this signal, parsed on first access
+
+        Raises:
+            ValueError: If either event's data is malformed
+        """
+        if self._args is None:
+            partner_args = None if self._partner is None else self._partner.args
+            self._args = self.fused.fuse(tuple(self._signal.args), partner_args)
+
+        return self._args
+
+    @property
+    def scope(self) -> str | None:
+        """
+        The scope of the v1 event
+        """
+        return self._signal.scope
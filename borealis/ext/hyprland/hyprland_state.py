@@ -0,0 +1,662 @@
+import logging
+import sys
+from collections.abc import Callable
+from typing import Optional
+from borealis.ext.hyprland.event_schema import parse_address
+
+logger = logging.getLogger(__name__)
+
+
+class HyprlandMonitor:
+    """
+    A monitor (output) known to Hyprland
+    """
+
+    id: int
+    """
+    Hyprland's id of the monitor
+    """
+
+    name: str
+    """
+    The connector name of the monitor, e.g DP-1
+    """
+
+    description: str
+    """
+    The description of the monitor (make, model and serial)
+    """
+
+    active_workspace: int
+    """
+    The id of the workspace currently shown on this monitor
+    """
+
+    special_workspace: int
+    """
+    The id of the special workspace opened on this monitor, -1 if there is none
+    """
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        description: str = "",
+        active_workspace: int = -1,
+        special_workspace: int = -1,
+    ):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.active_workspace = active_workspace
+        self.special_workspace = special_workspace
+
+
+class HyprlandWorkspace:
+    """
+    A workspace known to Hyprland
+    """
+
+    id: int
+    """
+    Hyprland's id of the workspace, special workspaces have negative ids
+    """
+
+    name: str
+    """
+    The name of the workspace
+    """
+
+    monitor: str
+    """
+    The name of the monitor this workspace is on
+    """
+
+    windows: int
+    """
+    The amount of windows on this workspace
+    """
+
+    def __init__(self, id: int, name: str, monitor: str = "", windows: int = 0):
+        self.id = id
+        self.name = name
+        self.monitor = monitor
+        self.windows = windows
+
+
+class HyprlandWindow:
+    """
+    A window (client) known to Hyprland
+    """
+
+    address: str
+    """
+    The 0x prefixed address of the window
+    """
+
+    workspace: int
+    """
+    The id of the workspace the window is on
+    """
+
+    window_class: str
+    """
+    The class of the window
+    """
+
+    title: str
+    """
+    The title of the window
+    """
+
+    floating: bool
+    """
+    Whether the window is floating
+    """
+
+    fullscreen: bool
+    """
+    Whether the window is fullscreen
+    """
+
+    pinned: bool
+    """
+    Whether the window is pinned
+    """
+
+    urgent: bool
+    """
+    Whether the window has requested attention since it was last focused
+    """
+
+    def __init__(
+        self,
+        address: str,
+        workspace: int,
+        window_class: str = "",
+        title: str = "",
+        floating: bool = False,
+        fullscreen: bool = False,
+        pinned: bool = False,
+    ):
+        self.address = address
+        self.workspace = workspace
+        self.window_class = window_class
+        self.title = title
+        self.floating = floating
+        self.fullscreen = fullscreen
+        self.pinned = pinned
+        self.urgent = False
+
+
+class HyprlandState:
+    """
+    In-memory model of Hyprland's monitors, workspaces and windows.
+
+    Seeded from a single snapshot and then kept up to date by applying
+    socket2 events to it, each event costs O(1) to apply.
+
+    The state is only modified on the main thread so widgets may read
+    it synchronously from their handlers.
+    """
+
+    WINDOW = "window"
+    """
+    Change kind for windows, keyed by address
+    """
+
+    WORKSPACE = "workspace"
+    """
+    Change kind for workspaces, keyed by id
+    """
+
+    MONITOR = "monitor"
+    """
+    Change kind for monitors, keyed by name
+    """
+
+    FOCUS = "focus"
+    """
+    Change kind for the focused monitor or active window, keyed by None
+    """
+
+    monitors: dict[str, HyprlandMonitor]
+    """
+    Monitors by their name
+    """
+
+    workspaces: dict[int, HyprlandWorkspace]
+    """
+    Workspaces by their id
+    """
+
+    windows: dict[str, HyprlandWindow]
+    """
+    Windows by their address
+    """
+
+    focused_monitor: str
+    """
+    The name of the focused monitor
+    """
+
+    active_window: str
+    """
+    The address of the focused window, empty if no window is focused
+    """
+
+    _workspace_ids: dict[str, int]
+    """
+    Workspace ids by their name, some events only refer to workspaces by name
+    """
+
+    _subscribers: dict[tuple[str, any], list[Callable]]
+    """
+    Change callbacks by their kind and the key of the entity
+    """
+
+    _handlers: dict[str, Callable]
+    """
+    The method applying each event by the name of the event
+    """
+
+    def __init__(self):
+        """
+        Creates a new empty state
+        """
+        self.monitors = {}
+        self.workspaces = {}
+        self.windows = {}
+        self.focused_monitor = ""
+        self.active_window = ""
+        self._workspace_ids = {}
+        self._subscribers = {}
+
+        self._handlers = {
+            "openwindow": self._on_openwindow,
+            "closewindow": self._on_closewindow,
+            "movewindowv2": self._on_movewindowv2,
+            "activewindowv2": self._on_activewindowv2,
+            "windowtitlev2": self._on_windowtitlev2,
+            "changefloatingmode": self._on_changefloatingmode,
+            "fullscreen": self._on_fullscreen,
+            "pin": self._on_pin,
+            "urgent": self._on_urgent,
+            "workspacev2": self._on_workspacev2,
+            "focusedmonv2": self._on_focusedmonv2,
+            "createworkspacev2": self._on_createworkspacev2,
+            "destroyworkspacev2": self._on_destroyworkspacev2,
+            "moveworkspacev2": self._on_moveworkspacev2,
+            "renameworkspace": self._on_renameworkspace,
+            "activespecialv2": self._on_activespecialv2,
+            "monitoraddedv2": self._on_monitoraddedv2,
+            "monitorremoved": self._on_monitorremoved,
+        }
+
+    def get_events(self) -> set[str]:
+        """
+        Returns the names of the events this state is updated by
+        """
+        return set(self._handlers.keys())
+
+    def subscribe(self, kind: str, key: any, callback: Callable) -> tuple:
+        """
+        Subscribes to changes of a single entity, or all entities of a kind.
+
+        The callback is called on the main thread with the key and the
+        entity after it changed, the entity is None if it was removed.
+
+        Args:
+            kind (str): One of WINDOW, WORKSPACE, MONITOR or FOCUS
+            key (any): The key of the entity, or None for every entity of this kind
+            callback (Callable): The change callback
+
+        Returns:
+            tuple: A handle for unsubscribing
+        """
+        self._subscribers.setdefault((kind, key), []).append(callback)
+        return (kind, key, callback)
+
+    def unsubscribe(self, handle: tuple):
+        """
+        Removes a subscription made with subscribe
+
+        Args:
+            handle (tuple): The handle returned by subscribe
+        """
+        kind, key, callback = handle
+
+        callbacks = self._subscribers.get((kind, key))
+        if callbacks is None or callback not in callbacks:
+            return
+
+        callbacks.remove(callback)
+        if not callbacks:
+            del self._subscribers[(kind, key)]
+
+    def _notify(self, kind: str, key: any, entity: any):
+        """
+        Calls the subscribers of an entity and its kind
+
+        Args:
+            kind (str): The kind of the entity
+            key (any): The key of the entity
+            entity (any): The entity, None if it was removed
+        """
+        # Keyless kinds (e.g FOCUS) only have the wildcard subscribers
+        if key is None:
+            subscriber_keys = ((kind, None),)
+        else:
+            subscriber_keys = ((kind, key), (kind, None))
+
+        for subscriber_key in subscriber_keys:
+            for callback in tuple(self._subscribers.get(subscriber_key, ())):
+                try:
+                    callback(key, entity)
+                except Exception:
+                    logger.exception(f"Hyprland state subscriber failed for {kind}")
+
+    def seed(
+        self,
+        monitors: list[dict],
+        workspaces: list[dict],
+        clients: list[dict],
+        active_window: dict,
+    ):
+        """
+        Replaces the state with a snapshot from hyprctl's json queries,
+        notifying every subscriber.
+
+        Args:
+            monitors (list[dict]): The reply of j/monitors
+            workspaces (list[dict]): The reply of j/workspaces
+            clients (list[dict]): The reply of j/clients
+            active_window (dict): The reply of j/activewindow
+        """
+        self.monitors = {}
+        self.workspaces = {}
+        self.windows = {}
+        self._workspace_ids = {}
+
+        for monitor in monitors:
+            name = sys.intern(monitor["name"])
+            self.monitors[name] = HyprlandMonitor(
+                monitor["id"],
+                name,
+                monitor.get("description", ""),
+                monitor.get("activeWorkspace", {}).get("id", -1),
+                monitor.get("specialWorkspace", {}).get("id", 0) or -1,
+            )
+
+            if monitor.get("focused"):
+                self.focused_monitor = name
+
+        for workspace in workspaces:
+            name = sys.intern(workspace["name"])
+            self.workspaces[workspace["id"]] = HyprlandWorkspace(
+                workspace["id"],
+                name,
+                sys.intern(workspace.get("monitor", "")),
+                workspace.get("windows", 0),
+            )
+            self._workspace_ids[name] = workspace["id"]
+
+        for client in clients:
+            address = parse_address(client["address"])
+            self.windows[address] = HyprlandWindow(
+                address,
+                client.get("workspace", {}).get("id", -1),
+                sys.intern(client.get("class", "")),
+                client.get("title", ""),
+                client.get("floating", False),
+                bool(client.get("fullscreen", False)),
+                client.get("pinned", False),
+            )
+
+        self.active_window = parse_address(active_window.get("address", ""))
+
+        for name, monitor in self.monitors.items():
+            self._notify(self.MONITOR, name, monitor)
+
+        for id, workspace in self.workspaces.items():
+            self._notify(self.WORKSPACE, id, workspace)
+
+        for address, window in self.windows.items():
+            self._notify(self.WINDOW, address, window)
+
+        self._notify(self.FOCUS, None, self)
+
+    def snapshot(self) -> dict[str, any]:
+        """
+        Returns the state in the same shape as hyprctl's json queries,
+        such that it can be passed to seed of another state.
+
+        Returns:
+            dict[str, any]: The monitors, workspaces, clients and activewindow
+        """
+
+        def workspace_ref(workspace_id: int) -> dict:
+            workspace = self.workspaces.get(workspace_id)
+            return {
+                "id": workspace_id,
+                "name": workspace.name if workspace is not None else "",
+            }
+
+        return {
+            "monitors": [
+                {
+                    "id": monitor.id,
+                    "name": monitor.name,
+                    "description": monitor.description,
+                    "focused": monitor.name == self.focused_monitor,
+                    "activeWorkspace": workspace_ref(monitor.active_workspace),
+                    "specialWorkspace": workspace_ref(monitor.special_workspace),
+                }
+                for monitor in self.monitors.values()
+            ],
+            "workspaces": [
+                {
+                    "id": workspace.id,
+                    "name": workspace.name,
+                    "monitor": workspace.monitor,
+                    "windows": workspace.windows,
+                }
+                for workspace in self.workspaces.values()
+            ],
+            "clients": [
+                {
+                    "address": window.address,
+                    "workspace": workspace_ref(window.workspace),
+                    "class": window.window_class,
+                    "title": window.title,
+                    "floating": window.floating,
+                    "fullscreen": window.fullscreen,
+                    "pinned": window.pinned,
+                }
+                for window in self.windows.values()
+            ],
+            "activewindow": (
+                {"address": self.active_window} if self.active_window else {}
+            ),
+        }
+
+    def apply(self, event: str, args: tuple):
+        """
+        Applies a decoded socket2 event to this state
+
+        Args:
+            event (str): The name of the event
+            args (tuple): The decoded arguments of the event
+        """
+        handler = self._handlers.get(event)
+        if handler is not None:
+            handler(*args)
+
+    def _move_window(self, window: HyprlandWindow, workspace_id: int):
+        """
+        Moves a window onto a workspace, keeping window counts up to date
+        """
+        old_workspace = self.workspaces.get(window.workspace)
+        if old_workspace is not None:
+            old_workspace.windows -= 1
+            self._notify(self.WORKSPACE, old_workspace.id, old_workspace)
+
+        window.workspace = workspace_id
+
+        new_workspace = self.workspaces.get(workspace_id)
+        if new_workspace is not None:
+            new_workspace.windows += 1
+            self._notify(self.WORKSPACE, workspace_id, new_workspace)
+
+    def _on_openwindow(
+        self, address: str, workspace: str, window_class: str, title: str
+    ):
+        workspace_id = self._workspace_ids.get(workspace, -1)
+
+        # The window may already be known if it was in the snapshot
+        window = self.windows.get(address)
+        if window is None:
+            window = HyprlandWindow(address, -1)
+            self.windows[address] = window
+
+        window.window_class = window_class
+        window.title = title
+
+        if window.workspace != workspace_id:
+            self._move_window(window, workspace_id)
+
+        self._notify(self.WINDOW, address, window)
+
+    def _on_closewindow(self, address: str):
+        window = self.windows.pop(address, None)
+        if window is None:
+            return
+
+        workspace = self.workspaces.get(window.workspace)
+        if workspace is not None:
+            workspace.windows -= 1
+            self._notify(self.WORKSPACE, workspace.id, workspace)
+
+        self._notify(self.WINDOW, address, None)
+
+        if self.active_window == address:
+            self.active_window = ""
+            self._notify(self.FOCUS, None, self)
+
+    def _on_movewindowv2(self, address: str, workspace_id: int, workspace: str):
+        window = self.windows.get(address)
+        if window is None or window.workspace == workspace_id:
+            return
+
+        self._move_window(window, workspace_id)
+        self._notify(self.WINDOW, address, window)
+
+    def _on_activewindowv2(self, address: str):
+        self.active_window = address
+
+        window = self.windows.get(address)
+        if window is not None and window.urgent:
+            window.urgent = False
+            self._notify(self.WINDOW, address, window)
+
+        self._notify(self.FOCUS, None, self)
+
+    def _on_windowtitlev2(self, address: str, title: str):
+        window = self.windows.get(address)
+        if window is None or window.title == title:
+            return
+
+        window.title = title
+        self._notify(self.WINDOW, address, window)
+
+    def _on_changefloatingmode(self, address: str, floating: bool):
+        window = self.windows.get(address)
+        if window is None:
+            return
+
+        window.floating = floating
+        self._notify(self.WINDOW, address, window)
+
+    def _on_fullscreen(self, fullscreen: bool):
+        window = self.windows.get(self.active_window)
+        if window is None:
+            return
+
+        window.fullscreen = fullscreen
+        self._notify(self.WINDOW, window.address, window)
+
+    def _on_pin(self, address: str, pinned: bool):
+        window = self.windows.get(address)
+        if window is None:
+            return
+
+        window.pinned = pinned
+        self._notify(self.WINDOW, address, window)
+
+    def _on_urgent(self, address: str):
+        window = self.windows.get(address)
+        if window is None:
+            return
+
+        window.urgent = True
+        self._notify(self.WINDOW, address, window)
+
+    def _on_workspacev2(self, workspace_id: int, workspace: str):
+        monitor = self.monitors.get(self.focused_monitor)
+        if monitor is None:
+            return
+
+        monitor.active_workspace = workspace_id
+        self._notify(self.MONITOR, monitor.name, monitor)
+
+    def _on_focusedmonv2(self, monitor_name: str, workspace_id: int):
+        self.focused_monitor = monitor_name
+
+        monitor = self.monitors.get(monitor_name)
+        if monitor is not None:
+            monitor.active_workspace = workspace_id
+            self._notify(self.MONITOR, monitor_name, monitor)
+
+        self._notify(self.FOCUS, None, self)
+
+    def _on_createworkspacev2(self, workspace_id: int, workspace: str):
+        if workspace_id in self.workspaces:
+            return
+
+        # New workspaces are created on the focused monitor, a moveworkspace
+        # event follows if that is not the case.
+        self.workspaces[workspace_id] = HyprlandWorkspace(
+            workspace_id, workspace, self.focused_monitor
+        )
+        self._workspace_ids[workspace] = workspace_id
+
+        self._notify(self.WORKSPACE, workspace_id, self.workspaces[workspace_id])
+
+    def _on_destroyworkspacev2(self, workspace_id: int, workspace: str):
+        removed = self.workspaces.pop(workspace_id, None)
+        if removed is None:
+            return
+
+        self._workspace_ids.pop(removed.name, None)
+        self._notify(self.WORKSPACE, workspace_id, None)
+
+    def _on_moveworkspacev2(self, workspace_id: int, workspace: str, monitor: str):
+        moved = self.workspaces.get(workspace_id)
+        if moved is None:
+            return
+
+        moved.monitor = monitor
+        self._notify(self.WORKSPACE, workspace_id, moved)
+
+    def _on_renameworkspace(self, workspace_id: int, name: str):
+        renamed = self.workspaces.get(workspace_id)
+        if renamed is None:
+            return
+
+        self._workspace_ids.pop(renamed.name, None)
+        self._workspace_ids[name] = workspace_id
+        renamed.name = name
+
+        self._notify(self.WORKSPACE, workspace_id, renamed)
+
+    def _on_activespecialv2(self, workspace_id: int, workspace: str, monitor_name: str):
+        monitor = self.monitors.get(monitor_name)
+        if monitor is None:
+            return
+
+        monitor.special_workspace = workspace_id
+        self._notify(self.MONITOR, monitor_name, monitor)
+
+    def _on_monitoraddedv2(self, monitor_id: int, monitor_name: str, description: str):
+        self.monitors[monitor_name] = HyprlandMonitor(
+            monitor_id, monitor_name, description
+        )
+        self._notify(self.MONITOR, monitor_name, self.monitors[monitor_name])
+
+    def _on_monitorremoved(self, monitor_name: str):
+        if self.monitors.pop(monitor_name, None) is None:
+            return
+
+        self._notify(self.MONITOR, monitor_name, None)
+
+    def get_active_window(self) -> Optional[HyprlandWindow]:
+        """
+        Returns the focused window, if any
+        """
+        return self.windows.get(self.active_window)
+
+    def get_workspace_windows(self, workspace_id: int) -> list[HyprlandWindow]:
+        """
+        Returns the windows on a workspace
+
+        Args:
+            workspace_id (int): The id of the workspace
+
+        Returns:
+            list[HyprlandWindow]: The windows on that workspace
+        """
+        return [
+            window
+            for window in self.windows.values()
+            if window.workspace == workspace_id
+        ]
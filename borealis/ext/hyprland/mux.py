@@ -0,0 +1,334 @@
+"""
+borealis-hyprmux, a daemon sharing one Hyprland socket2 connection and
+its decoded state between several borealis processes.
+
+The mux decodes every event once and fans it out to its clients over
+a unix socket as newline delimited json. A client first recieves a
+snapshot of the state as a line of {"snapshot": {...}} (in the shape
+of hyprctl's json queries), followed by each event as a line of
+["EVENT", ARG, ...].
+
+HyprlandService prefers the mux whenever its socket exists.
+
+Usage:
+    python -m borealis.ext.hyprland.mux
+"""
+
+import errno
+import json
+import logging
+import os
+import selectors
+import socket
+from typing import Optional
+from borealis.ext.hyprland.event_schema import HYPRLAND_EVENTS
+from borealis.ext.hyprland.hyprctl import hyprctl_request, parse_json_replies
+from borealis.ext.hyprland.hyprland_state import HyprlandState
+from borealis.ext.hyprland.socket2_reader import Socket2Reader
+
+logger = logging.getLogger(__name__)
+
+MUX_SOCKET_NAME = ".borealis-mux.sock"
+"""
+Name of the mux's socket, created alongside Hyprland's sockets
+"""
+
+
+def encode_snapshot(state: HyprlandState) -> bytes:
+    """
+    Encodes the snapshot line sent to newly connected clients
+
+    Args:
+        state (HyprlandState): The state to snapshot
+
+    Returns:
+        bytes: The encoded line
+    """
+    return (json.dumps({"snapshot": state.snapshot()}) + "\n").encode()
+
+
+def encode_event(event: str, args: tuple) -> bytes:
+    """
+    Encodes an event line sent to clients
+
+    Args:
+        event (str): The name of the event
+        args (tuple): The decoded arguments of the event
+
+    Returns:
+        bytes: The encoded line
+    """
+    return (json.dumps([event, *args]) + "\n").encode()
+
+
+def read_event_name(line: str) -> str:
+    """
+    Reads only the name of an event line, without decoding the rest of it
+
+    Args:
+        line (str): The event line, as ["EVENT", ARG, ...]
+
+    Returns:
+        str: The name of the event
+    """
+    return line[2 : line.find('"', 2)]
+
+
+def get_mux_path(instance_dir: str) -> str:
+    """
+    Returns the path of the mux socket for a Hyprland instance
+
+    Args:
+        instance_dir (str): $XDG_RUNTIME_DIR/hypr/$HYPRLAND_INSTANCE_SIGNATURE
+    """
+    return os.path.join(instance_dir, MUX_SOCKET_NAME)
+
+
+class HyprlandMux:
+    """
+    Holds a single socket2 connection and the state decoded from it,
+    fanning decoded events out to local clients.
+    """
+
+    socket2_path: str
+    """
+    Path to Hyprland's socket2
+    """
+
+    socket1_path: str
+    """
+    Path to Hyprland's socket1, used for the initial snapshot
+    """
+
+    mux_path: str
+    """
+    Path of the socket clients connect to
+    """
+
+    max_backlog: int = 4 * 1024 * 1024
+    """
+    The amount of bytes that may be queued for a client that isn't reading
+    before it is disconnected
+    """
+
+    state: HyprlandState
+    """
+    The state decoded from socket2
+    """
+
+    _selector: selectors.DefaultSelector
+    """
+    Selector over socket2, the mux socket and every client
+    """
+
+    _clients: dict[socket.socket, bytearray]
+    """
+    Connected clients along with the bytes waiting to be sent to them
+    """
+
+    def __init__(self, instance_dir: str):
+        """
+        Creates a new mux for a Hyprland instance
+
+        Args:
+            instance_dir (str): $XDG_RUNTIME_DIR/hypr/$HYPRLAND_INSTANCE_SIGNATURE
+        """
+        self.socket2_path = os.path.join(instance_dir, ".socket2.sock")
+        self.socket1_path = os.path.join(instance_dir, ".socket.sock")
+        self.mux_path = get_mux_path(instance_dir)
+        self.state = HyprlandState()
+        self._selector = selectors.DefaultSelector()
+        self._clients = {}
+
+    def run(self):
+        """
+        Runs the mux until Hyprland closes socket2
+        """
+        hyprland_client: socket.socket
+        server: socket.socket
+        with (
+            socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as hyprland_client,
+            socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server,
+        ):
+            hyprland_client.connect(self.socket2_path)
+            reader = Socket2Reader(hyprland_client)
+
+            reply = hyprctl_request(
+                self.socket1_path,
+                "[[BATCH]]j/monitors;j/workspaces;j/clients;j/activewindow",
+            )
+            self.state.seed(*parse_json_replies(reply))
+
+            self._remove_stale_socket()
+            server.bind(self.mux_path)
+            server.listen()
+            server.setblocking(False)
+
+            self._selector.register(hyprland_client, selectors.EVENT_READ, "socket2")
+            self._selector.register(server, selectors.EVENT_READ, "server")
+
+            try:
+                self._loop(reader, server)
+            finally:
+                os.unlink(self.mux_path)
+
+                for client in list(self._clients):
+                    self._disconnect(client)
+
+    def _remove_stale_socket(self):
+        """
+        Removes the socket of a mux that died, which would stop us binding.
+        A socket which is still accepted on belongs to a running mux.
+
+        Raises:
+            OSError: If another mux is running, or the socket can't be probed
+        """
+        probe: socket.socket
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.mux_path)
+            except FileNotFoundError:
+                return
+            except ConnectionRefusedError:
+                # Nothing listens on it anymore
+                os.unlink(self.mux_path)
+                return
+
+        raise OSError(
+            errno.EADDRINUSE, "borealis-hyprmux is already running", self.mux_path
+        )
+
+    def _loop(self, reader: Socket2Reader, server: socket.socket):
+        """
+        Services socket2, new clients and pending writes until socket2 closes
+        """
+        while True:
+            for key, mask in self._selector.select():
+                if key.data == "socket2":
+                    events = reader.read_events()
+
+                    if events is None:
+                        logger.warning("Hyprland closed socket2, stopping mux")
+                        return
+
+                    self._broadcast(events)
+
+                elif key.data == "server":
+                    self._accept(server)
+
+                elif key.fileobj not in self._clients:
+                    # Disconnected earlier in this iteration
+                    continue
+
+                elif mask & selectors.EVENT_READ:
+                    # Clients never send anything, so this is a disconnect
+                    self._disconnect(key.fileobj)
+
+                else:
+                    self._flush(key.fileobj)
+
+    def _accept(self, server: socket.socket):
+        """
+        Accepts a client, sending it the snapshot to catch up with
+        """
+        try:
+            client, _ = server.accept()
+        except BlockingIOError:
+            return
+
+        client.setblocking(False)
+        self._clients[client] = bytearray()
+        self._selector.register(client, selectors.EVENT_READ)
+
+        self._send(client, encode_snapshot(self.state))
+
+    def _broadcast(self, events: list[str]):
+        """
+        Decodes and applies events to the state, then sends them to every client
+        """
+        lines = []
+
+        for event in events:
+            event_name, _, event_data = event.partition(">>")
+
+            schema = HYPRLAND_EVENTS.get(event_name)
+            if schema is None:
+                continue
+
+            try:
+                args = schema.decode(event_data)
+            except ValueError as e:
+                logger.warning(f"Dropping malformed hyprland event {event!r}: {e}")
+                continue
+
+            self.state.apply(event_name, args)
+            lines.append(encode_event(event_name, args))
+
+        if not lines:
+            return
+
+        data = b"".join(lines)
+        for client in list(self._clients):
+            if client in self._clients:
+                self._send(client, data)
+
+    def _send(self, client: socket.socket, data: bytes):
+        """
+        Queues data for a client and writes as much as possible now
+        """
+        pending = self._clients[client]
+        pending += data
+
+        if len(pending) > self.max_backlog:
+            logger.warning("Disconnecting hyprmux client which stopped reading")
+            self._disconnect(client)
+            return
+
+        self._flush(client)
+
+    def _flush(self, client: socket.socket):
+        """
+        Writes a client's pending data, waiting for it to be writable if needed
+        """
+        pending = self._clients[client]
+
+        try:
+            sent = client.send(pending)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._disconnect(client)
+            return
+
+        del pending[:sent]
+
+        events = selectors.EVENT_READ
+        if pending:
+            events |= selectors.EVENT_WRITE
+
+        self._selector.modify(client, events)
+
+    def _disconnect(self, client: socket.socket):
+        """
+        Disconnects a client
+        """
+        self._selector.unregister(client)
+        self._clients.pop(client, None)
+        client.close()
+
+
+def main(instance_dir: Optional[str] = None):
+    logging.basicConfig(level=logging.INFO)
+
+    if instance_dir is None:
+        instance_dir = os.path.join(
+            os.environ["XDG_RUNTIME_DIR"],
+            "hypr",
+            os.environ["HYPRLAND_INSTANCE_SIGNATURE"],
+        )
+
+    HyprlandMux(instance_dir).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,633 @@
+"""
+Record/replay harness for Hyprland's socket2, along with a fake
+compositor serving .socket2.sock/.socket.sock for load testing
+the Hyprland path without a live compositor.
+
+Usage:
+    python -m borealis.ext.hyprland.replay record OUTPUT [--seconds N]
+    python -m borealis.ext.hyprland.replay serve RUNTIME_DIR [--replay FILE] [--speed N] [--storm N]
+    python -m borealis.ext.hyprland.replay bench [--replay FILE] [--storm N] [--widgets N]
+"""
+
+import argparse
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+RECORDING_MAGIC = b"BHRC\x01"
+"""
+Header of a recording file, followed by the records
+"""
+
+_RECORD_HEADER = struct.Struct("<II")
+"""
+Header of a single record, the microseconds since the previous
+record followed by the length of the chunk.
+"""
+
+
+def write_record(file, delta: float, chunk: bytes):
+    """
+    Writes a single chunk of the socket2 byte stream to a recording
+
+    Args:
+        file: The binary file being recorded to
+        delta (float): Seconds since the previous chunk
+        chunk (bytes): The bytes received from socket2
+    """
+    delta_us = min(int(delta * 1_000_000), 0xFFFFFFFF)
+    file.write(_RECORD_HEADER.pack(delta_us, len(chunk)))
+    file.write(chunk)
+
+
+def read_recording(path: str) -> Iterator[tuple[float, bytes]]:
+    """
+    Reads the chunks of a recording
+
+    Args:
+        path (str): Path to the recording
+
+    Raises:
+        ValueError: If the file is not a recording
+
+    Yields:
+        tuple[float, bytes]: Seconds since the previous chunk and the chunk
+    """
+    with open(path, "rb") as file:
+        if file.read(len(RECORDING_MAGIC)) != RECORDING_MAGIC:
+            raise ValueError(f"{path} is not a socket2 recording")
+
+        while header := file.read(_RECORD_HEADER.size):
+            delta_us, length = _RECORD_HEADER.unpack(header)
+            yield delta_us / 1_000_000, file.read(length)
+
+
+def record(socket2_path: str, output: str, seconds: Optional[float] = None) -> int:
+    """
+    Records the raw socket2 byte stream with timestamps until the
+    duration has passed or the connection closes.
+
+    Args:
+        socket2_path (str): Path to Hyprland's .socket2.sock
+        output (str): Path of the recording to write
+        seconds (Optional[float], optional): How long to record for, forever if None
+
+    Returns:
+        int: The amount of bytes recorded
+    """
+    recorded = 0
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client, open(
+        output, "wb"
+    ) as file:
+        client.connect(socket2_path)
+        file.write(RECORDING_MAGIC)
+
+        start = last = time.monotonic()
+        while seconds is None or last - start < seconds:
+            if seconds is not None:
+                client.settimeout(max(seconds - (last - start), 0.001))
+
+            try:
+                chunk = client.recv(65536)
+            except socket.timeout:
+                break
+
+            if not chunk:
+                break
+
+            now = time.monotonic()
+            write_record(file, now - last, chunk)
+            last = now
+            recorded += len(chunk)
+
+    return recorded
+
+
+def synthesize_storm(count: int, workspaces: int = 10) -> bytes:
+    """
+    Synthesizes a storm of workspace switching events, with the
+    same events Hyprland sends when switching workspace and focus.
+
+    Args:
+        count (int): The amount of events to synthesize
+        workspaces (int, optional): The amount of workspaces to switch between
+
+    Returns:
+        bytes: The events as they would be sent over socket2
+    """
+    cycle = []
+    for workspace in range(1, workspaces + 1):
+        address = f"{0x55a0c0de0000 + workspace:x}"
+        cycle += [
+            f"workspace>>{workspace}\n",
+            f"workspacev2>>{workspace},{workspace}\n",
+            f"activewindow>>kitty,~/src, workspace {workspace}\n",
+            f"activewindowv2>>{address}\n",
+            f"windowtitlev2>>{address},~/src, workspace {workspace}\n",
+            f"activelayout>>at-translated-set-2-keyboard,English (US)\n",
+        ]
+
+    events = (cycle * (count // len(cycle) + 1))[:count]
+    return "".join(events).encode()
+
+
+class FakeHyprland:
+    """
+    A fake Hyprland serving socket2 and socket1 from a directory,
+    laid out as $XDG_RUNTIME_DIR/hypr/$HYPRLAND_INSTANCE_SIGNATURE.
+
+    socket2 clients receive whatever is broadcast, replayed or stormed,
+    socket1 requests are answered from canned replies.
+    """
+
+    runtime_dir: str
+    """
+    The directory standing in for $XDG_RUNTIME_DIR
+    """
+
+    signature: str
+    """
+    The instance signature standing in for $HYPRLAND_INSTANCE_SIGNATURE
+    """
+
+    replies: dict[str, str]
+    """
+    Canned socket1 replies by request, e.g {"j/clients": "[]"}
+    """
+
+    requests: list[str]
+    """
+    Every socket1 request received, in order
+    """
+
+    client_timeout: Optional[float] = None
+    """
+    Seconds a socket2 client may hold up a broadcast before it's dropped,
+    like Hyprland dropping clients which stop reading. None waits for it.
+    """
+
+    on_broadcast: Optional[Callable[[bytes], any]] = None
+    """
+    Called with each chunk right before it's broadcast, e.g to timestamp events
+    """
+
+    _socket2_clients: list[socket.socket]
+    """
+    The connected socket2 clients
+    """
+
+    _servers: list[socket.socket]
+    """
+    The listening sockets
+    """
+
+    _clients_changed: threading.Condition
+    """
+    Notified whenever a socket2 client connects
+    """
+
+    def __init__(self, runtime_dir: str, signature: str = "borealis-fake"):
+        """
+        Creates a fake Hyprland, call start to begin serving.
+
+        Args:
+            runtime_dir (str): The directory standing in for $XDG_RUNTIME_DIR
+            signature (str, optional): The instance signature
+        """
+        self.runtime_dir = runtime_dir
+        self.signature = signature
+        self.replies = {
+            "j/monitors": "[]",
+            "j/workspaces": "[]",
+            "j/clients": "[]",
+            "j/activewindow": "{}",
+        }
+        self.requests = []
+        self._socket2_clients = []
+        self._servers = []
+        self._clients_changed = threading.Condition()
+
+    @property
+    def instance_dir(self) -> str:
+        """
+        The directory the sockets are created in
+        """
+        return os.path.join(self.runtime_dir, "hypr", self.signature)
+
+    @property
+    def socket2_path(self) -> str:
+        """
+        Path to the fake's socket2
+        """
+        return os.path.join(self.instance_dir, ".socket2.sock")
+
+    @property
+    def socket1_path(self) -> str:
+        """
+        Path to the fake's socket1
+        """
+        return os.path.join(self.instance_dir, ".socket.sock")
+
+    def environ(self) -> dict[str, str]:
+        """
+        Returns the environment variables that point HyprlandService at
+        this fake, these must be set before borealis is imported.
+        """
+        return {
+            "XDG_RUNTIME_DIR": self.runtime_dir,
+            "HYPRLAND_INSTANCE_SIGNATURE": self.signature,
+        }
+
+    def start(self) -> "FakeHyprland":
+        """
+        Starts serving both sockets
+        """
+        os.makedirs(self.instance_dir, exist_ok=True)
+
+        for path, accept in (
+            (self.socket2_path, self._accept_socket2),
+            (self.socket1_path, self._accept_socket1),
+        ):
+            if os.path.exists(path):
+                os.unlink(path)
+
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(path)
+            server.listen()
+            self._servers.append(server)
+
+            threading.Thread(target=accept, args=(server,), daemon=True).start()
+
+        return self
+
+    def stop(self):
+        """
+        Stops serving, disconnecting every client
+        """
+        for server in self._servers:
+            server.close()
+
+        with self._clients_changed:
+            for client in self._socket2_clients:
+                client.close()
+            self._socket2_clients.clear()
+
+        for path in (self.socket2_path, self.socket1_path):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def __enter__(self) -> "FakeHyprland":
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _accept_socket2(self, server: socket.socket):
+        """
+        Accepts socket2 clients until the server is closed
+        """
+        while True:
+            try:
+                client, _ = server.accept()
+            except OSError:
+                return
+
+            if self.client_timeout is not None:
+                client.settimeout(self.client_timeout)
+
+            with self._clients_changed:
+                self._socket2_clients.append(client)
+                self._clients_changed.notify_all()
+
+    def _accept_socket1(self, server: socket.socket):
+        """
+        Answers socket1 requests until the server is closed
+        """
+        while True:
+            try:
+                client, _ = server.accept()
+            except OSError:
+                return
+
+            with client:
+                request = client.recv(65536).decode(errors="replace")
+                self.requests.append(request)
+                client.sendall(self.reply(request).encode())
+
+    def reply(self, request: str) -> str:
+        """
+        Returns the reply to a socket1 request, including [[BATCH]] requests
+
+        Args:
+            request (str): The request
+
+        Returns:
+            str: The canned reply, ok for dispatches and unknown request otherwise
+        """
+        if request.startswith("[[BATCH]]"):
+            commands = request.removeprefix("[[BATCH]]").split(";")
+            return "\n\n\n".join(self.reply(command.strip()) for command in commands)
+
+        if request in self.replies:
+            return self.replies[request]
+
+        if request.startswith("dispatch "):
+            return "ok"
+
+        return "unknown request"
+
+    def wait_for_clients(self, count: int = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until a number of socket2 clients are connected
+
+        Args:
+            count (int, optional): The amount of clients to wait for
+            timeout (Optional[float], optional): Seconds to wait, forever if None
+
+        Returns:
+            bool: True if the clients connected before the timeout
+        """
+        with self._clients_changed:
+            return self._clients_changed.wait_for(
+                lambda: len(self._socket2_clients) >= count, timeout
+            )
+
+    def broadcast(self, data: bytes):
+        """
+        Sends bytes to every socket2 client, dropping clients which
+        disconnected or didn't read within client_timeout.
+
+        Args:
+            data (bytes): The raw socket2 bytes
+        """
+        if self.on_broadcast is not None:
+            self.on_broadcast(data)
+
+        with self._clients_changed:
+            clients = list(self._socket2_clients)
+
+        # Sent without the lock, so a slow client doesn't hold up others connecting
+        dropped = []
+        for client in clients:
+            try:
+                client.sendall(data)
+            except OSError:
+                dropped.append(client)
+
+        if not dropped:
+            return
+
+        with self._clients_changed:
+            for client in dropped:
+                if client in self._socket2_clients:
+                    self._socket2_clients.remove(client)
+                client.close()
+
+    def replay(self, path: str, speed: Optional[float] = 1.0):
+        """
+        Replays a recording to every socket2 client
+
+        Args:
+            path (str): Path to the recording
+            speed (Optional[float], optional): Playback speed, e.g 1 for realtime
+                or 10 for ten times faster. None or 0 replays as fast as possible.
+        """
+        deadline = time.monotonic()
+
+        for delta, chunk in read_recording(path):
+            if speed:
+                deadline += delta / speed
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+            self.broadcast(chunk)
+
+    def storm(self, count: int, chunk_size: int = 4096):
+        """
+        Sends a synthesized storm of events to every socket2 client as fast
+        as possible, in chunks similar to what Hyprland would write.
+
+        Args:
+            count (int): The amount of events to send
+            chunk_size (int, optional): The size of each write
+        """
+        data = memoryview(synthesize_storm(count))
+
+        for offset in range(0, len(data), chunk_size):
+            self.broadcast(data[offset : offset + chunk_size])
+
+
+class _BenchWidget:
+    """
+    Stands in for a widget attached to the service during bench,
+    recording how long each event took to reach it. Real widgets
+    need a display, this only needs the main loop.
+    """
+
+    def __init__(self, sent_at: list[float], latencies: list[float]):
+        self.sent_at = sent_at
+        self.latencies = latencies
+        self.received = 0
+        self.last_received_at = 0.0
+
+    def b_get_monitor(self) -> Optional[str]:
+        return None
+
+    def emit(self, signal: str, *args):
+        now = time.perf_counter()
+
+        if self.received < len(self.sent_at):
+            self.latencies.append(now - self.sent_at[self.received])
+
+        self.received += 1
+        self.last_received_at = now
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """
+    Returns a percentile of sorted values, e.g 0.99 for the 99th
+
+    Args:
+        values (list[float]): The values, sorted
+        fraction (float): The percentile as a fraction
+
+    Returns:
+        float: The value, by the nearest rank
+    """
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def bench(
+    fake: FakeHyprland, send: Callable[[FakeHyprland], any], widgets: int = 4
+) -> tuple[int, float, list[float]]:
+    """
+    Measures the Hyprland path end to end, a HyprlandService reads the
+    fake's socket2 on the runtime and runs each event on widgets attached
+    to every event on the main loop. Coalesced events aren't measured,
+    since they may be collapsed before they run.
+
+    Args:
+        fake (FakeHyprland): A started fake Hyprland
+        send (Callable[[FakeHyprland], any]): Called with the fake to send the events
+        widgets (int, optional): The amount of widgets attached, e.g one per bar
+
+    Returns:
+        tuple[int, float, list[float]]: The amount of events ran on widgets,
+            the seconds taken and the sorted seconds each took to reach a widget
+    """
+    from gi.repository import GLib
+    from borealis.service import ServiceRuntime
+    from borealis.ext.hyprland.event_schema import HYPRLAND_EVENTS
+    from borealis.ext.hyprland.hyprland_service import HyprlandService
+
+    class BenchService(HyprlandService):
+        socket2_path = fake.socket2_path
+        socket1_path = fake.socket1_path
+        prefer_mux = False
+
+    service = BenchService()
+    measured = set(HYPRLAND_EVENTS) - set(service.signal_coalescing)
+
+    # When each measured event was sent, in order
+    sent_at = []
+    pending = b""
+
+    def on_broadcast(chunk: bytes):
+        nonlocal pending
+        lines = (pending + bytes(chunk)).split(b"\n")
+        pending = lines.pop()
+
+        now = time.perf_counter()
+        for line in lines:
+            if line.partition(b">>")[0].decode(errors="replace") in measured:
+                sent_at.append(now)
+
+    fake.on_broadcast = on_broadcast
+
+    latencies = []
+    bench_widgets = [_BenchWidget(sent_at, latencies) for _ in range(widgets)]
+
+    for widget in bench_widgets:
+        for event in measured:
+            service.attach_widget(widget, event)
+
+    loop = GLib.MainLoop()
+    sent = threading.Event()
+    runtime = ServiceRuntime()
+
+    def send_and_close():
+        fake.wait_for_clients(1)
+        send(fake)
+        fake.stop()
+        sent.set()
+
+    last_received = -1
+
+    def check() -> bool:
+        nonlocal last_received
+        received = sum(widget.received for widget in bench_widgets)
+
+        # Done once every event ran, or nothing more runs (e.g malformed events)
+        if sent.is_set() and (
+            received == len(sent_at) * widgets
+            or (received == last_received and not runtime.is_running(service))
+        ):
+            loop.quit()
+            return GLib.SOURCE_REMOVE
+
+        last_received = received
+        return GLib.SOURCE_CONTINUE
+
+    start = time.perf_counter()
+    threading.Thread(target=send_and_close, daemon=True).start()
+    service.set_runtime(runtime)
+
+    GLib.timeout_add(100, check)
+    loop.run()
+
+    ended = max(widget.last_received_at for widget in bench_widgets)
+    seconds = (ended or time.perf_counter()) - start
+    runtime.shutdown()
+    service.hyprctl.close()
+
+    return bench_widgets[0].received, seconds, sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m borealis.ext.hyprland.replay")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="record socket2")
+    record_parser.add_argument("output")
+    record_parser.add_argument("--seconds", type=float)
+
+    for name, help in (("serve", "serve a fake hyprland"), ("bench", "benchmark")):
+        command_parser = commands.add_parser(name, help=help)
+        if name == "serve":
+            command_parser.add_argument("runtime_dir")
+        command_parser.add_argument("--replay")
+        command_parser.add_argument("--speed", type=float, default=0)
+        command_parser.add_argument("--storm", type=int, default=100_000)
+        if name == "bench":
+            command_parser.add_argument("--widgets", type=int, default=4)
+
+    args = parser.parse_args()
+
+    def send(fake: FakeHyprland):
+        if args.replay:
+            fake.replay(args.replay, args.speed)
+        else:
+            fake.storm(args.storm)
+
+    if args.command == "record":
+        signature = os.environ["HYPRLAND_INSTANCE_SIGNATURE"]
+        socket2_path = os.path.join(
+            os.environ["XDG_RUNTIME_DIR"], "hypr", signature, ".socket2.sock"
+        )
+        print(f"Recorded {record(socket2_path, args.output, args.seconds)} bytes")
+
+    elif args.command == "serve":
+        with FakeHyprland(args.runtime_dir) as fake:
+            for key, value in fake.environ().items():
+                print(f"export {key}={value}")
+
+            fake.wait_for_clients(1)
+            send(fake)
+
+    elif args.command == "bench":
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as runtime_dir:
+            events, seconds, latencies = bench(
+                FakeHyprland(runtime_dir).start(), send, args.widgets
+            )
+            print(
+                f"{events} events in {seconds:.3f}s ({events / seconds:.0f} events/s)"
+            )
+
+            if latencies:
+                print(
+                    "dispatch latency "
+                    + " ".join(
+                        f"{label}={percentile(latencies, fraction) * 1000:.2f}ms"
+                        for label, fraction in (
+                            ("p50", 0.5),
+                            ("p90", 0.9),
+                            ("p99", 0.99),
+                            ("max", 1),
+                        )
+                    )
+                )
+
+
+if __name__ == "__main__":
+    main()
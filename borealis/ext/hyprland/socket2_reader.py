@@ -0,0 +1,131 @@
+import logging
+import socket
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Socket2Reader:
+    """
+    Buffered line framing reader for Hyprland's socket2.
+
+    Bytes are received straight into a preallocated buffer, partial
+    events are held between reads and only complete (newline terminated)
+    events are ever decoded.
+    """
+
+    buffer_size: int
+    """
+    The current size of the receive buffer in bytes, this will grow
+    if a single event does not fit inside of it.
+    """
+
+    _socket: socket.socket
+    """
+    The socket being read from
+    """
+
+    _buffer: bytearray
+    """
+    The preallocated receive buffer
+    """
+
+    _view: memoryview
+    """
+    View over the receive buffer, used for receiving without copying
+    """
+
+    _start: int
+    """
+    Offset of the first byte of the oldest incomplete event in the buffer
+    """
+
+    _end: int
+    """
+    Offset one past the last byte received into the buffer
+    """
+
+    def __init__(self, client: socket.socket, buffer_size: int = 65536):
+        """
+        Creates a new reader over a connected socket2 client
+
+        Args:
+            client (socket.socket): The connected socket to read events from
+            buffer_size (int, optional): The initial size of the receive buffer
+        """
+        self._socket = client
+        self.buffer_size = buffer_size
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+
+    def _make_room(self):
+        """
+        Ensures there is free space at the end of the buffer, moving any
+        held partial event to the front or growing the buffer if the
+        partial event fills it entirely.
+        """
+
+        # Nothing held, just rewind.
+        if self._start == self._end:
+            self._start = self._end = 0
+            return
+
+        if self._end < self.buffer_size:
+            return
+
+        held = self._end - self._start
+
+        if self._start == 0:
+            # A single event is larger than our buffer, so grow it.
+            self.buffer_size *= 2
+            logger.debug(f"Growing socket2 buffer to {self.buffer_size} bytes")
+
+            buffer = bytearray(self.buffer_size)
+            buffer[:held] = self._view[:held]
+
+            self._view.release()
+            self._buffer = buffer
+            self._view = memoryview(self._buffer)
+        else:
+            # Move the partial event to the front of the buffer.
+            self._view[:held] = self._view[self._start : self._end]
+
+        self._start = 0
+        self._end = held
+
+    def read_events(self) -> Optional[list[str]]:
+        """
+        Receives once from the socket and returns every event which has
+        been completed by that read.
+
+        Returns:
+            Optional[list[str]]: The completed events (without their newline),
+                which may be empty if only part of an event was received.
+                None is returned once the socket has been closed.
+        """
+
+        self._make_room()
+
+        try:
+            received = self._socket.recv_into(self._view[self._end :])
+        except BlockingIOError:
+            return []
+
+        if received == 0:
+            return None
+
+        self._end += received
+
+        # Only decode up to the final newline, holding the rest.
+        last_newline = self._buffer.rfind(b"\n", self._start, self._end)
+        if last_newline == -1:
+            return []
+
+        events = str(self._view[self._start : last_newline], "utf-8", "replace").split(
+            "\n"
+        )
+        self._start = last_newline + 1
+
+        return events
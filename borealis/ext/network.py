@@ -0,0 +1,625 @@
+"""
+borealis.ext.network
+
+A service for the state, addresses and throughput of network interfaces,
+pushed by the kernel over rtnetlink.
+"""
+
+import errno
+import logging
+import os
+import socket
+import struct
+import time
+from typing import Optional
+from gi.repository import GLib
+from borealis.ext.sysstats import NET_DEV_PATTERN, ProcFile
+from borealis.service import MainLoopService, ServiceAnnotation, ServiceSignal
+
+logger = logging.getLogger(__name__)
+
+NLMSG_HEADER = struct.Struct("=IHHII")
+"""
+Header of each netlink message: length, type, flags, sequence and port
+"""
+
+IFINFOMSG = struct.Struct("=BxHiII")
+"""
+Body of link messages: family, device type, index, flags and change mask
+"""
+
+IFADDRMSG = struct.Struct("=BBBBI")
+"""
+Body of address messages: family, prefix length, flags, scope and index
+"""
+
+RTATTR = struct.Struct("=HH")
+"""
+Header of each attribute following a message body: length and type
+"""
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV6_IFADDR = 0x100
+
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+IFLA_OPERSTATE = 16
+
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+
+IFF_UP = 0x1
+IFF_LOWER_UP = 0x10000
+
+OPERSTATES = (
+    "unknown",
+    "notpresent",
+    "down",
+    "lowerlayerdown",
+    "testing",
+    "dormant",
+    "up",
+)
+"""
+The names of the operational states of a link (IF_OPER_*)
+"""
+
+
+def parse_attributes(data: memoryview) -> dict[int, memoryview]:
+    """
+    Parses the attributes following the body of an rtnetlink message
+
+    Args:
+        data (memoryview): The attributes
+
+    Returns:
+        dict[int, memoryview]: The payload of each attribute by its type
+    """
+    attributes = {}
+    offset = 0
+
+    while offset + RTATTR.size <= len(data):
+        length, attribute_type = RTATTR.unpack_from(data, offset)
+
+        if length < RTATTR.size:
+            break
+
+        attributes[attribute_type] = data[offset + RTATTR.size : offset + length]
+        offset += (length + 3) & ~3
+
+    return attributes
+
+
+def parse_messages(data: bytes) -> list[tuple[int, int, memoryview]]:
+    """
+    Splits a datagram into its netlink messages
+
+    Args:
+        data (bytes): The datagram
+
+    Returns:
+        list[tuple[int, int, memoryview]]: The type, sequence and payload of each message
+    """
+    view = memoryview(data)
+    messages = []
+    offset = 0
+
+    while offset + NLMSG_HEADER.size <= len(view):
+        length, message_type, _, sequence, _ = NLMSG_HEADER.unpack_from(view, offset)
+
+        if length < NLMSG_HEADER.size:
+            break
+
+        messages.append(
+            (message_type, sequence, view[offset + NLMSG_HEADER.size : offset + length])
+        )
+        offset += (length + 3) & ~3
+
+    return messages
+
+
+class NetworkCallback(ServiceAnnotation):
+    prefix = "network-on"
+
+
+class NetworkService(MainLoopService):
+    """
+    A service for network interfaces, which are dumped once when the
+    service starts and then kept up to date by the changes the kernel
+    pushes over rtnetlink, so nothing is polled.
+
+    Throughput is the exception, it's read from /proc/net/dev once per
+    throughput_period, only while widgets are attached to it.
+    Signals are only emitted when their values changed.
+    """
+
+    annotation = NetworkCallback()
+    """
+    Use this annotation when registering handlers for the network service.
+    """
+
+    throughput_period: int = 1000
+    """
+    Milliseconds between reading the byte counters of the interfaces
+    """
+
+    sticky_signals: dict[str, int | None] = {
+        "link": 0,
+        "addresses": 0,
+    }
+    """
+    The state and addresses are kept per interface for newly attached widgets
+    """
+
+    _socket: Optional[socket.socket]
+    """
+    The rtnetlink socket
+    """
+
+    _sequence: int
+    """
+    The sequence number of the last request
+    """
+
+    _dumps: list[int]
+    """
+    The dump requests waiting to be sent, the kernel handles one at a time
+    """
+
+    _dumping: bool
+    """
+    Whether a dump is in flight, the kernel refuses another until it's done
+    """
+
+    _redump: bool
+    """
+    Whether changes were lost while dumping, which dumps again once done
+    """
+
+    _seen_links: Optional[set[int]]
+    """
+    The indexes of the links dumped (or added) since a redump started,
+    None unless redumping
+    """
+
+    _seen_addresses: dict[int, set[str]]
+    """
+    The addresses dumped (or added) since a redump started, by index
+    """
+
+    _names: dict[int, str]
+    """
+    The names of the interfaces by their index
+    """
+
+    _addresses: dict[int, set[str]]
+    """
+    The addresses (with their prefix length) of the interfaces by their index
+    """
+
+    _last: dict[tuple[str, str], tuple]
+    """
+    The last emitted arguments of each signal by interface
+    """
+
+    _counters: Optional[ProcFile]
+    """
+    /proc/net/dev, while throughput is read
+    """
+
+    _last_counters: Optional[tuple[float, dict[bytes, tuple[int, int]]]]
+    """
+    The time and byte counters of the last throughput sample
+    """
+
+    _last_throughput: Optional[tuple]
+    """
+    The last emitted throughput
+    """
+
+    _throughput_source: Optional[int]
+    """
+    The timeout source reading throughput, if widgets are attached to it
+    """
+
+    def __init__(self, annotation: Optional[ServiceAnnotation] = None):
+        """
+        Creates a new network service
+
+        Args:
+            annotation (Optional[ServiceAnnotation], optional): The annotation information to use for widgets for this service.
+        """
+        super().__init__(annotation)
+        self._socket = None
+        self._sequence = 0
+        self._dumps = []
+        self._dumping = False
+        self._redump = False
+        self._seen_links = None
+        self._seen_addresses = {}
+        self._names = {}
+        self._addresses = {}
+        self._last = {}
+        self._counters = None
+        self._last_counters = None
+        self._last_throughput = None
+        self._throughput_source = None
+
+        self.add_subscription_listener(self._update_throughput)
+
+    def start_service(self):
+        """
+        Subscribes to link and address changes, then dumps the current ones
+        """
+        self._dumps = []
+        self._dumping = False
+        self._redump = False
+        self._seen_links = None
+        self._seen_addresses = {}
+        self._names = {}
+        self._addresses = {}
+        self._last = {}
+
+        try:
+            self._socket = socket.socket(
+                socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE
+            )
+            self._socket.bind(
+                (0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR)
+            )
+        except OSError as e:
+            logger.error(f"Failed to open rtnetlink socket: {e}")
+            self._socket = None
+            return
+
+        self._socket.setblocking(False)
+        self.watch_fd(self._socket.fileno(), self._on_messages)
+
+        self._dump()
+        self._update_throughput()
+
+    def stop_service(self):
+        """
+        Closes the rtnetlink socket and stops reading throughput
+        """
+        super().stop_service()
+
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+        self._update_throughput()
+
+    def _dump(self):
+        """
+        Requests every link and then every address
+        """
+        self._dumps = [RTM_GETLINK, RTM_GETADDR]
+        self._send_dump()
+
+    def _redump_changes(self):
+        """
+        Dumps again after changes were lost, links and addresses which
+        weren't dumped are removed once it's done. Waits for the dump
+        in flight to be done first.
+        """
+        if self._dumping:
+            self._redump = True
+            return
+
+        self._seen_links = set()
+        self._seen_addresses = {}
+        self._dump()
+
+    def _send_dump(self):
+        """
+        Sends the next dump request, finishing the dump if there are none
+        """
+        if not self._dumps:
+            self._dumping = False
+            self._finish_dump()
+            return
+
+        self._dumping = True
+        self._sequence += 1
+        request = NLMSG_HEADER.pack(
+            NLMSG_HEADER.size + 4,
+            self._dumps.pop(0),
+            NLM_F_REQUEST | NLM_F_DUMP,
+            self._sequence,
+            0,
+        )
+
+        # rtgenmsg, the family to dump
+        self._socket.send(request + struct.pack("=Bxxx", socket.AF_UNSPEC))
+
+    def _finish_dump(self):
+        """
+        Removes the links and addresses a redump didn't find, unless
+        changes were lost during it, in which case it's dumped again
+        """
+        if self._redump:
+            self._redump = False
+            self._redump_changes()
+            return
+
+        if self._seen_links is None:
+            return
+
+        seen_links, self._seen_links = self._seen_links, None
+        seen_addresses, self._seen_addresses = self._seen_addresses, {}
+
+        for index in [index for index in self._names if index not in seen_links]:
+            self._addresses.pop(index, None)
+            self._remove(self._names.pop(index))
+
+        for index, addresses in self._addresses.items():
+            removed = addresses - seen_addresses.get(index, set())
+
+            if removed:
+                addresses -= removed
+                self._emit_addresses(index)
+
+    def _on_messages(self, fd: int, condition: GLib.IOCondition) -> bool:
+        """
+        Reads every pending datagram
+        """
+        while True:
+            try:
+                data = self._socket.recv(65536)
+            except BlockingIOError:
+                return True
+            except OSError as e:
+                if e.errno == errno.ENOBUFS:
+                    # Changes were lost, so they are dumped again
+                    logger.warning("rtnetlink socket overran, dumping interfaces")
+                    self._redump_changes()
+                    continue
+
+                logger.error(f"Stopped recieving from rtnetlink: {e}")
+                return False
+
+            if not data:
+                return False
+
+            for message_type, sequence, payload in parse_messages(data):
+                self._handle_message(message_type, sequence, payload)
+
+    def _handle_message(self, message_type: int, sequence: int, payload: memoryview):
+        """
+        Handles a message, either part of a dump or a change
+        """
+        if message_type == NLMSG_DONE:
+            if self._dumping and sequence == self._sequence:
+                self._send_dump()
+
+        elif message_type == NLMSG_ERROR:
+            (error,) = struct.unpack_from("=i", payload)
+            if error:
+                logger.warning(f"rtnetlink request failed: {os.strerror(-error)}")
+
+                # The dump request failed, so it won't be done
+                if self._dumping and sequence == self._sequence:
+                    self._send_dump()
+
+        elif message_type in (RTM_NEWLINK, RTM_DELLINK):
+            self._handle_link(message_type, payload)
+
+        elif message_type in (RTM_NEWADDR, RTM_DELADDR):
+            self._handle_address(message_type, payload)
+
+    def _handle_link(self, message_type: int, payload: memoryview):
+        """
+        Handles a link being added, changed or removed
+        """
+        _, _, index, flags, _ = IFINFOMSG.unpack_from(payload)
+        attributes = parse_attributes(payload[IFINFOMSG.size :])
+
+        old_name = self._names.get(index)
+
+        if message_type == RTM_DELLINK:
+            self._names.pop(index, None)
+            self._addresses.pop(index, None)
+
+            if old_name is not None:
+                self._remove(old_name)
+            return
+
+        name = bytes(attributes.get(IFLA_IFNAME, b"")).rstrip(b"\0").decode()
+        if not name:
+            return
+
+        if self._seen_links is not None:
+            self._seen_links.add(index)
+
+        # Renamed
+        if old_name is not None and old_name != name:
+            self._remove(old_name)
+
+        self._names[index] = name
+
+        operstate = attributes.get(IFLA_OPERSTATE)
+        operstate = (
+            OPERSTATES[operstate[0]]
+            if operstate and operstate[0] < len(OPERSTATES)
+            else "unknown"
+        )
+
+        mac = ":".join(f"{byte:02x}" for byte in attributes.get(IFLA_ADDRESS, b""))
+
+        self._emit(
+            "link",
+            name,
+            bool(flags & IFF_UP) and bool(flags & IFF_LOWER_UP),
+            operstate,
+            mac,
+        )
+
+        if old_name != name:
+            self._emit_addresses(index)
+
+    def _handle_address(self, message_type: int, payload: memoryview):
+        """
+        Handles an address being added or removed
+        """
+        family, prefix_length, _, _, index = IFADDRMSG.unpack_from(payload)
+        attributes = parse_attributes(payload[IFADDRMSG.size :])
+
+        # The local address is the interface's own on point to point links
+        address = attributes.get(IFA_LOCAL, attributes.get(IFA_ADDRESS))
+        if address is None:
+            return
+
+        address = f"{socket.inet_ntop(family, address)}/{prefix_length}"
+        addresses = self._addresses.setdefault(index, set())
+
+        if message_type == RTM_NEWADDR:
+            addresses.add(address)
+        else:
+            addresses.discard(address)
+
+        # Redumping, what's added since is current
+        if self._seen_links is not None:
+            seen = self._seen_addresses.setdefault(index, set())
+
+            if message_type == RTM_NEWADDR:
+                seen.add(address)
+            else:
+                seen.discard(address)
+
+        self._emit_addresses(index)
+
+    def _emit_addresses(self, index: int):
+        """
+        Emits the addresses of an interface
+        """
+        name = self._names.get(index)
+
+        if name is not None:
+            self._emit("addresses", name, sorted(self._addresses.get(index, ())))
+
+    def _remove(self, name: str):
+        """
+        Emits an interface being removed, which is no longer replayed to widgets
+        """
+        for signal in ("link", "addresses"):
+            self._last.pop((signal, name), None)
+            self.forget_sticky(signal, name)
+
+        self.emit_signal(ServiceSignal("removed", name))
+
+    def _emit(self, signal: str, *args):
+        """
+        Emits a signal if its arguments changed for its interface
+        """
+        key = (signal, args[0])
+
+        if self._last.get(key) == args:
+            return
+
+        self._last[key] = args
+        self.emit_signal(ServiceSignal(signal, *args))
+
+    def _update_throughput(self):
+        """
+        Reads throughput while the service runs and widgets are attached to it
+        """
+        running = self._socket is not None and self.is_subscribed("throughput")
+
+        if running and self._throughput_source is None:
+            try:
+                self._counters = ProcFile("/proc/net/dev")
+            except OSError as e:
+                logger.error(f"Failed to read network counters: {e}")
+                return
+
+            self._last_counters = None
+            self._read_throughput()
+            self._throughput_source = GLib.timeout_add(
+                self.throughput_period, self._read_throughput
+            )
+
+        elif not running and self._throughput_source is not None:
+            GLib.source_remove(self._throughput_source)
+            self._counters.close()
+
+            self._throughput_source = None
+            self._counters = None
+            self._last_throughput = None
+
+    def _read_throughput(self) -> bool:
+        """
+        Reads the byte counters, emitting the throughput since the last read
+        """
+        now = time.monotonic()
+        counters = {
+            name: (int(received), int(transmitted))
+            for name, received, transmitted in NET_DEV_PATTERN.findall(
+                self._counters.read()
+            )
+        }
+
+        last = self._last_counters
+        self._last_counters = (now, counters)
+
+        if last is None:
+            return GLib.SOURCE_CONTINUE
+
+        last_time, last_counters = last
+        per_second = 1 / (now - last_time)
+
+        rates = {}
+        for name, (received, transmitted) in counters.items():
+            last_received, last_transmitted = last_counters.get(
+                name, (received, transmitted)
+            )
+
+            # Counters reset when interfaces are recreated
+            rates[name.decode()] = (
+                round(max(received - last_received, 0) * per_second),
+                round(max(transmitted - last_transmitted, 0) * per_second),
+            )
+
+        throughput = (
+            float(sum(rate[0] for name, rate in rates.items() if name != "lo")),
+            float(sum(rate[1] for name, rate in rates.items() if name != "lo")),
+            rates,
+        )
+
+        if throughput != self._last_throughput:
+            self._last_throughput = throughput
+            self.emit_signal(ServiceSignal("throughput", *throughput))
+
+        return GLib.SOURCE_CONTINUE
+
+    def get_signal_arg_types(self, signal: str) -> tuple[any] | None:
+        """
+        The signals of the network service:
+
+        - link: The name of an interface, whether it's up with a carrier,
+          its operational state (e.g up, down, dormant or unknown) and its
+          hardware address
+        - addresses: The name of an interface and a list of its addresses, e.g 10.0.0.2/24
+        - removed: The name of an interface which was removed (or renamed)
+        - throughput: Received and transmitted bytes per second over every
+          interface except loopback, and a dict of each interface's (received, transmitted)
+        """
+        return {
+            "link": (str, bool, str, str),
+            "addresses": (str, object),
+            "removed": (str,),
+            "throughput": (float, float, object),
+        }.get(signal)
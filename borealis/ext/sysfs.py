@@ -0,0 +1,540 @@
+"""
+borealis.ext.sysfs
+
+A service for backlight and power supply (battery and charger) state,
+along with the contents of any other files, emitted when they change.
+"""
+
+import logging
+import os
+import socket
+from typing import Optional
+from gi.repository import Gio, GLib
+from borealis.service import MainLoopService, ServiceAnnotation, ServiceSignal
+
+logger = logging.getLogger(__name__)
+
+NETLINK_KOBJECT_UEVENT = 15
+"""
+The netlink protocol the kernel sends uevents over
+"""
+
+UEVENT_KERNEL_GROUP = 1
+"""
+The multicast group of uevents sent by the kernel (rather than udev)
+"""
+
+WATCHED_CLASSES = ("backlight", "power_supply")
+"""
+The device classes under sysfs_root/class which are watched
+"""
+
+DEVICE_SIGNALS = {"backlight": ("backlight",), "power_supply": ("battery", "ac")}
+"""
+The signals emitted for the devices of each watched class
+"""
+
+
+def read_attribute(path: str) -> Optional[str]:
+    """
+    Reads a sysfs attribute (or any small text file)
+
+    Args:
+        path (str): Path of the file
+
+    Returns:
+        Optional[str]: The contents without surrounding whitespace, None if it couldn't be read
+    """
+    try:
+        with open(path) as attribute:
+            return attribute.read().strip()
+    except OSError:
+        return None
+
+
+def parse_uevent(message: bytes) -> tuple[str, dict[str, str]]:
+    """
+    Parses a uevent sent by the kernel
+
+    Args:
+        message (bytes): The message, as ACTION@DEVPATH\\0KEY=VALUE\\0...
+
+    Returns:
+        tuple[str, dict[str, str]]: The action and the properties of the uevent
+    """
+    header, *properties = message.decode(errors="replace").split("\0")
+    action = header.partition("@")[0]
+
+    return action, dict(prop.split("=", 1) for prop in properties if "=" in prop)
+
+
+class SysfsCallback(ServiceAnnotation):
+    prefix = "sysfs-on"
+
+
+class SysfsService(MainLoopService):
+    """
+    A service for backlights, batteries, chargers and watched files,
+    which are only read again when they are known to have changed.
+
+    Under /sys, changes are recieved as uevents from the kernel. Anywhere
+    else (e.g a temporary directory standing in for sysfs, or
+    watched_files outside of /sys) they are recieved from Gio.FileMonitor.
+    Whatever can't be watched is reread by a single poller, along with
+    batteries since most don't send uevents as they (dis)charge.
+    Signals are only emitted when their values changed, removed devices
+    are emitted with removed and are no longer replayed to widgets.
+    """
+
+    annotation = SysfsCallback()
+    """
+    Use this annotation when registering handlers for the sysfs service.
+    """
+
+    sysfs_root: str = "/sys"
+    """
+    The mount of sysfs
+    """
+
+    watched_files: list[str] = []
+    """
+    Paths of other files whose contents are emitted with the file signal
+    """
+
+    poll_period: int = 10000
+    """
+    Milliseconds between rereading batteries and anything which can't be watched
+    """
+
+    sticky_signals: dict[str, int | None] = {
+        "backlight": 0,
+        "battery": 0,
+        "ac": 0,
+        "file": 0,
+    }
+    """
+    Every signal is kept per device (or file) for newly attached widgets
+    """
+
+    _uevents: Optional[socket.socket]
+    """
+    The socket recieving uevents, when watching the real sysfs
+    """
+
+    _monitors: dict[tuple[str, ...], Gio.FileMonitor]
+    """
+    The file monitors in use, by what they watch (see _monitor)
+    """
+
+    _watched: set[tuple[str, str]]
+    """
+    The devices (by class and name) being watched
+    """
+
+    _polled: set[tuple[str, str]]
+    """
+    The devices (by class and name) and files (by "file" and path) which are polled
+    """
+
+    _dirty: set[tuple[str, str]]
+    """
+    The devices and files waiting to be reread
+    """
+
+    _refresh_source: Optional[int]
+    """
+    The idle source rereading the dirty devices and files, if pending
+    """
+
+    _poll_source: Optional[int]
+    """
+    The timeout source of the poller, if anything is polled
+    """
+
+    _last: dict[tuple[str, str], tuple]
+    """
+    The last emitted arguments of each signal by device (or file)
+    """
+
+    def __init__(self, annotation: Optional[ServiceAnnotation] = None):
+        """
+        Creates a new sysfs service
+
+        Args:
+            annotation (Optional[ServiceAnnotation], optional): The annotation information to use for widgets for this service.
+        """
+        super().__init__(annotation)
+        self._uevents = None
+        self._monitors = {}
+        self._watched = set()
+        self._polled = set()
+        self._dirty = set()
+        self._refresh_source = None
+        self._poll_source = None
+        self._last = {}
+
+    def get_devices(self, device_class: str) -> list[str]:
+        """
+        Returns the names of the devices of a class
+
+        Args:
+            device_class (str): The class, e.g backlight
+
+        Returns:
+            list[str]: The names of the devices
+        """
+        try:
+            return sorted(os.listdir(self._class_path(device_class)))
+        except OSError:
+            return []
+
+    def _class_path(self, device_class: str, *parts: str) -> str:
+        """
+        Returns the path of a class directory, or a path under it
+        """
+        return os.path.join(self.sysfs_root, "class", device_class, *parts)
+
+    def start_service(self):
+        """
+        Watches every device and file, emitting their current state
+        """
+        self._last = {}
+        real_sysfs = os.path.realpath(self.sysfs_root) == "/sys"
+
+        if real_sysfs:
+            self._open_uevents()
+
+        for device_class in WATCHED_CLASSES:
+            if not real_sysfs or self._uevents is None:
+                self._monitor(self._class_path(device_class), device_class)
+
+            for name in self.get_devices(device_class):
+                self._watch_device(device_class, name, real_sysfs)
+
+        for path in self.watched_files:
+            if os.path.realpath(path).startswith("/sys/"):
+                # sysfs doesn't report changes to inotify
+                self._add_polled("file", path)
+            else:
+                self._monitor(path, "file", path)
+
+            self._refresh("file", path)
+
+    def stop_service(self):
+        """
+        Stops watching every device and file
+        """
+        super().stop_service()
+
+        for monitor in self._monitors.values():
+            monitor.cancel()
+
+        if self._uevents is not None:
+            self._uevents.close()
+
+        for source_id in (self._refresh_source, self._poll_source):
+            if source_id is not None:
+                GLib.source_remove(source_id)
+
+        self._uevents = None
+        self._monitors = {}
+        self._watched = set()
+        self._polled = set()
+        self._dirty = set()
+        self._refresh_source = None
+        self._poll_source = None
+
+    def _watch_device(self, device_class: str, name: str, real_sysfs: bool):
+        """
+        Watches a device, emitting its current state
+        """
+        key = (device_class, name)
+
+        if key in self._watched:
+            self._refresh(*key)
+            return
+
+        self._watched.add(key)
+
+        if not real_sysfs:
+            self._monitor(self._class_path(device_class, name), *key)
+        elif self._uevents is None or self._is_battery(name):
+            self._add_polled(*key)
+
+        self._refresh(*key)
+
+    def _is_battery(self, name: str) -> bool:
+        """
+        Returns whether a power supply is a battery
+        """
+        return read_attribute(self._class_path("power_supply", name, "type")) == (
+            "Battery"
+        )
+
+    def _open_uevents(self):
+        """
+        Opens the socket recieving uevents from the kernel
+        """
+        try:
+            uevents = socket.socket(
+                socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT
+            )
+        except OSError as e:
+            logger.warning(f"Failed to listen for uevents, polling instead: {e}")
+            return
+
+        try:
+            uevents.bind((0, UEVENT_KERNEL_GROUP))
+        except OSError as e:
+            uevents.close()
+            logger.warning(f"Failed to listen for uevents, polling instead: {e}")
+            return
+
+        uevents.setblocking(False)
+        self._uevents = uevents
+        self.watch_fd(uevents.fileno(), self._on_uevents)
+
+    def _on_uevents(self, fd: int, condition: GLib.IOCondition) -> bool:
+        """
+        Reads the pending uevents, marking the devices they are about dirty
+        """
+        while True:
+            try:
+                message = self._uevents.recv(8192)
+            except BlockingIOError:
+                return True
+            except OSError as e:
+                logger.warning(f"Stopped recieving uevents: {e}")
+                return False
+
+            action, properties = parse_uevent(message)
+
+            device_class = properties.get("SUBSYSTEM")
+            if device_class not in WATCHED_CLASSES:
+                continue
+
+            name = os.path.basename(properties.get("DEVPATH", ""))
+
+            if action == "add":
+                self._watch_device(device_class, name, True)
+            elif action == "remove":
+                self._remove_device(device_class, name)
+            else:
+                self._mark_dirty(device_class, name)
+
+    def _monitor(self, path: str, *key: str):
+        """
+        Monitors a file (or directory) with Gio, polling it if that fails
+
+        Args:
+            path (str): The path
+            *key (str): The device (class, name), file ("file", path) or a class directory (class)
+        """
+        file = Gio.File.new_for_path(path)
+
+        try:
+            if os.path.isdir(path):
+                monitor = file.monitor_directory(Gio.FileMonitorFlags.NONE, None)
+            else:
+                monitor = file.monitor_file(Gio.FileMonitorFlags.NONE, None)
+        except GLib.Error as e:
+            logger.debug(f"Polling {path} since it can't be monitored: {e}")
+
+            if len(key) == 2:
+                self._add_polled(*key)
+            return
+
+        monitor.connect("changed", lambda *_: self._on_monitor_changed(key))
+
+        previous = self._monitors.pop(key, None)
+        if previous is not None:
+            previous.cancel()
+
+        self._monitors[key] = monitor
+
+    def _on_monitor_changed(self, key: tuple[str, ...]):
+        """
+        Marks whatever a monitor is watching dirty
+        """
+        if len(key) == 2:
+            self._mark_dirty(*key)
+            return
+
+        # A class directory changed, so devices may have been added or removed
+        (device_class,) = key
+        names = self.get_devices(device_class)
+
+        for name in names:
+            if (device_class, name) not in self._watched:
+                self._watch_device(device_class, name, False)
+
+        for watched_class, name in list(self._watched):
+            if watched_class == device_class and name not in names:
+                self._remove_device(device_class, name)
+
+    def _remove_device(self, device_class: str, name: str):
+        """
+        Stops watching a device which was removed, forgetting its kept
+        signals and emitting it being removed
+        """
+        key = (device_class, name)
+
+        if key not in self._watched:
+            return
+
+        self._watched.discard(key)
+        self._dirty.discard(key)
+        self._remove_polled(*key)
+
+        monitor = self._monitors.pop(key, None)
+        if monitor is not None:
+            monitor.cancel()
+
+        for signal in DEVICE_SIGNALS[device_class]:
+            self._last.pop((signal, name), None)
+            self.forget_sticky(signal, name)
+
+        self.emit_signal(ServiceSignal("removed", device_class, name))
+
+    def _mark_dirty(self, *key: str):
+        """
+        Rereads a device or file once the main loop is idle, so a burst
+        of changes is only read once.
+        """
+        self._dirty.add(key)
+
+        if self._refresh_source is None:
+            self._refresh_source = GLib.idle_add(self._refresh_dirty)
+
+    def _refresh_dirty(self) -> bool:
+        """
+        Rereads the dirty devices and files
+        """
+        self._refresh_source = None
+
+        dirty, self._dirty = self._dirty, set()
+        for key in dirty:
+            self._refresh(*key)
+
+        return GLib.SOURCE_REMOVE
+
+    def _add_polled(self, *key: str):
+        """
+        Polls a device or file, starting the poller if it's the first
+        """
+        self._polled.add(key)
+
+        if self._poll_source is None:
+            self._poll_source = GLib.timeout_add(self.poll_period, self._poll)
+
+    def _remove_polled(self, *key: str):
+        """
+        Stops polling a device or file, stopping the poller if it was the last
+        """
+        self._polled.discard(key)
+
+        if not self._polled and self._poll_source is not None:
+            GLib.source_remove(self._poll_source)
+            self._poll_source = None
+
+    def _poll(self) -> bool:
+        """
+        Rereads everything which is polled
+        """
+        for key in list(self._polled):
+            self._refresh(*key)
+
+        return GLib.SOURCE_CONTINUE
+
+    def _refresh(self, kind: str, name: str):
+        """
+        Rereads a device or file, emitting it if it changed
+
+        Args:
+            kind (str): The class of the device, or "file"
+            name (str): The name of the device, or the path of the file
+        """
+        if kind == "file":
+            contents = read_attribute(name)
+            if contents is not None:
+                self._emit("file", name, contents)
+
+        elif kind == "backlight":
+            self._refresh_backlight(name)
+
+        elif kind == "power_supply":
+            self._refresh_power_supply(name)
+
+    def _refresh_backlight(self, name: str):
+        """
+        Rereads a backlight
+        """
+        brightness = read_attribute(
+            self._class_path("backlight", name, "actual_brightness")
+        )
+        if brightness is None:
+            brightness = read_attribute(
+                self._class_path("backlight", name, "brightness")
+            )
+
+        max_brightness = read_attribute(
+            self._class_path("backlight", name, "max_brightness")
+        )
+
+        try:
+            self._emit("backlight", name, int(brightness), int(max_brightness))
+        except (TypeError, ValueError):
+            logger.debug(f"Failed to read backlight {name}")
+
+    def _refresh_power_supply(self, name: str):
+        """
+        Rereads a power supply, either a battery or a charger
+        """
+        supply_type = read_attribute(self._class_path("power_supply", name, "type"))
+
+        if supply_type == "Battery":
+            capacity = read_attribute(
+                self._class_path("power_supply", name, "capacity")
+            )
+            status = read_attribute(self._class_path("power_supply", name, "status"))
+
+            try:
+                self._emit("battery", name, float(capacity), status or "Unknown")
+            except (TypeError, ValueError):
+                logger.debug(f"Failed to read battery {name}")
+
+        elif supply_type is not None:
+            online = read_attribute(self._class_path("power_supply", name, "online"))
+
+            if online is not None:
+                self._emit("ac", name, online == "1")
+
+    def _emit(self, signal: str, *args):
+        """
+        Emits a signal if its arguments changed for its device (or file)
+        """
+        key = (signal, args[0])
+
+        if self._last.get(key) == args:
+            return
+
+        self._last[key] = args
+        self.emit_signal(ServiceSignal(signal, *args))
+
+    def get_signal_arg_types(self, signal: str) -> tuple[any] | None:
+        """
+        The signals of the sysfs service:
+
+        - backlight: The name, brightness and max brightness of a backlight
+        - battery: The name, capacity in percent and status (e.g Charging) of a battery
+        - ac: The name of a charger and whether it's online
+        - file: The path and stripped contents of a watched file
+        - removed: The class and name of a device which was removed
+        """
+        return {
+            "backlight": (str, int, int),
+            "battery": (str, float, str),
+            "ac": (str, bool),
+            "file": (str, str),
+            "removed": (str, str),
+        }.get(signal)
@@ -0,0 +1,434 @@
+"""
+borealis.ext.sysstats
+
+A service publishing system metrics (cpu, memory, network and disk io)
+read from /proc.
+"""
+
+import logging
+import os
+import re
+import time
+from array import array
+from collections.abc import Callable
+from typing import Optional
+from borealis.service import PollingService, ServiceAnnotation, TimeSeriesStore
+
+logger = logging.getLogger(__name__)
+
+CPU_PATTERN = re.compile(rb"^cpu\d* +(.*)$", re.MULTILINE)
+"""
+Matches the times of each cpu line in /proc/stat (all cpus first)
+"""
+
+MEMINFO_PATTERN = re.compile(
+    rb"^(MemTotal|MemAvailable|SwapTotal|SwapFree):\s+(\d+)", re.MULTILINE
+)
+"""
+Matches the fields of /proc/meminfo used by SystemStatsService
+"""
+
+NET_DEV_PATTERN = re.compile(
+    rb"^\s*([^:\s]+):\s*(\d+)(?:\s+\d+){7}\s+(\d+)", re.MULTILINE
+)
+"""
+Matches the name, received and transmitted bytes of each interface in /proc/net/dev
+"""
+
+DISKSTATS_PATTERN = re.compile(
+    rb"^\s*\d+\s+\d+\s+(\S+)\s+\d+\s+\d+\s+(\d+)\s+\d+\s+\d+\s+\d+\s+(\d+)",
+    re.MULTILINE,
+)
+"""
+Matches the name, sectors read and sectors written of each device in /proc/diskstats
+"""
+
+SECTOR_SIZE = 512
+"""
+The size of the sectors counted by /proc/diskstats, regardless of the device
+"""
+
+
+class ProcFile:
+    """
+    A file in /proc kept open and reread from the start into a reused buffer
+    """
+
+    path: str
+    """
+    Path of the file
+    """
+
+    _fd: int
+    """
+    The open file
+    """
+
+    _buffer: bytearray
+    """
+    The buffer the file is read into, grown when the file doesn't fit
+    """
+
+    def __init__(self, path: str, buffer_size: int = 4096):
+        """
+        Opens a file
+
+        Args:
+            path (str): Path of the file
+            buffer_size (int, optional): The initial size of the buffer. Defaults to 4096.
+        """
+        self.path = path
+        self._fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        self._buffer = bytearray(buffer_size)
+
+    def read(self) -> memoryview:
+        """
+        Rereads the file
+
+        Returns:
+            memoryview: The contents of the file, valid until the next read
+        """
+        while True:
+            size = os.preadv(self._fd, [self._buffer], 0)
+
+            if size < len(self._buffer):
+                return memoryview(self._buffer)[:size]
+
+            # Filled the buffer, so the file may be larger
+            self._buffer = bytearray(len(self._buffer) * 2)
+
+    def close(self):
+        """
+        Closes the file
+        """
+        os.close(self._fd)
+
+
+class SystemStatsCallback(ServiceAnnotation):
+    prefix = "sysstats-on"
+
+
+class SystemStatsService(PollingService):
+    """
+    A service for system metrics, sampled from /proc once per period.
+
+    The files are kept open while the service runs and are only read for
+    the signals widgets are attached to. Rates (cpu usage, network and
+    disk throughput) are the average since the previous sample, so they
+    are first emitted one period after the service starts.
+    """
+
+    annotation = SystemStatsCallback()
+    """
+    Use this annotation when registering handlers for the system stats service.
+    """
+
+    polled_signals: dict[str, tuple[any]] = {
+        "cpu": (float, object),
+        "memory": (float, int, int),
+        "swap": (float, int, int),
+        "network": (float, float, object),
+        "disk": (float, float, object),
+    }
+    """
+    - cpu: The usage of all cores in percent, and a list of each core's usage
+    - memory: The used memory in percent, the used and the total memory in kB
+    - swap: The used swap in percent, the used and the total swap in kB
+    - network: Received and transmitted bytes per second over every interface
+      except loopback, and a dict of each interface's (received, transmitted)
+    - disk: Read and written bytes per second over every disk (partitions and
+      disks stacked on others, e.g dm-* or md*, are excluded), and a dict of
+      each device's (read, written)
+    """
+
+    proc_root: str = "/proc"
+    """
+    The mount of procfs
+    """
+
+    sysfs_root: str = "/sys"
+    """
+    The mount of sysfs, whose block directory lists the disks
+    """
+
+    history_length: int = 300
+    """
+    The amount of samples kept in history
+    """
+
+    history: TimeSeriesStore
+    """
+    The recent samples shared by every widget (e.g graphs), with the
+    metrics cpu, memory, swap, network-received, network-transmitted,
+    disk-read and disk-written. Only the signals widgets are attached
+    to are sampled.
+    """
+
+    _files: dict[str, ProcFile]
+    """
+    The open files by their path under proc_root
+    """
+
+    _disks: Optional[frozenset[bytes]]
+    """
+    The names of whole disks (from sysfs_root/block), None if unknown
+    """
+
+    _cpu_busy: array
+    """
+    The busy time of every cpu (the first being all of them) at the last sample
+    """
+
+    _cpu_total: array
+    """
+    The total time of every cpu (the first being all of them) at the last sample
+    """
+
+    _counters: dict[str, tuple[float, dict[bytes, tuple[int, int]]]]
+    """
+    The time and byte counters of the last network and disk samples
+    """
+
+    def __init__(self, annotation: Optional[ServiceAnnotation] = None):
+        """
+        Creates a new system stats service
+
+        Args:
+            annotation (Optional[ServiceAnnotation], optional): The annotation information to use for widgets for this service.
+        """
+        super().__init__(annotation)
+        self._files = {}
+        self._disks = None
+        self.history = TimeSeriesStore(self.history_length)
+        self._reset()
+
+    def _reset(self):
+        """
+        Forgets the previous samples
+        """
+        self._cpu_busy = array("Q")
+        self._cpu_total = array("Q")
+        self._counters = {}
+
+    def _read(self, name: str) -> memoryview:
+        """
+        Reads a file under proc_root, opening it on first use
+        """
+        proc_file = self._files.get(name)
+
+        if proc_file is None:
+            proc_file = self._files[name] = ProcFile(os.path.join(self.proc_root, name))
+
+        return proc_file.read()
+
+    def start_service(self):
+        """
+        Samples until stopped, then closes the files
+        """
+        self._reset()
+        self._disks = self._list_disks()
+
+        try:
+            super().start_service()
+        finally:
+            for proc_file in self._files.values():
+                proc_file.close()
+
+            self._files = {}
+
+    def _list_disks(self) -> Optional[frozenset[bytes]]:
+        """
+        Returns the names of the physical disks, skipping virtual ones and
+        those stacked on other disks (their I/O is already counted there)
+        """
+        block = os.path.join(self.sysfs_root, "block")
+
+        try:
+            names = os.listdir(block)
+        except OSError:
+            return None
+
+        disks = set()
+        for name in names:
+            if name.startswith(("loop", "ram", "zram")):
+                continue
+
+            try:
+                if os.listdir(os.path.join(block, name, "slaves")):
+                    continue
+            except OSError:
+                pass
+
+            disks.add(name.encode())
+
+        return frozenset(disks)
+
+    def sample(self, signals: set[str]) -> dict[str, tuple]:
+        """
+        Samples the signals widgets are attached to from the open files,
+        rates are left out until there's a previous sample to compare to.
+
+        Args:
+            signals (set[str]): The signals widgets are attached to
+
+        Returns:
+            dict[str, tuple]: The arguments of each sampled signal
+        """
+        samples = {}
+
+        if "cpu" in signals:
+            cpu = self._sample_cpu()
+            if cpu is not None:
+                samples["cpu"] = cpu
+
+        if "memory" in signals or "swap" in signals:
+            samples.update(self._sample_memory())
+
+        if "network" in signals:
+            network = self._sample_counters(
+                "net/dev", NET_DEV_PATTERN, 1, lambda name: name != b"lo"
+            )
+            if network is not None:
+                samples["network"] = network
+
+        if "disk" in signals:
+            disk = self._sample_counters(
+                "diskstats",
+                DISKSTATS_PATTERN,
+                SECTOR_SIZE,
+                lambda name: self._disks is None or name in self._disks,
+            )
+            if disk is not None:
+                samples["disk"] = disk
+
+        self._record_history(samples)
+
+        return samples
+
+    def _record_history(self, samples: dict[str, tuple]):
+        """
+        Records the totals of a sample in history
+        """
+        history = {}
+
+        for signal in ("cpu", "memory", "swap"):
+            if signal in samples:
+                history[signal] = samples[signal][0]
+
+        for signal, first, second in (
+            ("network", "network-received", "network-transmitted"),
+            ("disk", "disk-read", "disk-written"),
+        ):
+            if signal in samples:
+                history[first], history[second] = samples[signal][:2]
+
+        self.history.record(history)
+
+    def _sample_cpu(self) -> Optional[tuple[float, list[float]]]:
+        """
+        Samples /proc/stat, returning the usage since the last sample
+        """
+        busy = array("Q")
+        total = array("Q")
+
+        for line in CPU_PATTERN.findall(self._read("stat")):
+            # user nice system idle iowait irq softirq steal (guests are in user)
+            times = array("Q", map(int, line.split()[:8]))
+            line_total = sum(times)
+
+            total.append(line_total)
+            busy.append(line_total - times[3] - times[4])
+
+        last_busy, last_total = self._cpu_busy, self._cpu_total
+        self._cpu_busy, self._cpu_total = busy, total
+
+        # Cores may come online, which needs a new baseline
+        if len(last_total) != len(total):
+            return None
+
+        usage = []
+        for cpu in range(len(total)):
+            elapsed = total[cpu] - last_total[cpu]
+            used = busy[cpu] - last_busy[cpu]
+
+            usage.append(round(100 * used / elapsed, 1) if elapsed else 0.0)
+
+        return usage[0], usage[1:]
+
+    def _sample_memory(self) -> dict[str, tuple]:
+        """
+        Samples /proc/meminfo
+        """
+        fields = {
+            name: int(value)
+            for name, value in MEMINFO_PATTERN.findall(self._read("meminfo"))
+        }
+
+        memory_total = fields.get(b"MemTotal", 0)
+        memory_used = memory_total - fields.get(b"MemAvailable", 0)
+
+        swap_total = fields.get(b"SwapTotal", 0)
+        swap_used = swap_total - fields.get(b"SwapFree", 0)
+
+        return {
+            "memory": (
+                round(100 * memory_used / memory_total, 1) if memory_total else 0.0,
+                memory_used,
+                memory_total,
+            ),
+            "swap": (
+                round(100 * swap_used / swap_total, 1) if swap_total else 0.0,
+                swap_used,
+                swap_total,
+            ),
+        }
+
+    def _sample_counters(
+        self,
+        name: str,
+        pattern: re.Pattern,
+        unit: int,
+        include: Callable[[bytes], bool],
+    ) -> Optional[tuple[float, float, dict[str, tuple[int, int]]]]:
+        """
+        Samples a file of (name, counter, counter) rows, returning the
+        rate of each counter since the last sample
+
+        Args:
+            name (str): The file under proc_root
+            pattern (re.Pattern): Matches the name and counters of each row
+            unit (int): Bytes per count
+            include (Callable[[bytes], bool]): Whether a row counts to the totals
+        """
+        now = time.monotonic()
+        counters = {
+            row: (int(first), int(second))
+            for row, first, second in pattern.findall(self._read(name))
+        }
+
+        last = self._counters.get(name)
+        self._counters[name] = (now, counters)
+
+        if last is None:
+            return None
+
+        last_time, last_counters = last
+        per_second = unit / (now - last_time)
+
+        rates = {}
+        total_first = total_second = 0.0
+
+        for row, (first, second) in counters.items():
+            last_first, last_second = last_counters.get(row, (first, second))
+
+            # Counters reset when devices are recreated
+            rate_first = max(first - last_first, 0) * per_second
+            rate_second = max(second - last_second, 0) * per_second
+
+            rates[row.decode()] = (round(rate_first), round(rate_second))
+
+            if include(row):
+                total_first += rate_first
+                total_second += rate_second
+
+        return float(round(total_first)), float(round(total_second)), rates
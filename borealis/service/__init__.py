@@ -8,3 +8,9 @@ throughout borealis
 from .base_service import *
 from .service_annotate import *
 from .service_signal import *
+from .signal_queue import *
+from .service_runtime import *
+from .main_loop_service import *
+from .polling_service import *
+from .time_series import *
+from .dbus_service import *
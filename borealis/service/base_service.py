@@ -1,10 +1,25 @@
 import logging
-from typing import Optional
+import threading
+from collections.abc import Callable
+from functools import partial
+from typing import TYPE_CHECKING, Optional
+from weakref import WeakKeyDictionary, WeakSet, finalize, ref
 from borealis.service.service_annotate import ServiceAnnotation
 from borealis.service.service_signal import ServiceSignal
-from borealis.widget.widget import Widget
+from borealis.service.service_runtime import ServiceRuntime
+from borealis.service.signal_queue import (
+    Coalesce,
+    CoalescePolicy,
+    OverflowPolicy,
+    SignalQueue,
+)
 from gi.repository import GLib
 
+# Only for annotations, services are imported without the widget layer in
+# the processes hosting them (see borealis.service.process_host)
+if TYPE_CHECKING:
+    from borealis.widget.widget import Widget
+
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +36,146 @@ class BaseService:
     to use it's signals
     """
 
-    _attached_widgets: dict[Widget, list[str]]
+    threaded: bool = True
+    """
+    Whether start_service runs on a worker thread of the runtime,
+    otherwise it's called on the main thread (see MainLoopService).
+    """
+
+    lazy: bool = True
+    """
+    Whether this service is only running while widgets are attached to it,
+    it's started when the first widget attaches and stopped once the last
+    one has been detached for lazy_stop_delay. Otherwise it is started
+    along with borealis.
+    """
+
+    lazy_stop_delay: int = 1000
+    """
+    Milliseconds a lazy service keeps running without widgets before
+    it is stopped, so widgets being remapped don't restart it.
+    """
+
+    queue_capacity: int = 4096
+    """
+    The amount of emitted signals that may wait for the main loop
+    before queue_overflow applies
+    """
+
+    queue_overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST
+    """
+    What to do with signals emitted while the queue is full
+    """
+
+    queue_priority: int = GLib.PRIORITY_DEFAULT
+    """
+    The main loop priority signals of this service are ran at
+    """
+
+    signal_coalescing: dict[str, Coalesce] = {}
+    """
+    How pending signals collapse before reaching the main thread, by the
+    name of the signal. Signals which are absent are all emitted.
+
+    e.g {"title": Coalesce(CoalescePolicy.LATEST, key=0)} only emits the
+    latest pending title of each window (its first argument).
+    """
+
+    sticky_signals: dict[str, int | None] = {}
+    """
+    Signals whose last emitted arguments are kept and replayed to widgets
+    as soon as they attach, so they don't wait for the next signal to be
+    up to date. Maps each signal to the index of the argument to keep a
+    value per (e.g a keyboard's name), or None for a single value.
+    Accumulating signals keep each signal they collected, and are replayed
+    as a single list of their arguments.
+    """
+
+    signal_queue: SignalQueue
+    """
+    The queue signals are emitted through to the main loop, which
+    exposes its depth and the amount of dropped signals.
+    """
+
+    direct_dispatch: bool = False
+    """
+    Whether signals call the handlers of widgets directly with their
+    python arguments, instead of being emitted as GObject signals on
+    each widget (which marshals every argument).
+    """
+
+    process_hosted: bool = False
+    """
+    Whether this service runs in a child process, keeping its work off
+    the GIL of the UI. See borealis.service.process_host for what
+    process hosted services must support.
+    """
+
+    _runtime: ServiceRuntime | None
     """
-    The widgets attached to this service that will recieve
-    the signals from this service
+    The runtime this service runs on, None until borealis registers it
+    """
+
+    _stop_event: threading.Event
+    """
+    Set when this service is asked to stop, cleared when it's started
+    """
+
+    _stop_timeout: int | None
+    """
+    The id of the timeout stopping this lazy service, if one is pending
+    """
+
+    _subscription_listeners: list[Callable[[], None]]
+    """
+    Called whenever a signal gains its first or loses its last subscriber
+    """
+
+    _signal_listeners: dict[str, list[Callable]]
+    """
+    Callbacks of each signal which aren't widgets (e.g the store),
+    they count as subscribers like attached widgets do.
+    """
+
+    _sticky: dict[str, dict[tuple, ServiceSignal]]
+    """
+    The last signals ran of each sticky signal, by their scope and key
+    """
+
+    _attached_widgets: WeakKeyDictionary["Widget", set[str]]
+    """
+    The widgets attached to this service along with the signals they
+    recieve from this service. Widgets are weakly referenced, so ones
+    destroyed without being detached drop out on their own.
+    """
+
+    _callbacks: WeakKeyDictionary["Widget", dict[str, list[Callable]]]
+    """
+    The handlers of each attached widget by signal, used by direct_dispatch
+    """
+
+    _handler_cache: dict[tuple[str, str | None], tuple[tuple[ref, tuple[Callable]]]]
+    """
+    The handlers called for each signal and scope with direct_dispatch,
+    cleared whenever widgets attach or detach.
+    """
+
+    _widget_scopes: WeakKeyDictionary["Widget", str | None]
+    """
+    The scope of each attached widget, see get_widget_scope
+    """
+
+    _subscribers: dict[str, dict[str | None, WeakSet["Widget"]]]
+    """
+    Index of the widgets subscribed to each signal of this service,
+    grouped by their scope. Signals are removed once their widgets detach,
+    or on the main loop after they were garbage collected.
+    """
+
+    _finalizers: WeakKeyDictionary["Widget", finalize]
+    """
+    Finalizer of each attached widget, noticing widgets which are
+    garbage collected without being detached.
     """
 
     def __init__(self, annotation: Optional[ServiceAnnotation] = None):
@@ -49,7 +200,26 @@ class BaseService:
             )
             exit(1)
 
-        self._attached_widgets = {}
+        self._attached_widgets = WeakKeyDictionary()
+        self._callbacks = WeakKeyDictionary()
+        self._handler_cache = {}
+        self._widget_scopes = WeakKeyDictionary()
+        self._subscribers = {}
+        self._finalizers = WeakKeyDictionary()
+        self._sticky = {}
+        self._subscription_listeners = []
+        self._signal_listeners = {}
+        self._runtime = None
+        self._stop_event = threading.Event()
+        self._stop_timeout = None
+
+        self.signal_queue = SignalQueue(
+            self._run_queued,
+            self.get_signal_coalesce,
+            self.queue_capacity,
+            self.queue_overflow,
+            self.queue_priority,
+        )
 
     def start_service(self):
         """
@@ -57,10 +227,97 @@ class BaseService:
         will be called when this service should
         start sending events
 
-        This will be executed in a different thread
+        This will be executed in a different thread, and should return
+        once is_stopping is True (see stop_service)
         """
         pass
 
+    def prepare_service(self):
+        """
+        Called right before start_service is submitted to run
+        """
+        self._stop_event.clear()
+        self.signal_queue.reopen()
+
+    def stop_service(self):
+        """
+        Asks this service to stop, start_service should return soon after.
+
+        Services blocking in start_service (e.g on a socket) should override
+        this to wake themselves up, calling super. This is called from the
+        main thread, and signals emitted after it are dropped.
+        """
+        self._stop_event.set()
+        self.signal_queue.close()
+
+        # Kept signals will be out of date by the time this restarts
+        self._sticky.clear()
+
+    def is_stopping(self) -> bool:
+        """
+        Returns whether this service was asked to stop
+
+        This is safe to call from the service's thread.
+        """
+        return self._stop_event.is_set()
+
+    def wait_for_stop(self, timeout: float) -> bool:
+        """
+        Waits until this service is asked to stop, or the timeout passes
+
+        Args:
+            timeout (float): Seconds to wait
+
+        Returns:
+            bool: Whether the service was asked to stop
+        """
+        return self._stop_event.wait(timeout)
+
+    def set_runtime(self, runtime: ServiceRuntime):
+        """
+        Set's the runtime this service runs on, starting it
+        straight away unless it's lazy.
+
+        Args:
+            runtime (ServiceRuntime): The runtime
+        """
+        self._runtime = runtime
+
+        if not self.lazy or self._has_subscribers():
+            runtime.start(self)
+
+    def _request_start(self):
+        """
+        Starts this service (if lazy) now that a widget is attached
+        """
+        if self._stop_timeout is not None:
+            GLib.source_remove(self._stop_timeout)
+            self._stop_timeout = None
+
+        if self.lazy and self._runtime is not None:
+            self._runtime.start(self)
+
+    def _request_stop(self):
+        """
+        Stops this service (if lazy) after lazy_stop_delay,
+        now that no widgets are attached.
+        """
+        if not self.lazy or self._runtime is None or self._stop_timeout is not None:
+            return
+
+        self._stop_timeout = GLib.timeout_add(self.lazy_stop_delay, self._lazy_stop)
+
+    def _lazy_stop(self) -> bool:
+        """
+        Timeout stopping this service, unless a widget attached since
+        """
+        self._stop_timeout = None
+
+        if not self._has_subscribers():
+            self._runtime.stop(self)
+
+        return GLib.SOURCE_REMOVE
+
     def emit_signal(self, signal: ServiceSignal):
         """
         Emit's a signal across all widgets which are listening
@@ -70,7 +327,57 @@ class BaseService:
             signal (ServiceSignal): The signal being emitted
         """
 
-        GLib.idle_add(self._run_signal, signal)
+        if self._stop_event.is_set():
+            return
+
+        self.signal_queue.put(signal)
+
+    def emit_signals(self, signals: list[ServiceSignal]):
+        """
+        Emit's several signals in order, see emit_signal
+
+        Args:
+            signals (list[ServiceSignal]): The signals being emitted
+        """
+
+        if self._stop_event.is_set():
+            return
+
+        self.signal_queue.put_many(signals)
+
+    def run_in_order(self, callback: Callable, *args):
+        """
+        Runs a callback on the main thread in order with the signals
+        emitted by this service, e.g for updating state signals depend on.
+
+        Args:
+            callback (Callable): The callback
+            *args: The arguments to the callback
+        """
+
+        if self._stop_event.is_set():
+            return
+
+        self.signal_queue.put_callback(partial(callback, *args))
+
+    def _run_queued(self, batch: list[ServiceSignal | Callable]):
+        """
+        Runs a batch of signals (and callbacks) from the signal queue
+
+        Args:
+            batch (list[ServiceSignal | Callable]): The queued items in order
+        """
+
+        for item in batch:
+            try:
+                if isinstance(item, ServiceSignal):
+                    self._run_signal(item)
+                else:
+                    item()
+            except Exception:
+                logger.exception(
+                    f"Error while running a queued signal of {self.__class__.__name__}"
+                )
 
     def _run_signal(self, signal: ServiceSignal):
         """
@@ -80,10 +387,203 @@ class BaseService:
             signal (ServiceSignal): The signal being ran
         """
 
-        # Emit signal for all the widgets
-        for widget, signals in self._attached_widgets.items():
-            if signal.signal in signals:
-                widget.emit(self.annotation.get_prefix() + signal.signal, *signal.args)
+        if signal.signal in self.sticky_signals:
+            self._keep_sticky(signal)
+
+        # Copied, since listeners may remove themselves while we emit
+        for listener in tuple(self._signal_listeners.get(signal.signal, ())):
+            try:
+                listener(*signal.args)
+            except Exception:
+                logger.exception(
+                    f"Error in listener of {signal.signal} of {self.__class__.__name__}"
+                )
+
+        if self.direct_dispatch:
+            self._call_handlers(signal)
+            return
+
+        signal_name = self.annotation.get_prefix() + signal.signal
+
+        # Copied, since handlers may detach widgets while we emit
+        for bucket in self._get_buckets(signal):
+            for widget in list(bucket):
+                widget.emit(signal_name, *signal.args)
+
+    def _get_buckets(self, signal: ServiceSignal) -> list[WeakSet["Widget"]]:
+        """
+        Returns the widgets subscribed to a signal within its scope
+
+        Args:
+            signal (ServiceSignal): The signal
+
+        Returns:
+            list[WeakSet[Widget]]: The subscribed widgets, grouped by scope
+        """
+
+        scope_widgets = self._subscribers.get(signal.signal)
+        if not scope_widgets:
+            return []
+
+        # Only widgets within the signal's scope (or without one) recieve it
+        if signal.scope is None:
+            return list(scope_widgets.values())
+
+        return [scope_widgets.get(None, ()), scope_widgets.get(signal.scope, ())]
+
+    def _call_handlers(self, signal: ServiceSignal):
+        """
+        Calls the handlers of the subscribed widgets directly, see direct_dispatch
+
+        Args:
+            signal (ServiceSignal): The signal being ran
+        """
+
+        signal_name = signal.signal
+        cache_key = (signal_name, signal.scope)
+
+        handlers = self._handler_cache.get(cache_key)
+        if handlers is None:
+            handlers = self._handler_cache[cache_key] = tuple(
+                (ref(widget), tuple(self._callbacks[widget].get(signal_name, ())))
+                for bucket in self._get_buckets(signal)
+                for widget in bucket
+                if widget in self._callbacks
+            )
+
+        signal_args = signal.args
+
+        for widget_ref, callbacks in handlers:
+            widget = widget_ref()
+            if widget is None:
+                continue
+
+            for callback in callbacks:
+                try:
+                    callback(widget, *signal_args)
+                except Exception:
+                    logger.exception(
+                        f"Error in handler {callback.__name__} of {widget.__class__.__name__} for {signal_name}"
+                    )
+
+    def _keep_sticky(self, signal: ServiceSignal):
+        """
+        Keeps a sticky signal for replaying to widgets which attach later
+
+        Args:
+            signal (ServiceSignal): The signal being ran
+        """
+
+        key_index = self.sticky_signals[signal.signal]
+        kept = self._sticky.setdefault(signal.signal, {})
+
+        # Accumulated signals are kept as each of the signals they collected
+        if self.accumulates(signal.signal):
+            signals = []
+            for args in signal.args[0]:
+                collected = ServiceSignal(signal.signal, *args)
+                collected.scope = signal.scope
+                signals.append(collected)
+        else:
+            signals = [signal]
+
+        for kept_signal in signals:
+            key = (
+                kept_signal.scope,
+                None if key_index is None else kept_signal.args[key_index],
+            )
+
+            # Moved to the end, so kept signals are in the order they were last ran
+            kept.pop(key, None)
+            kept[key] = kept_signal
+
+    def forget_sticky(self, signal: str, key: any):
+        """
+        Forgets the kept signals of a key in every scope, e.g a device
+        which was removed, so widgets attaching later aren't replayed it.
+        This must be called on the main thread (see run_in_order).
+
+        Args:
+            signal (str): The name of the sticky signal
+            key (any): The value of its key argument, None for signals without one
+        """
+
+        kept = self._sticky.get(signal)
+        if not kept:
+            return
+
+        for kept_key in [kept_key for kept_key in kept if kept_key[1] == key]:
+            del kept[kept_key]
+
+    def _get_sticky_signals(
+        self, signal: str, scope: str | None
+    ) -> list[ServiceSignal]:
+        """
+        Returns the newest kept signal of each key within a scope,
+        in the order they were last ran.
+
+        Args:
+            signal (str): The name of the signal
+            scope (str | None): The scope, None for every scope
+
+        Returns:
+            list[ServiceSignal]: The kept signals
+        """
+
+        newest = {}
+
+        for (signal_scope, key), kept_signal in tuple(
+            self._sticky.get(signal, {}).items()
+        ):
+            if scope is not None and signal_scope not in (None, scope):
+                continue
+
+            # A key kept in several scopes (e.g the focused monitor) only
+            # replays its newest value
+            newest.pop(key, None)
+            newest[key] = kept_signal
+
+        return list(newest.values())
+
+    def get_sticky_args(self, widget: "Widget", signal: str) -> list[tuple]:
+        """
+        Returns the arguments of the last sticky signals an attached widget
+        would have recieved, see sticky_signals.
+
+        Args:
+            widget (Widget): The attached widget
+            signal (str): The name of the signal
+
+        Returns:
+            list[tuple]: The handler arguments to replay, see _get_sticky_replay
+        """
+
+        return self._get_sticky_replay(signal, self._widget_scopes.get(widget))
+
+    def _get_sticky_replay(self, signal: str, scope: str | None) -> list[tuple]:
+        """
+        Returns the arguments to call a handler of a sticky signal with
+        to replay its kept signals. This is the arguments of the newest kept
+        signal of each key in the order they were last ran, unless the signal
+        accumulates, then it's a single call with the list of their arguments.
+
+        Args:
+            signal (str): The name of the signal
+            scope (str | None): The scope, None for every scope
+
+        Returns:
+            list[tuple]: The arguments of each handler call
+        """
+
+        kept_args = [
+            tuple(kept_signal.args)
+            for kept_signal in self._get_sticky_signals(signal, scope)
+        ]
+
+        if kept_args and self.accumulates(signal):
+            return [(kept_args,)]
+
+        return kept_args
 
     def get_annotation(self):
         """
@@ -92,21 +592,51 @@ class BaseService:
 
         return self.annotation
 
-    def attach_widget(self, widget: Widget, signal: str):
+    def attach_widget(
+        self, widget: "Widget", signal: str, callback: Optional[Callable] = None
+    ):
         """
         Adds a widget to this service, enabling for it
         to recieve this specific signal from this service
 
         Args:
             widget (Widget): The widget to add to this service
+            signal (str): The signal the widget recieves
+            callback (Optional[Callable], optional): The handler called with the widget and the signal's arguments when using direct_dispatch.
         """
 
-        try:
-            self._attached_widgets[widget].append(signal)
-        except KeyError:
-            self._attached_widgets[widget] = [signal]
+        self._handler_cache.clear()
+
+        if callback is not None:
+            self._callbacks.setdefault(widget, {}).setdefault(signal, []).append(
+                callback
+            )
+
+        signals = self._attached_widgets.get(widget)
+
+        if signals is None:
+            signals = self._attached_widgets[widget] = set()
+            self._widget_scopes[widget] = self.get_widget_scope(widget)
+            self._finalizers[widget] = finalize(widget, _on_widget_collected, ref(self))
+            self._request_start()
+
+        # Widgets attach again every time they are mapped
+        if signal in signals:
+            return
+
+        signals.add(signal)
 
-    def detach_widget(self, widget: Widget):
+        scope = self._widget_scopes[widget]
+        first_subscriber = signal not in self._subscribers
+
+        self._subscribers.setdefault(signal, {}).setdefault(scope, WeakSet()).add(
+            widget
+        )
+
+        if first_subscriber:
+            self._notify_subscription_listeners()
+
+    def detach_widget(self, widget: "Widget"):
         """
         Remove's this widget from this service
         thus stopping the widget from recieving signals from this service.
@@ -115,7 +645,236 @@ class BaseService:
             widget (Widget): The widget to detach
         """
 
-        self._attached_widgets.pop(widget, None)
+        scope = self._widget_scopes.pop(widget, None)
+        self._callbacks.pop(widget, None)
+
+        widget_finalizer = self._finalizers.pop(widget, None)
+        if widget_finalizer is not None:
+            widget_finalizer.detach()
+
+        self._handler_cache.clear()
+        unsubscribed = False
+
+        for signal in self._attached_widgets.pop(widget, ()):
+            scope_widgets = self._subscribers.get(signal)
+            if scope_widgets is None:
+                continue
+
+            bucket = scope_widgets.get(scope)
+            if bucket is not None:
+                bucket.discard(widget)
+
+                if not bucket:
+                    scope_widgets.pop(scope, None)
+
+            if not scope_widgets:
+                self._subscribers.pop(signal, None)
+                unsubscribed = True
+
+        if unsubscribed:
+            self._notify_subscription_listeners()
+
+        if not self._has_subscribers():
+            self._request_stop()
+
+    def _forget_collected_widgets(self):
+        """
+        Removes the emptied buckets of garbage collected widgets, stopping
+        this service (if lazy) when they were the last subscribers.
+        """
+        unsubscribed = False
+
+        for signal, scope_widgets in tuple(self._subscribers.items()):
+            for scope, bucket in tuple(scope_widgets.items()):
+                if not bucket:
+                    del scope_widgets[scope]
+
+            if not scope_widgets:
+                del self._subscribers[signal]
+                unsubscribed = True
+
+        if unsubscribed:
+            self._handler_cache.clear()
+            self._notify_subscription_listeners()
+
+        if not self._has_subscribers():
+            self._request_stop()
+
+    def get_widget_scope(self, widget: "Widget") -> str | None:
+        """
+        Returns the scope a widget is attached within, scoped signals
+        are only ran on widgets within their scope (or without one).
+
+        Services with scoped signals should override this,
+        by default widgets have no scope and recieve every signal.
+
+        Args:
+            widget (Widget): The widget being attached
+
+        Returns:
+            str | None: The scope of the widget, None for no scope
+        """
+        return None
+
+    def is_subscribed(self, signal: str) -> bool:
+        """
+        Returns whether any widget is attached to a signal of this service,
+        services may use this to skip producing signals nobody recieves.
+
+        This is safe to call from the service's thread.
+
+        Args:
+            signal (str): The name of the signal
+
+        Returns:
+            bool: True if at least one widget is attached to the signal
+        """
+        if signal in self._signal_listeners:
+            return True
+
+        scope_widgets = self._subscribers.get(signal)
+        if scope_widgets is None:
+            return False
+
+        # Buckets may have emptied as their widgets were garbage collected
+        return any(tuple(scope_widgets.values()))
+
+    def get_subscribed_signals(self) -> set[str]:
+        """
+        Returns the signals of this service which widgets are attached to
+
+        This is safe to call from the service's thread.
+        """
+        return {
+            signal
+            for signal, scope_widgets in tuple(self._subscribers.items())
+            if any(tuple(scope_widgets.values()))
+        }.union(tuple(self._signal_listeners))
+
+    def _has_subscribers(self) -> bool:
+        """
+        Returns whether any widget or signal listener is attached
+        """
+        return bool(self._attached_widgets) or bool(self._signal_listeners)
+
+    def add_signal_listener(self, signal: str, listener: Callable):
+        """
+        Adds a callback of a signal which isn't a widget, called on the
+        main thread with the signal's arguments (of every scope). It
+        subscribes to the signal like an attached widget, so it starts
+        lazy services and receives sticky signals straight away.
+
+        Args:
+            signal (str): The name of the signal
+            listener (Callable): Called with the signal's arguments
+        """
+        first_subscriber = not self.is_subscribed(signal)
+        self._signal_listeners.setdefault(signal, []).append(listener)
+
+        self._request_start()
+
+        if first_subscriber:
+            self._notify_subscription_listeners()
+
+        for args in self._get_sticky_replay(signal, None):
+            listener(*args)
+
+    def remove_signal_listener(self, signal: str, listener: Callable):
+        """
+        Removes a listener added with add_signal_listener
+
+        Args:
+            signal (str): The name of the signal
+            listener (Callable): The listener
+        """
+        listeners = self._signal_listeners.get(signal)
+        if listeners is None or listener not in listeners:
+            return
+
+        listeners.remove(listener)
+
+        if not listeners:
+            del self._signal_listeners[signal]
+
+            if not self.is_subscribed(signal):
+                self._notify_subscription_listeners()
+
+        if not self._has_subscribers():
+            self._request_stop()
+
+    def add_subscription_listener(self, listener: Callable[[], None]):
+        """
+        Adds a listener called on the main thread whenever a signal of this
+        service gains its first or loses its last subscriber.
+
+        Args:
+            listener (Callable[[], None]): The listener
+        """
+        self._subscription_listeners.append(listener)
+
+    def remove_subscription_listener(self, listener: Callable[[], None]):
+        """
+        Removes a listener added with add_subscription_listener
+
+        Args:
+            listener (Callable[[], None]): The listener
+        """
+        self._subscription_listeners.remove(listener)
+
+    def _notify_subscription_listeners(self):
+        """
+        Calls every subscription listener
+        """
+        for listener in list(self._subscription_listeners):
+            listener()
+
+    def get_signal_coalesce(self, signal: str) -> Coalesce | None:
+        """
+        Returns how pending signals collapse before reaching the main
+        thread, by default from signal_coalescing.
+
+        Args:
+            signal (str): The signal
+
+        Returns:
+            Coalesce | None: The coalescing of the signal, None to emit every signal
+        """
+        return self.signal_coalescing.get(signal)
+
+    def get_handler_arg_types(self, signal: str) -> tuple[any] | None:
+        """
+        Returns the arguments handlers of a signal recieve, these are the
+        signal's arg types unless the signal accumulates (then handlers
+        recieve a list of each signal's arguments).
+
+        Args:
+            signal (str): The signal
+
+        Returns:
+            tuple[any] | None: The arguments, None if the signal doesn't exist
+        """
+        signal_args = self.get_signal_arg_types(signal)
+        if signal_args is None:
+            return None
+
+        if self.accumulates(signal):
+            return (object,)
+
+        return signal_args
+
+    def accumulates(self, signal: str) -> bool:
+        """
+        Returns whether pending signals of a signal are collected into one,
+        see CoalescePolicy.ACCUMULATE
+
+        Args:
+            signal (str): The signal
+
+        Returns:
+            bool: True if handlers recieve a list of each signal's arguments
+        """
+        coalesce = self.get_signal_coalesce(signal)
+        return coalesce is not None and coalesce.policy is CoalescePolicy.ACCUMULATE
 
     def get_signal_arg_types(self, signal: str) -> tuple[any] | None:
         """
@@ -131,3 +890,22 @@ class BaseService:
             tuple[any]: A tuple of the arguments to this signal's handlers
         """
         pass
+
+
+def _on_widget_collected(service_ref: ref):
+    """
+    Finalizer of widgets attached to a service, garbage collection may
+    happen on any thread so the service is told on the main loop.
+
+    Args:
+        service_ref (ref): Weak reference to the service the widget was attached to
+    """
+
+    def forget() -> bool:
+        service = service_ref()
+        if service is not None:
+            service._forget_collected_widgets()
+
+        return GLib.SOURCE_REMOVE
+
+    GLib.idle_add(forget)
@@ -0,0 +1,384 @@
+import logging
+import re
+from collections.abc import Callable
+from typing import Optional
+from gi.repository import Gio, GLib, GObject
+from borealis.service.main_loop_service import MainLoopService
+from borealis.service.service_annotate import ServiceAnnotation
+from borealis.service.service_signal import ServiceSignal
+
+logger = logging.getLogger(__name__)
+
+MEMBER_PATTERN = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+"""
+Matches the boundaries between words of D-Bus member names
+"""
+
+
+def member_to_signal(member: str) -> str:
+    """
+    Converts the name of a D-Bus signal to the name of a borealis signal
+
+    Args:
+        member (str): The D-Bus name, e.g Seeked or DeviceAdded
+
+    Returns:
+        str: The borealis name, e.g seeked or device-added
+    """
+    return MEMBER_PATTERN.sub("-", member).lower()
+
+
+class DBusService(MainLoopService):
+    """
+    Base class for services backed by a single D-Bus object, e.g UPower,
+    an MPRIS player or NetworkManager.
+
+    The object's properties are cached by a Gio.DBusProxy and kept up to
+    date from PropertiesChanged, so reading them never waits on the bus.
+    Only the D-Bus signals in dbus_signals are subscribed to, each with a
+    match rule naming its sender, path, interface and member so the bus
+    daemon filters out everything else. Methods are called asynchronously.
+
+    The service emits:
+    - property: The name and unpacked value of a property whenever it
+      changes (kept per property for newly attached widgets)
+    - available: Whether the object's bus name has an owner
+    - The signals in dbus_signals, named in kebab case (e.g DeviceAdded
+      is device-added) with their unpacked arguments
+    """
+
+    bus_type: Gio.BusType = Gio.BusType.SYSTEM
+    """
+    The bus the object is on
+    """
+
+    bus_address: Optional[str] = None
+    """
+    The address of the bus the object is on, used instead of bus_type
+    if set (e.g a private bus)
+    """
+
+    bus_name: str
+    """
+    The well-known name owning the object, e.g org.freedesktop.UPower
+    """
+
+    object_path: str
+    """
+    The path of the object, e.g /org/freedesktop/UPower/devices/DisplayDevice
+    """
+
+    interface_name: str
+    """
+    The interface of the object, e.g org.freedesktop.UPower.Device
+    """
+
+    dbus_signals: dict[str, tuple[any]] = {}
+    """
+    The D-Bus signals of the interface to subscribe to, along with
+    the arguments of their handlers.
+    """
+
+    sticky_signals: dict[str, int | None] = {"property": 0, "available": None}
+    """
+    Properties are kept by their name, with whether the object is available
+    """
+
+    proxy: Optional[Gio.DBusProxy]
+    """
+    The proxy of the object, None until it's created
+    """
+
+    _connection: Optional[Gio.DBusConnection]
+    """
+    The connection to the bus
+    """
+
+    _cancellable: Optional[Gio.Cancellable]
+    """
+    Cancels connecting and pending calls once the service stops
+    """
+
+    _subscriptions: list[int]
+    """
+    The ids of the D-Bus signal subscriptions
+    """
+
+    _owner_handler: Optional[int]
+    """
+    The id of the handler of the proxy's name owner changing
+    """
+
+    def __init__(self, annotation: Optional[ServiceAnnotation] = None):
+        """
+        Creates a new D-Bus service
+
+        Args:
+            annotation (Optional[ServiceAnnotation], optional): The annotation information to use for widgets for this service.
+        """
+        super().__init__(annotation)
+        self.proxy = None
+        self._connection = None
+        self._cancellable = None
+        self._subscriptions = []
+        self._owner_handler = None
+
+    def start_service(self):
+        """
+        Connects to the bus, then creates the proxy
+        """
+        self._cancellable = Gio.Cancellable()
+
+        if self.bus_address is not None:
+            Gio.DBusConnection.new_for_address(
+                self.bus_address,
+                Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT
+                | Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+                None,
+                self._cancellable,
+                self._on_connected,
+                Gio.DBusConnection.new_for_address_finish,
+            )
+        else:
+            Gio.bus_get(
+                self.bus_type, self._cancellable, self._on_connected, Gio.bus_get_finish
+            )
+
+    def stop_service(self):
+        """
+        Unsubscribes from the object, cancelling anything pending
+        """
+        super().stop_service()
+
+        if self._cancellable is not None:
+            self._cancellable.cancel()
+
+        if self._connection is not None:
+            for subscription in self._subscriptions:
+                self._connection.signal_unsubscribe(subscription)
+
+            # Private buses are only used by this service
+            if self.bus_address is not None:
+                self._connection.close(None, None, None)
+
+        if self.proxy is not None and self._owner_handler is not None:
+            self.proxy.disconnect(self._owner_handler)
+
+        self.proxy = None
+        self._connection = None
+        self._cancellable = None
+        self._subscriptions = []
+        self._owner_handler = None
+
+    def _on_connected(
+        self,
+        source: Optional[GObject.Object],
+        result: Gio.AsyncResult,
+        finish: Callable,
+    ):
+        """
+        Subscribes to the object's signals and creates its proxy
+        """
+        try:
+            self._connection = finish(result)
+        except GLib.Error as e:
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                logger.error(
+                    f"Failed to connect {self.__class__.__name__} to D-Bus: {e}"
+                )
+            return
+
+        self._subscriptions.append(
+            self._connection.signal_subscribe(
+                self.bus_name,
+                "org.freedesktop.DBus.Properties",
+                "PropertiesChanged",
+                self.object_path,
+                # Only changes to this interface's properties
+                self.interface_name,
+                Gio.DBusSignalFlags.NONE,
+                self._on_properties_changed,
+            )
+        )
+
+        for member in self.dbus_signals:
+            self._subscriptions.append(
+                self._connection.signal_subscribe(
+                    self.bus_name,
+                    self.interface_name,
+                    member,
+                    self.object_path,
+                    None,
+                    Gio.DBusSignalFlags.NONE,
+                    self._on_dbus_signal,
+                )
+            )
+
+        # The proxy's own subscriptions would match every signal of the
+        # object, the ones above are narrower.
+        Gio.DBusProxy.new(
+            self._connection,
+            Gio.DBusProxyFlags.DO_NOT_CONNECT_SIGNALS,
+            None,
+            self.bus_name,
+            self.object_path,
+            self.interface_name,
+            self._cancellable,
+            self._on_proxy,
+        )
+
+    def _on_proxy(self, source: Optional[GObject.Object], result: Gio.AsyncResult):
+        """
+        Emits the object's properties once its proxy has loaded them
+        """
+        try:
+            self.proxy = Gio.DBusProxy.new_finish(result)
+        except GLib.Error as e:
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                logger.error(f"Failed to create proxy for {self.bus_name}: {e}")
+            return
+
+        self._owner_handler = self.proxy.connect(
+            "notify::g-name-owner", lambda *_: self._on_owner_changed()
+        )
+        self._on_owner_changed()
+
+    def _on_owner_changed(self):
+        """
+        Emits whether the object is available, and all of its properties
+        since they are reloaded whenever the name gains an owner
+        """
+        available = self.proxy.get_name_owner() is not None
+        self.emit_signal(ServiceSignal("available", available))
+
+        if available:
+            for name in self.proxy.get_cached_property_names():
+                self.emit_signal(
+                    ServiceSignal("property", name, self.get_property(name))
+                )
+
+    def _on_properties_changed(
+        self,
+        connection: Gio.DBusConnection,
+        sender: str,
+        path: str,
+        interface: str,
+        member: str,
+        parameters: GLib.Variant,
+    ):
+        """
+        Updates the proxy's cache, emitting the properties which changed
+        """
+        if self.proxy is None:
+            return
+
+        _, changed, invalidated = parameters.unpack()
+        changed_variants = parameters.get_child_value(1)
+
+        for name in changed:
+            value = changed_variants.lookup_value(name, None)
+            old = self.proxy.get_cached_property(name)
+
+            if old is not None and old.equal(value):
+                continue
+
+            self.proxy.set_cached_property(name, value)
+            self.emit_signal(ServiceSignal("property", name, changed[name]))
+
+        for name in invalidated:
+            self.proxy.set_cached_property(name, None)
+            self.emit_signal(ServiceSignal("property", name, None))
+
+    def _on_dbus_signal(
+        self,
+        connection: Gio.DBusConnection,
+        sender: str,
+        path: str,
+        interface: str,
+        member: str,
+        parameters: GLib.Variant,
+    ):
+        """
+        Emits a subscribed D-Bus signal
+        """
+        self.emit_signal(ServiceSignal(member_to_signal(member), *parameters.unpack()))
+
+    def get_property(self, name: str) -> any:
+        """
+        Returns a cached property of the object, without a round trip
+
+        Args:
+            name (str): The name of the property
+
+        Returns:
+            any: The unpacked value, None if unknown
+        """
+        if self.proxy is None:
+            return None
+
+        value = self.proxy.get_cached_property(name)
+        return value.unpack() if value is not None else None
+
+    def call(
+        self,
+        method: str,
+        parameters: Optional[GLib.Variant] = None,
+        callback: Optional[Callable[[any, Optional[GLib.Error]], None]] = None,
+        timeout: int = -1,
+    ):
+        """
+        Calls a method of the object asynchronously
+
+        Args:
+            method (str): The name of the method
+            parameters (Optional[GLib.Variant], optional): The arguments, as a tuple variant. Defaults to None.
+            callback (Optional[Callable[[any, Optional[GLib.Error]], None]], optional): Called on the main thread with the unpacked result and None, or None and the error. Defaults to None.
+            timeout (int, optional): Milliseconds to wait for the reply, -1 for the default. Defaults to -1.
+        """
+        if self.proxy is None:
+            logger.warning(
+                f"Can't call {method} before {self.__class__.__name__} is connected"
+            )
+            return
+
+        def on_reply(proxy: Gio.DBusProxy, result: Gio.AsyncResult):
+            try:
+                reply = proxy.call_finish(result)
+            except GLib.Error as e:
+                if e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                    return
+
+                if callback is None:
+                    logger.warning(f"D-Bus call {method} failed: {e}")
+                else:
+                    callback(None, e)
+                return
+
+            if callback is not None:
+                callback(reply.unpack(), None)
+
+        self.proxy.call(
+            method,
+            parameters,
+            Gio.DBusCallFlags.NONE,
+            timeout,
+            self._cancellable,
+            on_reply,
+        )
+
+    def get_signal_arg_types(self, signal: str) -> tuple[any] | None:
+        """
+        Returns the arguments of the property and available signals,
+        along with those of dbus_signals
+        """
+        if signal == "property":
+            return (str, object)
+
+        if signal == "available":
+            return (bool,)
+
+        for member, arg_types in self.dbus_signals.items():
+            if member_to_signal(member) == signal:
+                return arg_types
+
+        return None
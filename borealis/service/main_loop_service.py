@@ -0,0 +1,164 @@
+import logging
+from collections.abc import Callable
+from typing import Optional
+from gi.repository import GLib
+from borealis.service.base_service import BaseService
+from borealis.service.service_annotate import ServiceAnnotation
+from borealis.service.service_signal import ServiceSignal
+from borealis.service.signal_queue import Coalesce
+
+logger = logging.getLogger(__name__)
+
+
+class MainLoopService(BaseService):
+    """
+    Base class for services driven by file descriptors, which run on the
+    main loop instead of a thread.
+
+    start_service is called on the main thread and should open the
+    service's fds non-blocking and watch them with watch_fd. Signals are
+    ran on widgets as soon as they are emitted, without a queue, so
+    signal_coalescing doesn't apply to these services.
+    """
+
+    threaded: bool = False
+    """
+    These services run on the main loop, never on a worker
+    """
+
+    fd_priority: int = GLib.PRIORITY_DEFAULT
+    """
+    The main loop priority the fds of this service are handled at
+    """
+
+    _fd_sources: dict[int, int]
+    """
+    The ids of the main loop sources watching each fd
+    """
+
+    def __init__(self, annotation: Optional[ServiceAnnotation] = None):
+        """
+        Creates a new service ran on the main loop
+
+        Args:
+            annotation (Optional[ServiceAnnotation], optional): The annotation information to use for widgets for this service.
+        """
+        super().__init__(annotation)
+        self._fd_sources = {}
+
+    def start_service(self):
+        """
+        Starting routine for this service, which should watch its fds.
+
+        This is executed on the main thread, so it must not block.
+        """
+        pass
+
+    def stop_service(self):
+        """
+        Stops watching every fd of this service, services
+        should override this to close their fds, calling super.
+        """
+        super().stop_service()
+
+        for source_id in self._fd_sources.values():
+            GLib.source_remove(source_id)
+
+        self._fd_sources.clear()
+
+    def watch_fd(
+        self,
+        fd: int,
+        callback: Callable[[int, GLib.IOCondition], bool],
+        condition: GLib.IOCondition = GLib.IOCondition.IN
+        | GLib.IOCondition.HUP
+        | GLib.IOCondition.ERR,
+    ):
+        """
+        Calls a callback on the main loop whenever an fd is ready,
+        the fd is no longer watched once the callback returns False.
+
+        Args:
+            fd (int): The fd, which should be non-blocking
+            callback (Callable[[int, GLib.IOCondition], bool]): Called with the fd and its condition
+            condition (GLib.IOCondition, optional): The conditions to wait for. Defaults to IN | HUP | ERR.
+        """
+
+        def fd_callback(fd: int, condition: GLib.IOCondition) -> bool:
+            try:
+                keep = callback(fd, condition)
+            except Exception:
+                logger.exception(
+                    f"Error while handling an fd of {self.__class__.__name__}"
+                )
+                keep = False
+
+            if not keep:
+                self._fd_sources.pop(fd, None)
+
+            return keep
+
+        self.unwatch_fd(fd)
+        self._fd_sources[fd] = GLib.unix_fd_add_full(
+            self.fd_priority, fd, condition, fd_callback
+        )
+
+    def unwatch_fd(self, fd: int):
+        """
+        Stops watching an fd
+
+        Args:
+            fd (int): The fd
+        """
+        source_id = self._fd_sources.pop(fd, None)
+
+        if source_id is not None:
+            GLib.source_remove(source_id)
+
+    def emit_signal(self, signal: ServiceSignal):
+        """
+        Runs a signal on the widgets listening to it straight away
+
+        Args:
+            signal (ServiceSignal): The signal being emitted
+        """
+
+        if self.is_stopping():
+            return
+
+        # Handlers failing shouldn't stop the fd being watched
+        try:
+            self._run_signal(signal)
+        except Exception:
+            logger.exception(
+                f"Error while running a signal of {self.__class__.__name__}"
+            )
+
+    def emit_signals(self, signals: list[ServiceSignal]):
+        """
+        Runs several signals in order, see emit_signal
+
+        Args:
+            signals (list[ServiceSignal]): The signals being emitted
+        """
+
+        for signal in signals:
+            self.emit_signal(signal)
+
+    def run_in_order(self, callback: Callable, *args):
+        """
+        Runs a callback straight away, since signals aren't queued
+
+        Args:
+            callback (Callable): The callback
+            *args: The arguments to the callback
+        """
+
+        if not self.is_stopping():
+            callback(*args)
+
+    def get_signal_coalesce(self, signal: str) -> Coalesce | None:
+        """
+        Signals are never pending, so they are never coalesced
+        """
+        return None
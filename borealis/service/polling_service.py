@@ -0,0 +1,186 @@
+import logging
+import threading
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Optional
+from borealis.service.base_service import BaseService
+from borealis.service.service_annotate import ServiceAnnotation
+from borealis.service.service_signal import ServiceSignal
+
+if TYPE_CHECKING:
+    from borealis.widget.widget import Widget
+
+logger = logging.getLogger(__name__)
+
+
+class PollingService(BaseService):
+    """
+    Base class for services which sample their data periodically
+    (e.g batteries, disk usage, temperatures).
+
+    Samples are taken once per period no matter how many widgets are
+    attached, and each signal is only emitted when its sample changed.
+    Polled signals are sticky, so widgets attaching later recieve the
+    current sample straight away. Sampling stops while nothing is
+    attached (services are lazy by default).
+    """
+
+    poll_period: int = 1000
+    """
+    Milliseconds between samples, widgets may ask for a faster period
+    while they are attached with Widget.poll_period.
+    """
+
+    polled_signals: dict[str, tuple[any]] = {}
+    """
+    The signals of this service along with the arguments of their handlers
+    """
+
+    _period: int
+    """
+    The current period, the fastest of the attached widgets
+    """
+
+    _last_samples: dict[str, tuple]
+    """
+    The last emitted sample of each signal
+    """
+
+    _wake: threading.Event
+    """
+    Wakes up the sampling loop early, to sample newly subscribed signals,
+    use a faster period or stop.
+    """
+
+    def __init__(self, annotation: Optional[ServiceAnnotation] = None):
+        """
+        Creates a new polling service
+
+        Args:
+            annotation (Optional[ServiceAnnotation], optional): The annotation information to use for widgets for this service.
+        """
+        super().__init__(annotation)
+
+        # Every polled signal is sticky, since it's only emitted on change
+        self.sticky_signals = {
+            **dict.fromkeys(self.polled_signals),
+            **self.sticky_signals,
+        }
+
+        self._period = self.poll_period
+        self._last_samples = {}
+        self._wake = threading.Event()
+
+        self.add_subscription_listener(self._wake.set)
+
+    def sample(self, signals: set[str]) -> dict[str, tuple]:
+        """
+        Samples the data of this service, this is executed on the
+        service's thread once per period.
+
+        Args:
+            signals (set[str]): The signals widgets are attached to, others may be skipped
+
+        Returns:
+            dict[str, tuple]: The arguments of each sampled signal
+        """
+        return {}
+
+    def start_service(self):
+        """
+        Samples every period until the service is stopped
+        """
+
+        self._last_samples = {}
+
+        while not self.is_stopping():
+            self._wake.clear()
+
+            signals = self.get_subscribed_signals()
+
+            if signals:
+                self._poll(signals)
+
+            self._wake.wait(self._period / 1000)
+
+    def _poll(self, signals: set[str]):
+        """
+        Takes a sample, emitting the signals which changed since the last one
+
+        Args:
+            signals (set[str]): The signals widgets are attached to
+        """
+
+        try:
+            samples = self.sample(signals)
+        except Exception:
+            logger.exception(f"Failed to sample {self.__class__.__name__}")
+            return
+
+        changed = []
+
+        for signal, args in samples.items():
+            args = tuple(args)
+
+            if self._last_samples.get(signal) != args:
+                self._last_samples[signal] = args
+                changed.append(ServiceSignal(signal, *args))
+
+        if changed:
+            self.emit_signals(changed)
+
+    def stop_service(self):
+        """
+        Stops sampling, waking up the sampling loop so it returns straight away
+        """
+        super().stop_service()
+        self._wake.set()
+
+    def attach_widget(
+        self, widget: "Widget", signal: str, callback: Optional[Callable] = None
+    ):
+        """
+        Adds a widget to this service, using its poll period if it's faster
+
+        Args:
+            widget (Widget): The widget to add to this service
+            signal (str): The signal the widget recieves
+            callback (Optional[Callable], optional): The handler called with the widget and the signal's arguments when using direct_dispatch.
+        """
+        super().attach_widget(widget, signal, callback)
+        self._update_period()
+
+    def detach_widget(self, widget: "Widget"):
+        """
+        Removes a widget from this service, going back to the fastest
+        period of the widgets still attached
+
+        Args:
+            widget (Widget): The widget to remove from this service
+        """
+        super().detach_widget(widget)
+        self._update_period()
+
+    def _update_period(self):
+        """
+        Uses the fastest period of the attached widgets
+        """
+
+        period = min(
+            (
+                widget.poll_period or self.poll_period
+                for widget in list(self._attached_widgets.keys())
+            ),
+            default=self.poll_period,
+        )
+
+        faster = period < self._period
+        self._period = period
+
+        if faster:
+            self._wake.set()
+
+    def get_signal_arg_types(self, signal: str) -> tuple[any] | None:
+        """
+        Returns the arguments of a polled signal, see polled_signals
+        """
+        return self.polled_signals.get(signal)
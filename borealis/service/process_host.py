@@ -0,0 +1,522 @@
+"""
+Hosting of services in child processes, see BaseService.process_hosted.
+
+The child process constructs the service by importing its class (so the
+service must be defined in an importable module and take no arguments)
+and runs its start_service. Signals are streamed back to the service in
+the UI process over a pipe, where they are emitted to widgets as usual.
+
+Frames on both pipes are a little-endian u32 length followed by a
+marshal encoded payload, so signal arguments are limited to the types
+marshal supports (None, bool, int, float, str, bytes, tuple, list, dict,
+set). The UI process sends the signals which have subscribers whenever
+they change, and closes the child's stdin to stop it.
+
+The child never imports the borealis package itself, which would load
+the widget layer (Gtk, layer shell) only to run a service. Its modules
+are imported under a bare package instead, where borealis.NAME resolves
+from borealis.service, borealis.ext and borealis.store. Services ran on
+the main loop (see MainLoopService) get a GLib main loop of their own.
+
+Usage (done by ServiceRuntime):
+    python -c CHILD_BOOTSTRAP PACKAGE_DIR MODULE QUALNAME SIGNAL_FD
+"""
+
+import importlib
+import logging
+import marshal
+import os
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable
+from typing import BinaryIO, Optional
+from gi.repository import GLib
+from borealis.service.base_service import BaseService
+from borealis.service.main_loop_service import MainLoopService
+from borealis.service.service_signal import ServiceSignal
+
+logger = logging.getLogger(__name__)
+
+FRAME_HEADER = struct.Struct("<I")
+"""
+Header of each frame, the length of its payload
+"""
+
+HEADLESS_PACKAGES = ("borealis.service", "borealis.ext", "borealis.store")
+"""
+The packages borealis.NAME resolves from in the child, none of them import Gtk
+"""
+
+CHILD_BOOTSTRAP = """
+import sys, types
+
+package = types.ModuleType("borealis")
+package.__path__ = [sys.argv[1]]
+sys.modules["borealis"] = package
+
+from borealis.service import process_host
+
+package.__getattr__ = process_host.get_package_attribute
+process_host.main(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+"""
+"""
+Runs the child with a bare borealis package, so its __init__ (importing
+the widget layer) never runs. Takes the package directory, the module
+and qualified name of the service and the fd signals are written to.
+"""
+
+
+def encode_frame(payload: object) -> bytes:
+    """
+    Encodes a frame
+
+    Args:
+        payload (object): The payload, of types supported by marshal
+
+    Raises:
+        ValueError: If the payload contains unsupported types
+
+    Returns:
+        bytes: The encoded frame
+    """
+    data = marshal.dumps(payload)
+    return FRAME_HEADER.pack(len(data)) + data
+
+
+def read_frame(stream: BinaryIO) -> Optional[object]:
+    """
+    Reads a frame from a blocking stream
+
+    Args:
+        stream (BinaryIO): The stream
+
+    Returns:
+        Optional[object]: The payload, None once the stream is closed
+    """
+    header = stream.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+
+    (length,) = FRAME_HEADER.unpack(header)
+
+    data = stream.read(length)
+    if len(data) < length:
+        return None
+
+    return marshal.loads(data)
+
+
+class ProcessHost:
+    """
+    Runs a process hosted service in a child process, restarting it
+    with a backoff whenever it exits without being asked to.
+    """
+
+    restart_delay: float = 0.5
+    """
+    Seconds before the first restart of a crashed child
+    """
+
+    max_restart_delay: float = 30.0
+    """
+    The restart delay doubles every crash up to this many seconds, and is
+    reset once a child has ran this long.
+    """
+
+    stop_timeout: float = 2.0
+    """
+    Seconds a child has to stop before it is terminated
+    """
+
+    service: BaseService
+    """
+    The service in the UI process
+    """
+
+    _process: Optional[subprocess.Popen]
+    """
+    The running child process
+    """
+
+    _subscriptions: Optional[list[str]]
+    """
+    The subscribed signals waiting to be written to the child, None once written
+    """
+
+    _closing: bool
+    """
+    Whether the child's stdin is to be closed, stopping it
+    """
+
+    _writer_wake: threading.Event
+    """
+    Wakes up the thread writing the child's stdin
+    """
+
+    _lock: threading.Lock
+    """
+    Guards the child and what's waiting to be written to it, since
+    subscriptions change on the main thread
+    """
+
+    def __init__(self, service: BaseService):
+        """
+        Creates a new host for a service, see run
+
+        Args:
+            service (BaseService): The service in the UI process
+        """
+        self.service = service
+        self._process = None
+        self._subscriptions = None
+        self._closing = False
+        self._writer_wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def run(self):
+        """
+        Runs the service's child process (on a worker of the runtime)
+        until the service is stopped.
+        """
+        service_class = self.service.__class__
+
+        if service_class.__module__ == "__main__":
+            logger.error(
+                f"Service {service_class.__name__} can't be process hosted since it "
+                "isn't defined in an importable module, running it in-process instead"
+            )
+            self.service.start_service()
+            return
+
+        delay = self.restart_delay
+
+        self.service.add_subscription_listener(self._queue_subscriptions)
+
+        try:
+            while not self.service.is_stopping():
+                started = time.monotonic()
+                returncode = self._run_child(service_class)
+
+                if self.service.is_stopping():
+                    break
+
+                # Children which ran for a while crashed afresh
+                if time.monotonic() - started >= self.max_restart_delay:
+                    delay = self.restart_delay
+
+                logger.warning(
+                    f"Process of service {service_class.__name__} exited with "
+                    f"{returncode}, restarting in {delay}s"
+                )
+
+                if self.service.wait_for_stop(delay):
+                    break
+
+                delay = min(delay * 2, self.max_restart_delay)
+        finally:
+            self.service.remove_subscription_listener(self._queue_subscriptions)
+
+    def stop(self):
+        """
+        Asks the child to stop by closing its stdin (on the writer thread),
+        terminating it if it hasn't stopped after stop_timeout.
+        """
+        with self._lock:
+            process = self._process
+
+            if process is None:
+                return
+
+            self._closing = True
+
+        self._writer_wake.set()
+
+        def terminate():
+            if process.poll() is None:
+                logger.warning("Terminating service process which didn't stop")
+                process.terminate()
+
+        timer = threading.Timer(self.stop_timeout, terminate)
+        timer.daemon = True
+        timer.start()
+
+    def _run_child(self, service_class: type) -> int:
+        """
+        Runs a child process of the service until it exits
+
+        Returns:
+            int: The exit code of the child
+        """
+        read_fd, write_fd = os.pipe()
+
+        try:
+            process = subprocess.Popen(
+                [
+                    sys.executable,
+                    "-c",
+                    CHILD_BOOTSTRAP,
+                    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                    service_class.__module__,
+                    service_class.__qualname__,
+                    str(write_fd),
+                ],
+                stdin=subprocess.PIPE,
+                pass_fds=(write_fd,),
+                env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            )
+        finally:
+            os.close(write_fd)
+
+        with self._lock:
+            self._process = process
+            self._closing = False
+
+        writer = threading.Thread(
+            target=self._write_stdin, args=(process,), daemon=True
+        )
+        writer.start()
+
+        self._queue_subscriptions()
+
+        # Stopped before the process was known to stop
+        if self.service.is_stopping():
+            self.stop()
+
+        with os.fdopen(read_fd, "rb") as signals:
+            while True:
+                frame = read_frame(signals)
+                if frame is None:
+                    break
+
+                name, scope, args = frame
+
+                signal = ServiceSignal(name, *args)
+                signal.scope = scope
+                self.service.emit_signal(signal)
+
+        with self._lock:
+            self._process = None
+            self._subscriptions = None
+            self._closing = True
+
+        self._writer_wake.set()
+        returncode = process.wait()
+        writer.join()
+
+        return returncode
+
+    def _queue_subscriptions(self):
+        """
+        Hands the signals which have subscribers to the writer thread,
+        without waiting on the child's stdin.
+        """
+        with self._lock:
+            if self._process is None:
+                return
+
+            self._subscriptions = sorted(self.service.get_subscribed_signals())
+
+        self._writer_wake.set()
+
+    def _write_stdin(self, process: subprocess.Popen):
+        """
+        Writes the latest subscriptions to the child's stdin until it's
+        closing, then closes it. Ran on a thread of its own so neither the
+        main thread nor the worker reading signals block on the pipe.
+        """
+        while True:
+            self._writer_wake.wait()
+
+            with self._lock:
+                self._writer_wake.clear()
+                subscriptions, self._subscriptions = self._subscriptions, None
+                closing = self._closing
+
+            if subscriptions is not None:
+                try:
+                    process.stdin.write(encode_frame(subscriptions))
+                    process.stdin.flush()
+                except OSError:
+                    # The child exited, it's restarted by run
+                    break
+
+            if closing:
+                break
+
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+
+
+class _HostedService:
+    """
+    Replaces the emitting methods of a service in the child process,
+    writing its signals to the UI process instead.
+    """
+
+    service: BaseService
+    """
+    The service in the child process
+    """
+
+    subscribed: frozenset[str]
+    """
+    The signals which have subscribers in the UI process
+    """
+
+    _signals: BinaryIO
+    """
+    The pipe signals are written to
+    """
+
+    main_loop: Optional[GLib.MainLoop]
+    """
+    The main loop the service runs on, if it's a MainLoopService
+    """
+
+    _lock: threading.Lock
+    """
+    Guards the pipe, services may emit from several threads
+    """
+
+    def __init__(self, service: BaseService, signals: BinaryIO):
+        self.service = service
+        self.subscribed = frozenset()
+        self.main_loop = (
+            GLib.MainLoop() if isinstance(service, MainLoopService) else None
+        )
+        self._signals = signals
+        self._lock = threading.Lock()
+
+        service.emit_signal = self.emit_signal
+        service.emit_signals = self.emit_signals
+        service.run_in_order = self.run_in_order
+        service.is_subscribed = self.is_subscribed
+        service.get_subscribed_signals = self.get_subscribed_signals
+
+    def emit_signal(self, signal: ServiceSignal):
+        self.emit_signals([signal])
+
+    def emit_signals(self, signals: list[ServiceSignal]):
+        frames = []
+
+        for signal in signals:
+            try:
+                frames.append(
+                    encode_frame((signal.signal, signal.scope, tuple(signal.args)))
+                )
+            except ValueError as e:
+                logger.warning(
+                    f"Dropping signal {signal.signal} of unsupported type: {e}"
+                )
+
+        with self._lock:
+            self._signals.write(b"".join(frames))
+            self._signals.flush()
+
+    def run_in_order(self, callback: Callable, *args):
+        callback(*args)
+
+    def is_subscribed(self, signal: str) -> bool:
+        return signal in self.subscribed
+
+    def get_subscribed_signals(self) -> set[str]:
+        return set(self.subscribed)
+
+    def run(self):
+        """
+        Runs the service until it's stopped, on the main loop for MainLoopService
+        """
+        self.service.start_service()
+
+        if self.main_loop is not None:
+            self.main_loop.run()
+
+    def read_subscriptions(self, stream: BinaryIO):
+        """
+        Reads the subscribed signals from the UI process until it closes
+        the stream, which stops the service.
+        """
+        while True:
+            frame = read_frame(stream)
+            if frame is None:
+                break
+
+            self.subscribed = frozenset(frame)
+            self._run_on_service(self.service._notify_subscription_listeners)
+
+        self._run_on_service(self._stop)
+
+    def _stop(self):
+        """
+        Stops the service, along with its main loop
+        """
+        self.service.stop_service()
+
+        if self.main_loop is not None:
+            self.main_loop.quit()
+
+    def _run_on_service(self, callback: Callable):
+        """
+        Runs a callback where the service expects it, on its main loop
+        for MainLoopService and straight away otherwise
+        """
+        if self.main_loop is None:
+            callback()
+            return
+
+        def run_callback():
+            callback()
+            return GLib.SOURCE_REMOVE
+
+        GLib.idle_add(run_callback)
+
+
+def get_package_attribute(name: str) -> any:
+    """
+    Resolves borealis.NAME in the child from HEADLESS_PACKAGES, so service
+    modules importing e.g from borealis import PollingService still work.
+
+    Args:
+        name (str): The name imported from borealis
+
+    Raises:
+        AttributeError: If none of the packages have it, e.g widgets
+
+    Returns:
+        any: The attribute
+    """
+    for package in HEADLESS_PACKAGES:
+        module = importlib.import_module(package)
+
+        if hasattr(module, name):
+            return getattr(module, name)
+
+    raise AttributeError(f"borealis.{name} isn't available to process hosted services")
+
+
+def main(module: str, qualname: str, signal_fd: int):
+    logging.basicConfig(level=logging.INFO)
+
+    service_class = importlib.import_module(module)
+    for name in qualname.split("."):
+        service_class = getattr(service_class, name)
+
+    service: BaseService = service_class()
+
+    with os.fdopen(signal_fd, "wb") as signals:
+        hosted = _HostedService(service, signals)
+
+        threading.Thread(
+            target=hosted.read_subscriptions, args=(sys.stdin.buffer,), daemon=True
+        ).start()
+
+        try:
+            hosted.run()
+        except BrokenPipeError:
+            # The UI process went away
+            pass
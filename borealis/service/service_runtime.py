@@ -0,0 +1,235 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from borealis.service.base_service import BaseService
+    from borealis.service.process_host import ProcessHost
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRuntime:
+    """
+    Runs services on a bounded pool of worker threads shared between them,
+    starting and stopping them on demand. Services which aren't threaded
+    are started on the main thread instead.
+
+    Services must be started and stopped from the main thread.
+
+    A service occupies a worker for as long as its start_service runs, so
+    services past max_workers wait for a running service to stop.
+    """
+
+    max_workers: int
+    """
+    The maximum amount of services running at once
+    """
+
+    _executor: ThreadPoolExecutor
+    """
+    The shared workers services run on
+    """
+
+    _futures: dict["BaseService", Future]
+    """
+    The running (or queued) threaded services
+    """
+
+    _main_loop_services: set["BaseService"]
+    """
+    The running services which aren't threaded, these run on the main loop
+    """
+
+    _hosts: dict["BaseService", "ProcessHost"]
+    """
+    The hosts of running process hosted services
+    """
+
+    _restart: set["BaseService"]
+    """
+    Services started again while they were stopping,
+    which are restarted once they have stopped
+    """
+
+    _lock: threading.RLock
+    """
+    Guards the running services, services finish on their worker
+    """
+
+    _shutdown: bool
+    """
+    Whether the runtime was shutdown
+    """
+
+    def __init__(self, max_workers: int = 8):
+        """
+        Creates a new runtime, workers are only created once services start
+
+        Args:
+            max_workers (int, optional): The maximum amount of services running at once. Defaults to 8.
+        """
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="borealis-service"
+        )
+        self._futures = {}
+        self._main_loop_services = set()
+        self._hosts = {}
+        self._restart = set()
+        self._lock = threading.RLock()
+        self._shutdown = False
+
+    def is_running(self, service: "BaseService") -> bool:
+        """
+        Returns whether a service is running (or waiting for a worker)
+
+        Args:
+            service (BaseService): The service
+        """
+        return service in self._futures or service in self._main_loop_services
+
+    def start(self, service: "BaseService"):
+        """
+        Starts a service on a worker, unless it is already running.
+        A service which is still stopping is started again once it stops.
+
+        Args:
+            service (BaseService): The service to start
+        """
+        with self._lock:
+            if self._shutdown or service in self._main_loop_services:
+                return
+
+            if not service.threaded:
+                self._start_main_loop(service)
+            elif service not in self._futures:
+                self._submit(service)
+            elif service.is_stopping():
+                self._restart.add(service)
+
+    def stop(self, service: "BaseService"):
+        """
+        Asks a running service to stop, see BaseService.stop_service
+
+        Args:
+            service (BaseService): The service to stop
+        """
+        with self._lock:
+            self._restart.discard(service)
+
+            if service in self._main_loop_services:
+                # These stop straight away
+                self._main_loop_services.discard(service)
+
+            elif service not in self._futures or service.is_stopping():
+                return
+
+        logger.debug(f"Stopping service {service.__class__.__name__}")
+        service.stop_service()
+
+        host = self._hosts.get(service)
+        if host is not None:
+            host.stop()
+
+    def shutdown(self, timeout: float = 5.0):
+        """
+        Stops every service and waits for the workers to finish them,
+        no services may be started afterwards. Services which don't stop
+        within the timeout are logged, their workers are left running.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the services to stop. Defaults to 5.0.
+        """
+        with self._lock:
+            self._shutdown = True
+            self._restart.clear()
+            services = list(self._futures) + list(self._main_loop_services)
+
+            futures = dict(self._futures)
+
+        # Services still waiting for a worker never start
+        for future in futures.values():
+            future.cancel()
+
+        for service in services:
+            self.stop(service)
+
+        _, not_done = wait(futures.values(), timeout)
+
+        for service, future in futures.items():
+            if future in not_done:
+                logger.warning(
+                    f"Service {service.__class__.__name__} did not stop within {timeout}s"
+                )
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, service: "BaseService"):
+        """
+        Submits a service to the workers, the lock must be held
+        """
+        logger.debug(f"Starting service {service.__class__.__name__}")
+
+        service.prepare_service()
+
+        future = self._executor.submit(self._run, service)
+        self._futures[service] = future
+        future.add_done_callback(lambda _: self._finished(service))
+
+    def _start_main_loop(self, service: "BaseService"):
+        """
+        Starts a service which isn't threaded, the lock must be held
+        """
+        logger.debug(f"Starting service {service.__class__.__name__} on the main loop")
+
+        service.prepare_service()
+        self._main_loop_services.add(service)
+
+        try:
+            service.start_service()
+        except Exception:
+            logger.exception(f"Service {service.__class__.__name__} failed")
+            self._main_loop_services.discard(service)
+
+    def _run(self, service: "BaseService"):
+        """
+        Runs a service on a worker until it returns
+        """
+        try:
+            if service.process_hosted:
+                self._run_hosted(service)
+            else:
+                service.start_service()
+        except Exception:
+            logger.exception(f"Service {service.__class__.__name__} failed")
+
+    def _run_hosted(self, service: "BaseService"):
+        """
+        Runs a process hosted service in a child process until it's stopped
+        """
+        # Imported here since process_host imports the service package
+        from borealis.service.process_host import ProcessHost
+
+        host = self._hosts[service] = ProcessHost(service)
+
+        # Stopped before the host existed
+        if service.is_stopping():
+            return
+
+        try:
+            host.run()
+        finally:
+            self._hosts.pop(service, None)
+
+    def _finished(self, service: "BaseService"):
+        """
+        Called once a service has returned (or was cancelled)
+        """
+        with self._lock:
+            self._futures.pop(service, None)
+
+            if service in self._restart and not self._shutdown:
+                self._restart.discard(service)
+                self._submit(service)
@@ -14,6 +14,36 @@ class ServiceSignal:
     Positional arguments to be emitted by this signal to callbacks
     """
 
+    scope: str | None = None
+    """
+    The scope of this signal (e.g the monitor it happened on), only widgets
+    attached within this scope or without a scope recieve it.
+    None broadcasts the signal to every attached widget.
+    """
+
     def __init__(self, signal: str, *args):
         self.args = args
         self.signal = signal
+
+    def get_coalesce_key(self, index: int | None) -> tuple:
+        """
+        Returns what identifies this signal when coalescing it with
+        other signals of the same name, see Coalesce.
+
+        Args:
+            index (int | None): The index of the argument to key by, None to only key by scope
+
+        Returns:
+            tuple: The scope of this signal and the argument it's keyed by
+        """
+        if index is None:
+            return (self.scope,)
+
+        return (self.scope, self.args[index])
+
+    def get_coalesce_args(self) -> tuple:
+        """
+        Returns what two signals of the same name and key must both
+        have to be duplicates of each other, see CoalescePolicy.DEDUPE.
+        """
+        return tuple(self.args)
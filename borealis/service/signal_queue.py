@@ -0,0 +1,511 @@
+import logging
+import os
+import threading
+from collections import deque
+from collections.abc import Callable
+from enum import Enum
+from gi.repository import GLib
+from borealis.service.service_signal import ServiceSignal
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(Enum):
+    """
+    What a SignalQueue does with a signal emitted while it is full
+    """
+
+    BLOCK = "block"
+    """
+    The emitting thread waits until the main loop has drained the queue.
+    Emitting from the main thread never blocks, the queue grows instead.
+    """
+
+    DROP_OLDEST = "drop-oldest"
+    """
+    The oldest queued signal is dropped to make room for the new one
+    """
+
+    DROP_NEWEST = "drop-newest"
+    """
+    The new signal is dropped
+    """
+
+
+class CoalescePolicy(Enum):
+    """
+    How pending signals of the same kind collapse in a SignalQueue
+    before they reach the main thread
+    """
+
+    LATEST = "latest"
+    """
+    A pending signal with the same key is replaced by the new one,
+    keeping its place in the queue.
+    """
+
+    DEDUPE = "dedupe"
+    """
+    A signal with the same arguments as the last one queued
+    with the same key is dropped.
+    """
+
+    ACCUMULATE = "accumulate"
+    """
+    Pending signals with the same key are collected into a single signal,
+    whose only argument is the list of each signal's arguments.
+    """
+
+
+class Coalesce:
+    """
+    The coalescing of a signal, see BaseService.signal_coalescing
+    """
+
+    policy: CoalescePolicy
+    """
+    How pending signals collapse
+    """
+
+    key: int | None
+    """
+    The index of the argument identifying what the signal is about
+    (e.g a window's address), signals only collapse with signals of the
+    same key. None collapses every signal of the same name.
+    """
+
+    def __init__(self, policy: CoalescePolicy, key: int | None = None):
+        """
+        Creates a new coalescing
+
+        Args:
+            policy (CoalescePolicy): How pending signals collapse
+            key (int | None, optional): The index of the argument to key by. Defaults to None.
+        """
+        self.policy = policy
+        self.key = key
+
+    def get_key(self, signal: ServiceSignal) -> tuple:
+        """
+        Returns the key a signal collapses under, signals are also
+        never collapsed across scopes.
+
+        Args:
+            signal (ServiceSignal): The signal
+
+        Returns:
+            tuple: The key of the signal
+        """
+        return (signal.signal,) + signal.get_coalesce_key(self.key)
+
+
+class _CoalescedSlot:
+    """
+    A place in the queue held by signals collapsing into one
+    """
+
+    signal: ServiceSignal
+    """
+    The latest signal collapsed into this slot
+    """
+
+    key: tuple
+    """
+    The key of the collapsed signals
+    """
+
+    accumulated: list[tuple] | None
+    """
+    The arguments of every signal collapsed into this slot,
+    None unless accumulating.
+    """
+
+    def __init__(self, signal: ServiceSignal, key: tuple, accumulate: bool):
+        self.signal = signal
+        self.key = key
+        self.accumulated = [tuple(signal.args)] if accumulate else None
+
+    def add(self, signal: ServiceSignal):
+        """
+        Collapses another signal into this slot
+        """
+        self.signal = signal
+
+        if self.accumulated is not None:
+            self.accumulated.append(tuple(signal.args))
+
+    def resolve(self) -> ServiceSignal:
+        """
+        Returns the signal emitted in place of the collapsed signals
+        """
+        if self.accumulated is None:
+            return self.signal
+
+        signal = ServiceSignal(self.signal.signal, self.accumulated)
+        signal.scope = self.signal.scope
+        return signal
+
+
+class SignalQueue:
+    """
+    A bounded queue of signals emitted from any thread, drained on the
+    main loop by a single source watching an eventfd.
+
+    The eventfd and source are created when the first signal is queued,
+    and released again when the queue is closed. A closed queue stays
+    closed (discarding what is queued) until it's reopened.
+
+    The eventfd is only written when the queue stops being empty, so a
+    storm of signals costs a single wakeup, and every wakeup runs all of
+    the signals queued so far as one batch.
+    """
+
+    capacity: int
+    """
+    The amount of signals that may be queued before the overflow policy applies
+    """
+
+    policy: OverflowPolicy
+    """
+    What to do with signals emitted while the queue is full
+    """
+
+    priority: int
+    """
+    The priority of the main loop source draining this queue
+    """
+
+    dropped: int
+    """
+    The amount of signals dropped due to the queue being full
+    """
+
+    _callback: Callable[[list[ServiceSignal | Callable]], None]
+    """
+    Ran on the main loop with each batch of queued items
+    """
+
+    _get_coalesce: Callable[[str], Coalesce | None]
+    """
+    Returns the coalescing of a signal by its name
+    """
+
+    _coalescing: dict[str, Coalesce | None]
+    """
+    Cache of the coalescing of each signal queued so far
+    """
+
+    _pending: dict[tuple, _CoalescedSlot]
+    """
+    The slots in the queue signals may still collapse into, by their key
+    """
+
+    _last_args: dict[tuple, tuple]
+    """
+    The arguments of the last signal queued under each key of DEDUPE signals
+    """
+
+    _queue: deque[ServiceSignal | _CoalescedSlot | Callable]
+    """
+    The queued signals, along with callbacks queued in order with them
+    """
+
+    _signal_count: int
+    """
+    The amount of signals in the queue (callbacks are not counted)
+    """
+
+    _condition: threading.Condition
+    """
+    Guards the queue, notified whenever the queue is drained
+    """
+
+    _armed: bool
+    """
+    Whether the eventfd was written since the queue was last drained
+    """
+
+    _eventfd: int
+    """
+    The eventfd waking up the main loop, -1 while the queue is closed
+    """
+
+    _source_id: int | None
+    """
+    The id of the main loop source watching the eventfd,
+    None until something is queued and while the queue is closed
+    """
+
+    _closed: bool
+    """
+    Whether the queue was closed, items queued while closed are
+    discarded until it's reopened
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[list[ServiceSignal | Callable]], None],
+        get_coalesce: Callable[[str], Coalesce | None] = lambda signal: None,
+        capacity: int = 4096,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        priority: int = GLib.PRIORITY_DEFAULT,
+    ):
+        """
+        Creates a new queue, which is closed until something is queued
+
+        Args:
+            callback (Callable[[list[ServiceSignal | Callable]], None]): Ran on the main loop with each batch
+            get_coalesce (Callable[[str], Coalesce | None], optional): Returns the coalescing of a signal. Defaults to none for every signal.
+            capacity (int, optional): The amount of signals that may be queued. Defaults to 4096.
+            policy (OverflowPolicy, optional): What to do when the queue is full. Defaults to OverflowPolicy.DROP_OLDEST.
+            priority (int, optional): The priority of the draining source. Defaults to GLib.PRIORITY_DEFAULT.
+        """
+        self.capacity = capacity
+        self.policy = policy
+        self.priority = priority
+        self.dropped = 0
+
+        self._callback = callback
+        self._get_coalesce = get_coalesce
+        self._coalescing = {}
+        self._pending = {}
+        self._last_args = {}
+        self._queue = deque()
+        self._signal_count = 0
+        self._condition = threading.Condition()
+        self._armed = False
+
+        self._eventfd = -1
+        self._source_id = None
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        """
+        The amount of signals currently queued
+        """
+        return self._signal_count
+
+    def put(self, signal: ServiceSignal):
+        """
+        Queues a signal, applying the overflow policy if the queue is full.
+
+        Args:
+            signal (ServiceSignal): The signal to queue
+        """
+        with self._condition:
+            self._put(signal)
+
+    def put_many(self, signals: list[ServiceSignal]):
+        """
+        Queues several signals in order, taking the lock once.
+
+        Args:
+            signals (list[ServiceSignal]): The signals to queue
+        """
+        with self._condition:
+            for signal in signals:
+                self._put(signal)
+
+    def put_callback(self, callback: Callable):
+        """
+        Queues a callback to run on the main loop in order with the signals
+        around it, callbacks are never dropped and don't count to the capacity.
+
+        Args:
+            callback (Callable): Called without arguments
+        """
+        with self._condition:
+            if self._closed:
+                return
+
+            if self._source_id is None:
+                self._open()
+
+            self._queue.append(callback)
+            self._wake()
+
+    def _put(self, signal: ServiceSignal):
+        """
+        Queues a signal, the lock must be held
+        """
+        if self._closed:
+            return
+
+        if self._source_id is None:
+            self._open()
+
+        try:
+            coalesce = self._coalescing[signal.signal]
+        except KeyError:
+            coalesce = self._coalescing[signal.signal] = self._get_coalesce(
+                signal.signal
+            )
+
+        key = None
+        if coalesce is not None:
+            try:
+                key = coalesce.get_key(signal)
+            except (ValueError, IndexError):
+                # Malformed signals are left for the main thread to report
+                coalesce = None
+
+        if coalesce is not None:
+            if coalesce.policy is CoalescePolicy.DEDUPE:
+                args = signal.get_coalesce_args()
+
+                if self._last_args.get(key) == args:
+                    return
+
+                self._last_args[key] = args
+
+            else:
+                slot = self._pending.get(key)
+
+                if slot is not None:
+                    slot.add(signal)
+                    return
+
+        if self._signal_count >= self.capacity:
+            if self.policy is OverflowPolicy.DROP_NEWEST:
+                self.dropped += 1
+                return
+
+            if self.policy is OverflowPolicy.DROP_OLDEST:
+                self._drop_oldest()
+
+            elif threading.current_thread() is not threading.main_thread():
+                # Wait for the main loop to drain, emitting from the
+                # main loop itself can't wait on it.
+                while self._signal_count >= self.capacity and not self._closed:
+                    self._condition.wait()
+
+            # Closed while waiting
+            if self._closed:
+                return
+
+        if coalesce is not None and coalesce.policy is not CoalescePolicy.DEDUPE:
+            signal = self._pending[key] = _CoalescedSlot(
+                signal, key, coalesce.policy is CoalescePolicy.ACCUMULATE
+            )
+
+        self._queue.append(signal)
+        self._signal_count += 1
+        self._wake()
+
+    def _drop_oldest(self):
+        """
+        Drops the oldest queued signal, skipping over callbacks
+        """
+        for index, queued in enumerate(self._queue):
+            if callable(queued):
+                continue
+
+            del self._queue[index]
+            self._signal_count -= 1
+            self.dropped += 1
+
+            if isinstance(queued, _CoalescedSlot):
+                self._pending.pop(queued.key, None)
+            else:
+                self._forget_last_args(queued)
+
+            return
+
+    def _forget_last_args(self, signal: ServiceSignal):
+        """
+        Forgets the arguments of a dropped DEDUPE signal, so the next
+        signal with the same arguments isn't dropped as its duplicate.
+        The lock must be held.
+        """
+        coalesce = self._coalescing.get(signal.signal)
+        if coalesce is None or coalesce.policy is not CoalescePolicy.DEDUPE:
+            return
+
+        try:
+            key = coalesce.get_key(signal)
+            args = signal.get_coalesce_args()
+        except (ValueError, IndexError):
+            return
+
+        # A later signal under the same key may have been queued since
+        if self._last_args.get(key) == args:
+            del self._last_args[key]
+
+    def _open(self):
+        """
+        Creates the eventfd and attaches its source to the default main
+        context, the lock must be held
+        """
+        self._eventfd = os.eventfd(0, os.EFD_CLOEXEC | os.EFD_NONBLOCK)
+        self._source_id = GLib.unix_fd_add_full(
+            self.priority, self._eventfd, GLib.IOCondition.IN, self._dispatch
+        )
+
+    def _wake(self):
+        """
+        Wakes up the main loop if it isn't already, the lock must be held
+        """
+        if not self._armed:
+            self._armed = True
+            os.eventfd_write(self._eventfd, 1)
+
+    def _dispatch(self, fd: int, condition: GLib.IOCondition) -> bool:
+        """
+        Drains the queue on the main loop, running its items as a batch
+        """
+        try:
+            os.eventfd_read(fd)
+        except BlockingIOError:
+            pass
+
+        with self._condition:
+            batch = list(self._queue)
+            self._queue.clear()
+            self._pending.clear()
+            self._signal_count = 0
+            self._armed = False
+            self._condition.notify_all()
+
+        if batch:
+            self._callback(
+                [
+                    item.resolve() if isinstance(item, _CoalescedSlot) else item
+                    for item in batch
+                ]
+            )
+
+        return GLib.SOURCE_CONTINUE
+
+    def close(self):
+        """
+        Removes the queue's source and closes its eventfd, signals still
+        queued are discarded. Anything queued afterwards is discarded too,
+        until the queue is reopened.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+            if self._source_id is None:
+                return
+
+            GLib.source_remove(self._source_id)
+            os.close(self._eventfd)
+
+            self._source_id = None
+            self._eventfd = -1
+            self._armed = False
+            self._queue.clear()
+            self._pending.clear()
+            self._last_args.clear()
+            self._signal_count = 0
+            self._condition.notify_all()
+
+    def reopen(self):
+        """
+        Reopens a closed queue, its eventfd and source are created again
+        when something is queued.
+        """
+        with self._condition:
+            self._closed = False
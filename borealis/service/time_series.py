@@ -0,0 +1,278 @@
+import bisect
+import threading
+import time
+from array import array
+from typing import Optional
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TimeSeries:
+    """
+    A fixed size ring buffer of timestamped samples of one metric,
+    e.g cpu usage. Once full, each sample replaces the oldest one, so
+    its memory never grows.
+
+    Samples are kept in typed arrays, and queries run over them with
+    numpy when it's installed, otherwise with the builtins (which also
+    iterate the arrays in C). Samples may be recorded from any thread.
+    """
+
+    capacity: int
+    """
+    The amount of samples kept
+    """
+
+    _values: array
+    """
+    The samples, the oldest being at _head once full
+    """
+
+    _times: array
+    """
+    The monotonic time of each sample
+    """
+
+    _head: int
+    """
+    Where the next sample is written
+    """
+
+    _size: int
+    """
+    The amount of samples recorded, up to capacity
+    """
+
+    _lock: threading.Lock
+    """
+    Guards the buffers, samples are usually recorded from a service's thread
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Creates a new empty time series
+
+        Args:
+            capacity (int): The amount of samples kept
+        """
+        self.capacity = capacity
+        self._values = array("d", bytes(8 * capacity))
+        self._times = array("d", bytes(8 * capacity))
+        self._head = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, value: float, timestamp: Optional[float] = None):
+        """
+        Records a sample, replacing the oldest one if full
+
+        Args:
+            value (float): The sample
+            timestamp (Optional[float], optional): When it was sampled, as time.monotonic. Defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        with self._lock:
+            self._values[self._head] = value
+            self._times[self._head] = timestamp
+
+            self._head = (self._head + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def latest(self) -> Optional[float]:
+        """
+        Returns the newest sample, None if there are none
+        """
+        with self._lock:
+            if not self._size:
+                return None
+
+            return self._values[self._head - 1]
+
+    def values(self, window: Optional[float] = None) -> array:
+        """
+        Returns a copy of the samples from oldest to newest
+
+        Args:
+            window (Optional[float], optional): Only the samples of the last this many seconds. Defaults to all of them.
+
+        Returns:
+            array: The samples, a numpy array if numpy is installed
+        """
+        with self._lock:
+            values = self._ordered(self._values)
+
+            if window is not None and self._size:
+                times = self._ordered(self._times)
+                start = bisect.bisect_left(times, times[-1] - window)
+                values = values[start:]
+
+        return numpy.frombuffer(values, dtype=numpy.float64) if numpy else values
+
+    def _ordered(self, buffer: array) -> array:
+        """
+        Copies a buffer from oldest to newest sample
+        """
+        if self._size < self.capacity:
+            return buffer[: self._size]
+
+        return buffer[self._head :] + buffer[: self._head]
+
+    def min(self, window: Optional[float] = None) -> Optional[float]:
+        """
+        Returns the smallest sample, None if there are none
+
+        Args:
+            window (Optional[float], optional): Only of the last this many seconds. Defaults to all of them.
+        """
+        values = self.values(window)
+        return float(min(values)) if len(values) else None
+
+    def max(self, window: Optional[float] = None) -> Optional[float]:
+        """
+        Returns the largest sample, None if there are none
+
+        Args:
+            window (Optional[float], optional): Only of the last this many seconds. Defaults to all of them.
+        """
+        values = self.values(window)
+        return float(max(values)) if len(values) else None
+
+    def mean(self, window: Optional[float] = None) -> Optional[float]:
+        """
+        Returns the mean of the samples, None if there are none
+
+        Args:
+            window (Optional[float], optional): Only of the last this many seconds. Defaults to all of them.
+        """
+        values = self.values(window)
+
+        if not len(values):
+            return None
+
+        return float(values.mean()) if numpy else sum(values) / len(values)
+
+    def downsample(
+        self, points: int, window: Optional[float] = None, reduce: str = "mean"
+    ) -> list[float]:
+        """
+        Reduces the samples to a number of points, e.g one per pixel of a graph
+
+        Args:
+            points (int): The most points to return
+            window (Optional[float], optional): Only of the last this many seconds. Defaults to all of them.
+            reduce (str, optional): How the samples of each point are combined, mean, min or max. Defaults to "mean".
+
+        Returns:
+            list[float]: The points from oldest to newest, the samples themselves if there are fewer
+        """
+        values = self.values(window)
+        size = len(values)
+
+        if size <= points:
+            return [float(value) for value in values]
+
+        # Where each point's samples start
+        edges = [size * point // points for point in range(points + 1)]
+
+        if numpy:
+            starts = numpy.array(edges[:-1])
+
+            if reduce == "mean":
+                return (numpy.add.reduceat(values, starts) / numpy.diff(edges)).tolist()
+
+            return (
+                {"min": numpy.minimum, "max": numpy.maximum}[reduce]
+                .reduceat(values, starts)
+                .tolist()
+            )
+
+        reducer = {
+            "mean": lambda bucket: sum(bucket) / len(bucket),
+            "min": min,
+            "max": max,
+        }[reduce]
+
+        return [reducer(values[start:end]) for start, end in zip(edges, edges[1:])]
+
+
+class TimeSeriesStore:
+    """
+    The time series of a service by the name of their metric, shared
+    by every widget (e.g graphs on each monitor) instead of each keeping
+    their own history.
+    """
+
+    capacity: int
+    """
+    The amount of samples kept per metric
+    """
+
+    _series: dict[str, TimeSeries]
+    """
+    The time series by their metric
+    """
+
+    _lock: threading.Lock
+    """
+    Guards adding time series
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Creates a new empty store
+
+        Args:
+            capacity (int): The amount of samples kept per metric
+        """
+        self.capacity = capacity
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, metric: str) -> bool:
+        return metric in self._series
+
+    def get(self, metric: str) -> TimeSeries:
+        """
+        Returns the time series of a metric, creating it if it's new
+
+        Args:
+            metric (str): The name of the metric
+
+        Returns:
+            TimeSeries: The time series
+        """
+        series = self._series.get(metric)
+
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(metric, TimeSeries(self.capacity))
+
+        return series
+
+    def record(self, samples: dict[str, float], timestamp: Optional[float] = None):
+        """
+        Records a sample of several metrics taken at once
+
+        Args:
+            samples (dict[str, float]): The sample of each metric
+            timestamp (Optional[float], optional): When they were sampled, as time.monotonic. Defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        for metric, value in samples.items():
+            self.get(metric).append(value, timestamp)
+
+    def metrics(self) -> list[str]:
+        """
+        Returns the names of the metrics recorded
+        """
+        return list(self._series)
@@ -0,0 +1,10 @@
+"""
+borealis.store
+
+Contains the store, observable state shared
+between the widgets of a borealis application
+"""
+
+from .store_key import *
+from .derived import *
+from .store import *
@@ -0,0 +1,77 @@
+from collections.abc import Callable
+from borealis.store.store_key import StoreKey
+
+
+class Derived:
+    """
+    A store key computed from other keys, see Store.derive
+    """
+
+    key: StoreKey
+    """
+    The key the computed value is written to
+    """
+
+    inputs: tuple[StoreKey, ...]
+    """
+    The keys the value is computed from, in the order they are passed to compute
+    """
+
+    compute: Callable
+    """
+    Computes the value from the values of the inputs
+    """
+
+    def __init__(self, key: StoreKey, inputs: tuple[StoreKey, ...], compute: Callable):
+        """
+        Creates a new derived key
+
+        Args:
+            key (StoreKey): The key the computed value is written to
+            inputs (tuple[StoreKey, ...]): The keys the value is computed from
+            compute (Callable): Computes the value from the values of the inputs
+        """
+        self.key = key
+        self.inputs = inputs
+        self.compute = compute
+
+
+def sort_derived(derived: dict[str, Derived]) -> list[str]:
+    """
+    Orders derived keys so every key comes after the derived keys it's computed from
+
+    Args:
+        derived (dict[str, Derived]): The derived keys by their name
+
+    Raises:
+        ValueError: If the keys depend on each other in a cycle
+
+    Returns:
+        list[str]: The names of the derived keys in order
+    """
+    order = []
+    # Names being visited (False) or visited (True)
+    visited: dict[str, bool] = {}
+
+    def visit(name: str, path: tuple[str, ...]):
+        state = visited.get(name)
+
+        if state:
+            return
+
+        if state is False:
+            raise ValueError(f"Derived store keys form a cycle: {' -> '.join(path)}")
+
+        visited[name] = False
+
+        for input_key in derived[name].inputs:
+            if input_key.name in derived:
+                visit(input_key.name, path + (input_key.name,))
+
+        visited[name] = True
+        order.append(name)
+
+    for name in derived:
+        visit(name, (name,))
+
+    return order
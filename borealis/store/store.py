@@ -0,0 +1,398 @@
+import logging
+import threading
+from collections.abc import Callable, Mapping
+from itertools import count
+from types import MappingProxyType
+from typing import Optional, TypeVar
+from gi.repository import GLib
+from borealis.store.derived import Derived, sort_derived
+from borealis.store.store_key import StoreKey
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Store:
+    """
+    Observable state shared between widgets, e.g a do not disturb flag
+    or the selected media player, which doesn't need a service.
+
+    Values may be written from any thread. Writes are batched and applied
+    on the main loop, where the subscribers of each key that changed are
+    called once per batch. The state is copied once per batch into a new
+    read-only snapshot, which is handed to every subscriber as is and
+    never changes afterwards.
+
+    Keys may also be derived from other keys (see derive) or fed by the
+    signals of services (see bind_signal). Derived keys are recomputed
+    within the batch their inputs changed in, so subscribers never see
+    a derived value out of date with its inputs.
+    """
+
+    _snapshot: MappingProxyType
+    """
+    The current state by the name of each key
+    """
+
+    _pending: dict[str, object]
+    """
+    Values written since the last batch was applied
+    """
+
+    _keys: dict[str, StoreKey]
+    """
+    The keys known to this store by their name
+    """
+
+    _subscribers: dict[str, dict[int, Callable[[object, Mapping], None]]]
+    """
+    The subscribers of each key by their subscription id
+    """
+
+    _subscription_keys: dict[int, str]
+    """
+    The key of each subscription
+    """
+
+    _ids: count
+    """
+    Gives out subscription ids
+    """
+
+    _derived: dict[str, Derived]
+    """
+    The derived keys by their name
+    """
+
+    _derived_order: list[str]
+    """
+    The names of the derived keys, each after the derived keys it's computed from
+    """
+
+    _dependents: dict[str, list[str]]
+    """
+    The derived keys computed from each key
+    """
+
+    _dirty: set[str]
+    """
+    Derived keys to compute with the next batch, e.g ones just added
+    """
+
+    _signal_bindings: dict[tuple[object, str, str], Callable]
+    """
+    The signal listeners feeding keys, by service, signal and key name
+    """
+
+    _flush_source: Optional[int]
+    """
+    The idle source applying the pending batch, if one is scheduled
+    """
+
+    _lock: threading.Lock
+    """
+    Guards the pending batch
+    """
+
+    def __init__(self):
+        """
+        Creates a new empty store
+        """
+        self._snapshot = MappingProxyType({})
+        self._pending = {}
+        self._keys = {}
+        self._subscribers = {}
+        self._subscription_keys = {}
+        self._ids = count(1)
+        self._derived = {}
+        self._derived_order = []
+        self._dependents = {}
+        self._dirty = set()
+        self._signal_bindings = {}
+        self._flush_source = None
+        self._lock = threading.Lock()
+
+    def _register(self, key: StoreKey):
+        """
+        Registers a key, ensuring its name isn't used by another
+        """
+        known = self._keys.setdefault(key.name, key)
+
+        if known is not key and (
+            known.value_type is not key.value_type or known.default != key.default
+        ):
+            raise ValueError(f"Store key {key.name} is already declared as {known}")
+
+    def get(self, key: StoreKey[T]) -> Optional[T]:
+        """
+        Returns the value of a key as of the last applied batch,
+        this may be called from any thread.
+
+        Args:
+            key (StoreKey[T]): The key
+
+        Returns:
+            Optional[T]: The value, its default if it was never written
+        """
+        return self._snapshot.get(key.name, key.default)
+
+    def snapshot(self) -> Mapping[str, object]:
+        """
+        Returns the state as of the last applied batch, which never changes
+
+        Returns:
+            Mapping[str, object]: The values written so far by the name of their key
+        """
+        return self._snapshot
+
+    def set(self, key: StoreKey[T], value: Optional[T]):
+        """
+        Writes the value of a key, this may be called from any thread.
+        The value is applied (and subscribers called) with the next batch
+        on the main loop.
+
+        Args:
+            key (StoreKey[T]): The key
+            value (Optional[T]): The value
+
+        Raises:
+            TypeError: If the value isn't of the key's type (or None)
+        """
+        self.update({key: value})
+
+    def update(self, values: dict[StoreKey, object]):
+        """
+        Writes the values of several keys, which are applied in the same batch
+
+        Args:
+            values (dict[StoreKey, object]): The value of each key
+
+        Raises:
+            TypeError: If a value isn't of its key's type (or None)
+            ValueError: If a key is derived
+        """
+        for key, value in values.items():
+            if key.name in self._derived:
+                raise ValueError(f"Store key {key.name} is derived, it can't be set")
+
+            if value is not None and not isinstance(value, key.value_type):
+                raise TypeError(
+                    f"Store key {key.name} expects {key.value_type.__name__}, "
+                    f"got {type(value).__name__}"
+                )
+
+        with self._lock:
+            for key, value in values.items():
+                self._register(key)
+                self._pending[key.name] = value
+
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """
+        Applies the pending batch once the main loop is idle, the lock must be held
+        """
+        if self._flush_source is None:
+            self._flush_source = GLib.idle_add(self._flush)
+
+    def derive(
+        self,
+        key: StoreKey[T],
+        inputs: list[StoreKey],
+        compute: Callable[..., Optional[T]],
+    ):
+        """
+        Derives a key from other keys (which may be derived themselves),
+        e.g the icon of the active window from its class.
+
+        The value is computed on the main loop with the values of the
+        inputs whenever any of them change, and kept until they change
+        again. Subscribers of the key are only called when the computed
+        value changed.
+
+        Args:
+            key (StoreKey[T]): The derived key, which can't be set
+            inputs (list[StoreKey]): The keys the value is computed from
+            compute (Callable[..., Optional[T]]): Called with the value of each input, returns the value
+
+        Raises:
+            ValueError: If the key is already derived, or would be derived from itself
+        """
+        if key.name in self._derived:
+            raise ValueError(f"Store key {key.name} is already derived")
+
+        derived = {**self._derived, key.name: Derived(key, tuple(inputs), compute)}
+        order = sort_derived(derived)
+
+        with self._lock:
+            self._register(key)
+            for input_key in inputs:
+                self._register(input_key)
+
+            self._derived = derived
+            self._derived_order = order
+
+            # A value set before the key was derived is replaced by its computed one
+            self._pending.pop(key.name, None)
+
+            for input_key in inputs:
+                self._dependents.setdefault(input_key.name, []).append(key.name)
+
+            self._dirty.add(key.name)
+            self._schedule_flush()
+
+    def bind_signal(
+        self,
+        service,
+        signal: str,
+        key: StoreKey[T],
+        transform: Optional[Callable[..., Optional[T]]] = None,
+    ):
+        """
+        Feeds a key from a signal of a service, which starts the service
+        if it's lazy like attaching a widget would.
+
+        Args:
+            service (BaseService): The service
+            signal (str): The name of the signal
+            key (StoreKey[T]): The key
+            transform (Optional[Callable[..., Optional[T]]], optional): Called with the signal's arguments, returns the value. Defaults to the first argument.
+        """
+        if transform is None:
+            transform = lambda value, *_: value
+
+        def listener(*args):
+            self.set(key, transform(*args))
+
+        self.unbind_signal(service, signal, key)
+        self._signal_bindings[(service, signal, key.name)] = listener
+        service.add_signal_listener(signal, listener)
+
+    def unbind_signal(self, service, signal: str, key: StoreKey):
+        """
+        Stops feeding a key from a signal, see bind_signal
+
+        Args:
+            service (BaseService): The service
+            signal (str): The name of the signal
+            key (StoreKey): The key
+        """
+        listener = self._signal_bindings.pop((service, signal, key.name), None)
+
+        if listener is not None:
+            service.remove_signal_listener(signal, listener)
+
+    def subscribe(
+        self, key: StoreKey[T], callback: Callable[[Optional[T], Mapping], None]
+    ) -> int:
+        """
+        Subscribes to the changes of a key, the callback is called on
+        the main loop with the new value and the snapshot it's part of.
+
+        Args:
+            key (StoreKey[T]): The key
+            callback (Callable[[Optional[T], Mapping], None]): Called with the value and snapshot
+
+        Returns:
+            int: The id of the subscription, see unsubscribe
+        """
+        with self._lock:
+            self._register(key)
+
+        subscription = next(self._ids)
+
+        self._subscribers.setdefault(key.name, {})[subscription] = callback
+        self._subscription_keys[subscription] = key.name
+
+        return subscription
+
+    def unsubscribe(self, subscription: int):
+        """
+        Removes a subscription
+
+        Args:
+            subscription (int): The id of the subscription
+        """
+        name = self._subscription_keys.pop(subscription, None)
+
+        if name is not None:
+            self._subscribers[name].pop(subscription, None)
+
+    def _flush(self) -> bool:
+        """
+        Applies the pending batch, recomputing the derived keys whose inputs
+        changed, then calls the subscribers of each key which changed.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            dirty, self._dirty = self._dirty, set()
+            self._flush_source = None
+
+        values = {**self._snapshot, **pending}
+
+        # Ordered and unique, each subscriber is called once per batch
+        changed = {
+            name: None
+            for name, value in pending.items()
+            if self._snapshot.get(name, self._keys[name].default) != value
+        }
+
+        for name in changed:
+            dirty.update(self._dependents.get(name, ()))
+
+        # Every input is computed before what's derived from it, so each
+        # derived key is computed at most once per batch
+        if dirty:
+            for name in self._derived_order:
+                if name in dirty and self._compute(name, values):
+                    changed[name] = None
+                    dirty.update(self._dependents.get(name, ()))
+
+        if not changed:
+            return GLib.SOURCE_REMOVE
+
+        self._snapshot = snapshot = MappingProxyType(values)
+
+        for name in changed:
+            for callback in list(self._subscribers.get(name, {}).values()):
+                try:
+                    callback(snapshot[name], snapshot)
+                except Exception:
+                    logger.exception(f"Error in subscriber of store key {name}")
+
+        return GLib.SOURCE_REMOVE
+
+    def _compute(self, name: str, values: dict[str, object]) -> bool:
+        """
+        Computes a derived key into the values of a batch
+
+        Returns:
+            bool: Whether its value changed
+        """
+        derived = self._derived[name]
+        key = derived.key
+
+        try:
+            value = derived.compute(
+                *(
+                    values.get(input_key.name, input_key.default)
+                    for input_key in derived.inputs
+                )
+            )
+        except Exception:
+            logger.exception(f"Error computing derived store key {name}")
+            return False
+
+        if value is not None and not isinstance(value, key.value_type):
+            logger.error(
+                f"Derived store key {name} expects {key.value_type.__name__}, "
+                f"got {type(value).__name__}"
+            )
+            return False
+
+        if name in values and values[name] == value:
+            return False
+
+        values[name] = value
+        return True
@@ -0,0 +1,43 @@
+from typing import Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class StoreKey(Generic[T]):
+    """
+    A typed variable of a store, declared once and shared by
+    everything reading or writing it.
+
+    e.g DO_NOT_DISTURB = StoreKey("do-not-disturb", bool, False)
+    """
+
+    name: str
+    """
+    The name of the variable, unique within a store
+    """
+
+    value_type: type[T]
+    """
+    The type of the value, writes of other types are rejected
+    """
+
+    default: Optional[T]
+    """
+    The value until it's first written
+    """
+
+    def __init__(self, name: str, value_type: type[T], default: Optional[T] = None):
+        """
+        Declares a new store variable
+
+        Args:
+            name (str): The name of the variable, unique within a store
+            value_type (type[T]): The type of the value
+            default (Optional[T], optional): The value until it's first written. Defaults to None.
+        """
+        self.name = name
+        self.value_type = value_type
+        self.default = default
+
+    def __repr__(self) -> str:
+        return f"StoreKey({self.name!r}, {self.value_type.__name__})"
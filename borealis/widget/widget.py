@@ -43,12 +43,31 @@ class Widget(Gtk.Widget, CopyWidget):
     should be setup for this widget
     """
 
+    poll_period: Optional[int] = None
+    """
+    Milliseconds between samples of the polling services this widget is
+    attached to, the fastest attached widget sets the period of a service.
+    None uses the service's own poll_period.
+    """
+
     _attached_services: set
     """
     A list of services this widget is attached to.
     Used for keeping track for unmapping this widget from them later.
     """
 
+    _service_handlers: list[int]
+    """
+    The handler ids of the service callbacks connected to this widget,
+    disconnected when unmapping since they are connected again on map.
+    """
+
+    _store_subscriptions: list[tuple[any, int]]
+    """
+    The stores this widget is bound to along with the ids of its
+    subscriptions, dropped when unmapping.
+    """
+
     def __init__(self, css_classes: Optional[Sequence[str]] = None, **kwargs):
         """
         Create's a new Borealis Widget.
@@ -61,6 +80,8 @@ class Widget(Gtk.Widget, CopyWidget):
         Gtk.Widget.__init__(self)
         self._intervals = []
         self._attached_services = set()
+        self._service_handlers = []
+        self._store_subscriptions = []
 
         # Set instance fields based on __init__ args.
         if css_classes is not None:
@@ -277,7 +298,7 @@ class Widget(Gtk.Widget, CopyWidget):
 
         return wrapper
 
-    def _register_self_signal_handler(self, signal: str, callback: Callable):
+    def _register_self_signal_handler(self, signal: str, callback: Callable) -> int:
         """
         Registers a signal handler which recieves
         self as first argument
@@ -285,14 +306,19 @@ class Widget(Gtk.Widget, CopyWidget):
         Args:
             signal (str): The signal type
             callback (Callable): The callback for the signal
+
+        Returns:
+            int: The id of the handler
         """
 
-        self.connect(signal, self._self_decorator(callback))
+        handler_id = self.connect(signal, self._self_decorator(callback))
 
         logging.debug(
             f"Registered callback for signal of type {signal} in class {self.__class__.__name__} with name {callback.__name__}"
         )
 
+        return handler_id
+
     def _register_interval_handler(self, interval: int, callback: Callable):
         """
         Registers an interval handler which recieves
@@ -331,6 +357,57 @@ class Widget(Gtk.Widget, CopyWidget):
         except AttributeError:
             return
 
+    def b_get_monitor(self) -> Optional[str]:
+        """
+        Get's the connector name of the monitor the window
+        containing this widget is shown on, if it was set.
+        """
+
+        return getattr(self.get_root(), "monitor", None)
+
+    def b_bind_store(self, key, callback: Callable, store: Optional[any] = None):
+        """
+        Binds a handler to a store key, which receives this widget, the
+        value and the store's snapshot now and whenever the value changes.
+        The binding is dropped on unmap, so bind from a map handler to
+        keep it across remaps.
+
+        Args:
+            key (StoreKey): The key
+            callback (Callable): The handler
+            store (Optional[Store], optional): The store, defaults to the store of the borealis instance.
+        """
+
+        if store is None:
+            borealis = self.b_get_borealis()
+
+            if borealis is None:
+                logger.error(
+                    f"Can't bind {self.__class__.__name__} to store key {key.name} "
+                    "before it is in a borealis window, pass a store instead"
+                )
+                return
+
+            store = borealis.store
+
+        self._store_subscriptions.append(
+            (store, store.subscribe(key, self._self_decorator(callback)))
+        )
+
+        # Catch up with the current value straight away
+        callback(self, store.get(key), store.snapshot())
+
+    def _destroy_stores(self):
+        """
+        This will drop all of the store bindings
+        of this widget
+        """
+
+        for store, subscription in self._store_subscriptions:
+            store.unsubscribe(subscription)
+
+        self._store_subscriptions.clear()
+
     def _destroy_intervals(self):
         """
         This will destroy all of the intervals
@@ -348,6 +425,13 @@ class Widget(Gtk.Widget, CopyWidget):
         for service in self._attached_services:
             service.detach_widget(self)
 
+        self._attached_services.clear()
+
+        for handler_id in self._service_handlers:
+            self.disconnect(handler_id)
+
+        self._service_handlers.clear()
+
     def _unmap(self, *args, **kwargs):
         """
         This function will remove all this
@@ -357,6 +441,7 @@ class Widget(Gtk.Widget, CopyWidget):
         logging.debug(f"Automatically unmapping for widget {self.__class__.__name__}")
 
         self._destroy_services()
+        self._destroy_stores()
         self._destroy_intervals()
 
     def _map_services_setup(
@@ -463,34 +548,28 @@ class Widget(Gtk.Widget, CopyWidget):
                 for signal in value.__metadata__:
                     self._register_service_callback(service, signal, callback)
 
-    def _register_service_callback(self, service, signal: str, callback: Callable):
+    def _register_service_signal(
+        self, service, signal: str, signal_args: tuple, callback: Callable
+    ):
         """
-        Registers a handler from this widget under a certain signal
-        to a service
+        Connects a handler to the GObject signal a service emits
+        on this widget, creating the signal if needed.
 
         Args:
-            service (BaseService): The service to attach this widget to
+            service (BaseService): The service emitting the signal
             signal (str): The name of the signal from the service
+            signal_args (tuple): The arguments of the signal's handlers
             callback (Callable): The handler of this signal
         """
-        # Validation/getting args from this service.
-        signal_args = service.get_signal_arg_types(signal)
-
-        # Validation on signal existing.
-        if signal_args is None:
-            logging.warning(
-                f"No signal exists under name {signal} for service "
-                f"{service.__class__.__name__} when attempting to register "
-                f"callback for {self.__class__.__name__} with callback {callback.__name__}"
-            )
-            return
 
         # All service signals start with their prefix for uniqueness.
         service_prefix = service.get_annotation().get_prefix()
 
         # Add signal handler (or make signal if it doesnt exist)
         try:
-            self._register_self_signal_handler(service_prefix + signal, callback)
+            handler_id = self._register_self_signal_handler(
+                service_prefix + signal, callback
+            )
         except TypeError:
             # Create signal on our widget if it doesn't have the signal
             GObject.signal_new(
@@ -501,10 +580,45 @@ class Widget(Gtk.Widget, CopyWidget):
                 signal_args,
             )
 
-            self._register_self_signal_handler(service_prefix + signal, callback)
+            handler_id = self._register_self_signal_handler(
+                service_prefix + signal, callback
+            )
+
+        self._service_handlers.append(handler_id)
+
+    def _register_service_callback(self, service, signal: str, callback: Callable):
+        """
+        Registers a handler from this widget under a certain signal
+        to a service
+
+        Args:
+            service (BaseService): The service to attach this widget to
+            signal (str): The name of the signal from the service
+            callback (Callable): The handler of this signal
+        """
+        # Validation/getting args from this service.
+        signal_args = service.get_handler_arg_types(signal)
+
+        # Validation on signal existing.
+        if signal_args is None:
+            logging.warning(
+                f"No signal exists under name {signal} for service "
+                f"{service.__class__.__name__} when attempting to register "
+                f"callback for {self.__class__.__name__} with callback {callback.__name__}"
+            )
+            return
 
         # Register service to emit signals through this widget
         if service not in self._attached_services:
             self._attached_services.add(service)
 
-        service.attach_widget(self, signal)
+        if service.direct_dispatch:
+            # The service calls the handler itself
+            service.attach_widget(self, signal, callback)
+        else:
+            self._register_service_signal(service, signal, signal_args, callback)
+            service.attach_widget(self, signal)
+
+        # Catch up with the last value of sticky signals straight away
+        for args in service.get_sticky_args(self, signal):
+            callback(self, *args)
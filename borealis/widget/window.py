@@ -1,9 +1,12 @@
 from typing import Optional
-from gi.repository import Gtk
+import logging
+from gi.repository import Gtk, Gdk
 from borealis.widget.widget import Widget
 from borealis.widget.layer_shell import LayerShellLayer, LayerShellEdge
 from gi.repository import Gtk4LayerShell
 
+logger = logging.getLogger(__name__)
+
 
 class Window(Gtk.Window, Widget):
     """
@@ -30,6 +33,14 @@ class Window(Gtk.Window, Widget):
     Whether or not an auto-exclusive zone should be automatically set by gtk4-layer-shell.
     """
 
+    monitor: Optional[str] = None
+    """
+    The connector name of the monitor (e.g DP-1) this window is shown on.
+
+    Services with per-monitor signals (e.g HyprlandService) only send those
+    signals to widgets in windows of that monitor, or without a monitor.
+    """
+
     child: Widget
     """
     The sole child of this window.
@@ -58,6 +69,9 @@ class Window(Gtk.Window, Widget):
             self.b_set_anchor(self.anchor)
             self.b_set_auto_exclusive_zone(self.auto_exclusive_zone)
 
+            if self.monitor is not None:
+                self.b_set_monitor(self.monitor)
+
         self.b_set_child(self.child)
 
         # Present our window
@@ -96,6 +110,30 @@ class Window(Gtk.Window, Widget):
         else:
             Gtk4LayerShell.set_exclusive_zone(self, auto_exclusive_zone)
 
+    def b_set_monitor(self, monitor: str):
+        """
+        Set's the gtk4-layer-shell monitor this window is shown on
+
+        Note that widgets already attached to services keep the
+        monitor they were attached with until they are mapped again.
+
+        Args:
+            monitor (str): The connector name of the monitor, e.g DP-1
+        """
+        self.monitor = monitor
+
+        monitors = Gdk.Display.get_default().get_monitors()
+        for index in range(monitors.get_n_items()):
+            gdk_monitor = monitors.get_item(index)
+
+            if gdk_monitor.get_connector() == monitor:
+                Gtk4LayerShell.set_monitor(self, gdk_monitor)
+                return
+
+        logger.warning(
+            f"No monitor exists with connector {monitor} for {self.__class__.__name__}"
+        )
+
     def b_set_child(self, child: Optional[Widget]):
         """
         Set's the child of this window to a new child
@@ -0,0 +1,102 @@
+import importlib.util
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+
+class _Placeholder:
+    """
+    Stands in for anything of PyGObject used while importing borealis,
+    attributes, calls and flags all return another placeholder.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        return _Placeholder(f"{self._name}.{name}")
+
+    def __call__(self, *args, **kwargs):
+        return _Placeholder(f"{self._name}()")
+
+    def __mro_entries__(self, bases):
+        return (object,)
+
+    def __or__(self, other):
+        return self
+
+    __ror__ = __or__
+
+    def __repr__(self) -> str:
+        return f"<placeholder {self._name}>"
+
+
+class _Repository(types.ModuleType):
+    def __getattr__(self, name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        namespace = _Placeholder(name)
+        setattr(self, name, namespace)
+        return namespace
+
+
+if importlib.util.find_spec("gi") is None:
+    # Without PyGObject only the modules which don't need Gtk are tested,
+    # borealis/__init__ (building the widget layer) is skipped for them.
+    repository = _Repository("gi.repository")
+    repository.GLib = _Placeholder("GLib")
+    repository.GLib.PRIORITY_DEFAULT = 0
+    repository.GLib.PRIORITY_DEFAULT_IDLE = 200
+    repository.GLib.PRIORITY_HIGH_IDLE = 100
+    repository.GLib.SOURCE_REMOVE = False
+    repository.GLib.SOURCE_CONTINUE = True
+
+    gi = types.ModuleType("gi")
+    gi.repository = repository
+    gi.require_version = lambda namespace, version: None
+
+    sys.modules["gi"] = gi
+    sys.modules["gi.repository"] = repository
+
+    package = types.ModuleType("borealis")
+    package.__path__ = [str(Path(__file__).parent.parent / "borealis")]
+    sys.modules["borealis"] = package
+
+
+class IdleQueue:
+    """
+    Collects the callbacks added with GLib.idle_add, running them on demand
+    """
+
+    def __init__(self):
+        self.callbacks = []
+
+    def idle_add(self, callback, *args, **kwargs) -> int:
+        self.callbacks.append((callback, args))
+        return len(self.callbacks)
+
+    def run(self):
+        """
+        Runs every pending callback, including those they add
+        """
+        while self.callbacks:
+            callback, args = self.callbacks.pop(0)
+            callback(*args)
+
+
+@pytest.fixture
+def idle_queue(monkeypatch) -> IdleQueue:
+    """
+    Replaces GLib.idle_add, so idle callbacks only run with idle_queue.run()
+    """
+    from gi.repository import GLib
+
+    queue = IdleQueue()
+    monkeypatch.setattr(GLib, "idle_add", queue.idle_add)
+    return queue
@@ -0,0 +1,28 @@
+import pytest
+
+pytest.importorskip("gi")
+
+from borealis.ext.hyprland import HyprlandState
+
+
+def test_keyless_subscribers_are_called_once_per_change():
+    state = HyprlandState()
+    calls = []
+
+    state.subscribe(HyprlandState.FOCUS, None, lambda key, entity: calls.append(key))
+    state.apply("focusedmonv2", ("DP-1", 1))
+
+    assert calls == [None]
+
+
+def test_keyed_and_wildcard_subscribers_are_each_called_once():
+    state = HyprlandState()
+    keyed = []
+    wildcard = []
+
+    state.subscribe(HyprlandState.MONITOR, "DP-1", lambda *args: keyed.append(args))
+    state.subscribe(HyprlandState.MONITOR, None, lambda *args: wildcard.append(args))
+    state.apply("monitoraddedv2", (1, "DP-1", "A monitor"))
+
+    assert len(keyed) == 1
+    assert len(wildcard) == 1
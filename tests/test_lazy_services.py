@@ -0,0 +1,88 @@
+import gc
+
+import pytest
+from gi.repository import GLib
+
+from borealis.service import BaseService, ServiceAnnotation
+
+
+class LazyCallback(ServiceAnnotation):
+    prefix = "lazy-on"
+
+
+class LazyService(BaseService):
+    annotation = LazyCallback()
+    lazy = True
+
+    def get_signal_arg_types(self, signal: str) -> tuple[any] | None:
+        return (int,)
+
+
+class FakeRuntime:
+    def __init__(self):
+        self.running = set()
+
+    def start(self, service: BaseService):
+        self.running.add(service)
+
+    def stop(self, service: BaseService):
+        self.running.discard(service)
+
+
+class FakeWidget:
+    pass
+
+
+@pytest.fixture
+def timeouts(monkeypatch) -> list:
+    """
+    The callbacks added with GLib.timeout_add, which never run on their own
+    """
+    timeouts = []
+
+    def timeout_add(interval: int, callback) -> int:
+        timeouts.append(callback)
+        return len(timeouts)
+
+    monkeypatch.setattr(GLib, "timeout_add", timeout_add)
+    monkeypatch.setattr(GLib, "source_remove", lambda source_id: None)
+    return timeouts
+
+
+def test_collected_widget_stops_lazy_service(idle_queue, timeouts):
+    runtime = FakeRuntime()
+    service = LazyService()
+    service.set_runtime(runtime)
+
+    stopped = []
+    service.add_subscription_listener(lambda: stopped.append(service.is_subscribed("a")))
+
+    widget = FakeWidget()
+    service.attach_widget(widget, "a")
+    assert service in runtime.running
+
+    del widget
+    gc.collect()
+    idle_queue.run()
+
+    assert stopped == [True, False]
+    assert service.get_subscribed_signals() == set()
+
+    for timeout in timeouts:
+        timeout()
+
+    assert service not in runtime.running
+
+
+def test_detached_widget_is_not_finalized_again(idle_queue, timeouts):
+    service = LazyService()
+    service.set_runtime(FakeRuntime())
+
+    widget = FakeWidget()
+    service.attach_widget(widget, "a")
+    service.detach_widget(widget)
+
+    del widget
+    gc.collect()
+
+    assert idle_queue.callbacks == []
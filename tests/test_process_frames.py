@@ -0,0 +1,25 @@
+import io
+
+import pytest
+
+from borealis.service.process_host import FRAME_HEADER, encode_frame, read_frame
+
+
+def test_frames_round_trip_in_order():
+    payloads = [("signal", "changed", (1, "a"), None), {"subscribed": ["a", "b"]}, b""]
+    stream = io.BytesIO(b"".join(encode_frame(payload) for payload in payloads))
+
+    assert [read_frame(stream) for _ in payloads] == payloads
+    assert read_frame(stream) is None
+
+
+def test_truncated_frames_read_as_closed():
+    frame = encode_frame(("signal", "changed", (1,)))
+
+    assert read_frame(io.BytesIO(frame[: FRAME_HEADER.size - 1])) is None
+    assert read_frame(io.BytesIO(frame[:-1])) is None
+
+
+def test_unsupported_payloads_are_rejected():
+    with pytest.raises(ValueError):
+        encode_frame(object())
@@ -0,0 +1,73 @@
+import logging
+import threading
+
+from borealis.service import BaseService, ServiceAnnotation, ServiceRuntime
+
+
+class RuntimeCallback(ServiceAnnotation):
+    prefix = "runtime-on"
+
+
+class WaitingService(BaseService):
+    """
+    Runs until it's stopped, or until released if it ignores being stopped
+    """
+
+    annotation = RuntimeCallback()
+    lazy = False
+
+    def __init__(self, ignores_stop: bool = False):
+        super().__init__()
+        self.ignores_stop = ignores_stop
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.finished = threading.Event()
+
+    def start_service(self):
+        self.started.set()
+
+        if self.ignores_stop:
+            self.release.wait(5)
+        else:
+            self._stop_event.wait(5)
+
+        self.finished.set()
+
+
+def test_shutdown_waits_for_services_to_stop():
+    runtime = ServiceRuntime()
+    service = WaitingService()
+    service.set_runtime(runtime)
+    assert service.started.wait(5)
+
+    runtime.shutdown(timeout=5)
+
+    assert service.finished.is_set()
+    assert not runtime.is_running(service)
+
+
+def test_shutdown_logs_services_which_dont_stop(caplog):
+    runtime = ServiceRuntime()
+    service = WaitingService(ignores_stop=True)
+    service.set_runtime(runtime)
+    assert service.started.wait(5)
+
+    with caplog.at_level(logging.WARNING, "borealis.service.service_runtime"):
+        runtime.shutdown(timeout=0.05)
+
+    service.release.set()
+
+    assert "WaitingService did not stop" in caplog.text
+
+
+def test_queued_services_never_start():
+    runtime = ServiceRuntime(max_workers=1)
+    running = WaitingService()
+    queued = WaitingService()
+    running.set_runtime(runtime)
+    queued.set_runtime(runtime)
+    assert running.started.wait(5)
+
+    runtime.shutdown(timeout=5)
+
+    assert not queued.started.is_set()
@@ -0,0 +1,171 @@
+import pytest
+from gi.repository import GLib
+
+from borealis.service import (
+    Coalesce,
+    CoalescePolicy,
+    OverflowPolicy,
+    ServiceSignal,
+    SignalQueue,
+)
+
+
+@pytest.fixture
+def batches(monkeypatch) -> list[list]:
+    """
+    The batches drained from queues, whose sources are drained with drain()
+    """
+    monkeypatch.setattr(GLib, "unix_fd_add_full", lambda *args: 1)
+    monkeypatch.setattr(GLib, "source_remove", lambda source_id: None)
+    return []
+
+
+def make_queue(batches: list, coalescing: dict[str, Coalesce] = {}, **kwargs):
+    return SignalQueue(batches.append, coalescing.get, **kwargs)
+
+
+def drain(queue: SignalQueue):
+    queue._dispatch(queue._eventfd, GLib.IOCondition.IN)
+
+
+def signals(batch: list) -> list[tuple]:
+    return [(signal.signal, *signal.args) for signal in batch]
+
+
+def test_signals_queued_together_are_one_batch(batches):
+    queue = make_queue(batches)
+
+    queue.put(ServiceSignal("a", 1))
+    queue.put_many([ServiceSignal("b", 2), ServiceSignal("c", 3)])
+    drain(queue)
+
+    assert [signals(batch) for batch in batches] == [[("a", 1), ("b", 2), ("c", 3)]]
+    queue.close()
+
+
+def test_drop_oldest_keeps_callbacks(batches):
+    queue = make_queue(batches, capacity=2, policy=OverflowPolicy.DROP_OLDEST)
+    callback = lambda: None
+
+    queue.put(ServiceSignal("a", 1))
+    queue.put_callback(callback)
+    queue.put(ServiceSignal("a", 2))
+    queue.put(ServiceSignal("a", 3))
+    drain(queue)
+
+    (batch,) = batches
+    assert batch[0] is callback
+    assert signals(batch[1:]) == [("a", 2), ("a", 3)]
+    assert queue.dropped == 1
+    queue.close()
+
+
+def test_drop_newest_keeps_queued_signals(batches):
+    queue = make_queue(batches, capacity=2, policy=OverflowPolicy.DROP_NEWEST)
+
+    for value in range(4):
+        queue.put(ServiceSignal("a", value))
+
+    drain(queue)
+
+    assert signals(batches[0]) == [("a", 0), ("a", 1)]
+    assert queue.dropped == 2
+    queue.close()
+
+
+def test_block_from_the_main_thread_grows_the_queue(batches):
+    queue = make_queue(batches, capacity=1, policy=OverflowPolicy.BLOCK)
+
+    queue.put(ServiceSignal("a", 1))
+    queue.put(ServiceSignal("a", 2))
+
+    assert queue.depth == 2
+    queue.close()
+
+
+def test_latest_replaces_pending_signal_in_place(batches):
+    queue = make_queue(batches, {"title": Coalesce(CoalescePolicy.LATEST, key=0)})
+
+    queue.put(ServiceSignal("title", "0x1", "first"))
+    queue.put(ServiceSignal("title", "0x2", "other"))
+    queue.put(ServiceSignal("title", "0x1", "second"))
+    drain(queue)
+
+    assert signals(batches[0]) == [("title", "0x1", "second"), ("title", "0x2", "other")]
+    queue.close()
+
+
+def test_accumulate_collects_arguments(batches):
+    queue = make_queue(batches, {"moved": Coalesce(CoalescePolicy.ACCUMULATE)})
+
+    queue.put(ServiceSignal("moved", 1, 2))
+    queue.put(ServiceSignal("moved", 3, 4))
+    drain(queue)
+
+    assert signals(batches[0]) == [("moved", [(1, 2), (3, 4)])]
+    queue.close()
+
+
+def test_coalescing_never_crosses_scopes(batches):
+    queue = make_queue(batches, {"title": Coalesce(CoalescePolicy.LATEST)})
+
+    for scope in ("DP-1", "HDMI-A-1", "DP-1"):
+        signal = ServiceSignal("title", scope)
+        signal.scope = scope
+        queue.put(signal)
+
+    drain(queue)
+
+    assert signals(batches[0]) == [("title", "DP-1"), ("title", "HDMI-A-1")]
+    queue.close()
+
+
+def test_dedupe_drops_repeated_arguments(batches):
+    queue = make_queue(batches, {"level": Coalesce(CoalescePolicy.DEDUPE, key=0)})
+
+    queue.put(ServiceSignal("level", "kbd", 1))
+    drain(queue)
+    queue.put(ServiceSignal("level", "kbd", 1))
+    queue.put(ServiceSignal("level", "kbd", 2))
+    drain(queue)
+
+    assert [signals(batch) for batch in batches] == [
+        [("level", "kbd", 1)],
+        [("level", "kbd", 2)],
+    ]
+    queue.close()
+
+
+def test_dedupe_forgets_dropped_signals(batches):
+    queue = make_queue(
+        batches,
+        {"level": Coalesce(CoalescePolicy.DEDUPE, key=0)},
+        capacity=1,
+        policy=OverflowPolicy.DROP_OLDEST,
+    )
+
+    queue.put(ServiceSignal("level", "kbd", 1))
+    queue.put(ServiceSignal("level", "mouse", 1))
+    queue.put(ServiceSignal("level", "kbd", 1))
+    drain(queue)
+
+    # The first kbd signal never arrived, so the second isn't its duplicate
+    assert signals(batches[0]) == [("level", "kbd", 1)]
+    queue.close()
+
+
+def test_closed_queue_discards_until_reopened(batches):
+    queue = make_queue(batches)
+
+    queue.put(ServiceSignal("a", 1))
+    queue.close()
+    queue.put(ServiceSignal("a", 2))
+
+    assert queue.depth == 0
+
+    queue.reopen()
+    queue.put(ServiceSignal("a", 3))
+    drain(queue)
+
+    assert signals(batches[0]) == [("a", 3)]
+    queue.close()
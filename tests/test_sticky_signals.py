@@ -0,0 +1,98 @@
+import pytest
+
+pytest.importorskip("gi")
+
+from borealis.service import (
+    BaseService,
+    Coalesce,
+    CoalescePolicy,
+    ServiceAnnotation,
+    ServiceSignal,
+)
+
+
+class StickyCallback(ServiceAnnotation):
+    prefix = "sticky-on"
+
+
+class StickyService(BaseService):
+    annotation = StickyCallback()
+    sticky_signals = {"focused": None}
+
+    def get_widget_scope(self, widget) -> str | None:
+        return widget.monitor
+
+    def get_signal_arg_types(self, signal: str) -> tuple[any] | None:
+        return (str, str)
+
+
+class FakeWidget:
+    def __init__(self, monitor: str | None = None):
+        self.monitor = monitor
+
+
+def run_scoped(service: StickyService, scope: str, *args):
+    signal = ServiceSignal("focused", *args)
+    signal.scope = scope
+    service._run_signal(signal)
+
+
+def test_unscoped_widget_replays_newest_signal_over_scopes():
+    service = StickyService()
+
+    run_scoped(service, "DP-1", "DP-1", "1")
+    run_scoped(service, "HDMI-A-1", "HDMI-A-1", "2")
+    run_scoped(service, "DP-1", "DP-1", "3")
+
+    widget = FakeWidget()
+    service.attach_widget(widget, "focused")
+
+    assert service.get_sticky_args(widget, "focused") == [("DP-1", "3")]
+
+
+def test_scoped_widget_replays_its_own_scope():
+    service = StickyService()
+
+    run_scoped(service, "DP-1", "DP-1", "1")
+    run_scoped(service, "HDMI-A-1", "HDMI-A-1", "2")
+
+    widget = FakeWidget("DP-1")
+    service.attach_widget(widget, "focused")
+
+    assert service.get_sticky_args(widget, "focused") == [("DP-1", "1")]
+
+
+def test_signal_listener_replays_newest_signal():
+    service = StickyService()
+
+    run_scoped(service, "DP-1", "DP-1", "1")
+    run_scoped(service, "HDMI-A-1", "HDMI-A-1", "2")
+
+    replayed = []
+    service.add_signal_listener("focused", lambda *args: replayed.append(args))
+
+    assert replayed == [("HDMI-A-1", "2")]
+
+
+class AccumulatingService(StickyService):
+    sticky_signals = {"focused": 0}
+    signal_coalescing = {"focused": Coalesce(CoalescePolicy.ACCUMULATE)}
+
+
+def test_accumulated_signal_replays_a_list():
+    service = AccumulatingService()
+
+    run_scoped(service, None, [("DP-1", "1"), ("HDMI-A-1", "2")])
+    run_scoped(service, None, [("DP-1", "3")])
+
+    widget = FakeWidget()
+    service.attach_widget(widget, "focused")
+
+    assert service.get_sticky_args(widget, "focused") == [
+        ([("HDMI-A-1", "2"), ("DP-1", "3")],)
+    ]
+
+    replayed = []
+    service.add_signal_listener("focused", lambda *args: replayed.append(args))
+
+    assert replayed == [([("HDMI-A-1", "2"), ("DP-1", "3")],)]
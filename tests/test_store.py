@@ -0,0 +1,125 @@
+import pytest
+
+from borealis.store import Derived, Store, StoreKey, sort_derived
+
+WIDTH = StoreKey("width", int, 0)
+HEIGHT = StoreKey("height", int, 0)
+AREA = StoreKey("area", int, 0)
+LABEL = StoreKey("label", str, "")
+
+
+def derived_keys(*pairs: tuple[StoreKey, list[StoreKey]]) -> dict[str, Derived]:
+    return {key.name: Derived(key, tuple(inputs), lambda *values: None) for key, inputs in pairs}
+
+
+def test_sort_derived_orders_inputs_first():
+    order = sort_derived(derived_keys((LABEL, [AREA]), (AREA, [WIDTH, HEIGHT])))
+
+    assert order == ["area", "label"]
+
+
+def test_sort_derived_rejects_cycles():
+    with pytest.raises(ValueError, match="cycle"):
+        sort_derived(derived_keys((LABEL, [AREA]), (AREA, [LABEL])))
+
+
+def test_derive_rejects_cycles_and_keeps_the_store_usable(idle_queue):
+    store = Store()
+    store.derive(AREA, [LABEL], lambda label: len(label))
+
+    with pytest.raises(ValueError):
+        store.derive(LABEL, [AREA], lambda area: str(area))
+
+    store.set(LABEL, "abc")
+    idle_queue.run()
+
+    assert store.get(AREA) == 3
+
+
+def test_writes_are_applied_in_one_batch(idle_queue):
+    store = Store()
+    calls = []
+    store.subscribe(WIDTH, lambda value, snapshot: calls.append(dict(snapshot)))
+
+    store.set(WIDTH, 1)
+    store.set(WIDTH, 2)
+    store.set(HEIGHT, 3)
+
+    assert store.get(WIDTH) == 0
+    assert len(idle_queue.callbacks) == 1
+
+    idle_queue.run()
+
+    assert calls == [{"width": 2, "height": 3}]
+
+
+def test_derived_keys_are_computed_once_per_batch_without_glitches(idle_queue):
+    store = Store()
+    computed = []
+
+    def compute_area(width: int, height: int) -> int:
+        computed.append((width, height))
+        return width * height
+
+    store.derive(AREA, [WIDTH, HEIGHT], compute_area)
+    store.derive(LABEL, [AREA, WIDTH], lambda area, width: f"{area}/{width}")
+    idle_queue.run()
+    computed.clear()
+
+    labels = []
+    store.subscribe(LABEL, lambda value, snapshot: labels.append(value))
+
+    store.update({WIDTH: 2, HEIGHT: 3})
+    idle_queue.run()
+
+    # The label never sees a new width with an old area
+    assert computed == [(2, 3)]
+    assert labels == ["6/2"]
+
+
+def test_subscribers_are_only_called_on_changes(idle_queue):
+    store = Store()
+    store.derive(AREA, [WIDTH, HEIGHT], lambda width, height: width * height)
+    idle_queue.run()
+
+    widths = []
+    areas = []
+    store.subscribe(WIDTH, lambda value, snapshot: widths.append(value))
+    store.subscribe(AREA, lambda value, snapshot: areas.append(value))
+
+    store.set(WIDTH, 0)
+    idle_queue.run()
+
+    assert widths == []
+    assert areas == []
+
+    store.set(WIDTH, 4)
+    idle_queue.run()
+
+    # Unchanged derived values aren't emitted either (the height is still 0)
+    assert widths == [4]
+    assert areas == []
+
+
+def test_value_set_before_deriving_is_replaced(idle_queue):
+    store = Store()
+    areas = []
+    store.subscribe(AREA, lambda value, snapshot: areas.append(value))
+
+    store.set(AREA, 100)
+    store.derive(AREA, [WIDTH, HEIGHT], lambda width, height: width * height + 1)
+    idle_queue.run()
+
+    assert store.get(AREA) == 1
+    assert areas == [1]
+
+
+def test_writes_of_the_wrong_type_are_rejected(idle_queue):
+    store = Store()
+    store.derive(AREA, [WIDTH, HEIGHT], lambda width, height: width * height)
+
+    with pytest.raises(TypeError):
+        store.set(WIDTH, "wide")
+
+    with pytest.raises(ValueError):
+        store.set(AREA, 1)
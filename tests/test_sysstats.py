@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pytest
+
+from borealis.ext import sysstats
+from borealis.ext.sysstats import NET_DEV_PATTERN, ProcFile, SystemStatsService
+
+NET_DEV = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo: {lo_rx} 10 0 0 0 0 0 0 {lo_tx} 10 0 0 0 0 0 0
+  eth0: {eth_rx} 20 0 0 0 0 0 0 {eth_tx} 20 0 0 0 0 0 0
+"""
+
+
+def write_net_dev(proc_root: Path, lo: int, eth_rx: int, eth_tx: int):
+    (proc_root / "net").mkdir(exist_ok=True)
+    (proc_root / "net" / "dev").write_text(
+        NET_DEV.format(lo_rx=lo, lo_tx=lo, eth_rx=eth_rx, eth_tx=eth_tx)
+    )
+
+
+def test_proc_file_rereads_and_grows(tmp_path: Path):
+    path = tmp_path / "stat"
+    path.write_bytes(b"short")
+
+    proc_file = ProcFile(str(path), buffer_size=4)
+
+    try:
+        assert bytes(proc_file.read()) == b"short"
+
+        path.write_bytes(b"x" * 100)
+        assert bytes(proc_file.read()) == b"x" * 100
+    finally:
+        proc_file.close()
+
+
+@pytest.fixture
+def service(tmp_path: Path) -> SystemStatsService:
+    service = SystemStatsService()
+    service.proc_root = str(tmp_path)
+
+    yield service
+
+    for proc_file in service._files.values():
+        proc_file.close()
+
+
+def sample_network(service: SystemStatsService, monkeypatch, now: float):
+    monkeypatch.setattr(sysstats.time, "monotonic", lambda: now)
+    return service._sample_counters(
+        "net/dev", NET_DEV_PATTERN, 1, lambda name: name != b"lo"
+    )
+
+
+def test_first_sample_has_no_rates(service, tmp_path, monkeypatch):
+    write_net_dev(tmp_path, 0, 1000, 500)
+
+    assert sample_network(service, monkeypatch, 10.0) is None
+
+
+def test_rates_are_per_second_and_exclude_loopback(service, tmp_path, monkeypatch):
+    write_net_dev(tmp_path, 0, 1000, 500)
+    sample_network(service, monkeypatch, 10.0)
+
+    write_net_dev(tmp_path, 4000, 3000, 1500)
+    received, transmitted, rates = sample_network(service, monkeypatch, 12.0)
+
+    assert (received, transmitted) == (1000.0, 500.0)
+    assert rates == {"lo": (2000, 2000), "eth0": (1000, 500)}
+
+
+def test_reset_counters_never_give_negative_rates(service, tmp_path, monkeypatch):
+    write_net_dev(tmp_path, 0, 1000, 500)
+    sample_network(service, monkeypatch, 10.0)
+
+    # The interface was recreated
+    write_net_dev(tmp_path, 0, 10, 5)
+    received, transmitted, rates = sample_network(service, monkeypatch, 11.0)
+
+    assert (received, transmitted) == (0.0, 0.0)
+    assert rates["eth0"] == (0, 0)